@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for access token verification overhead.
+
+Times verify_access_token per request for HS256 tokens and ES256 tokens
+(signed with a generated key served from a preloaded JWKS, no network),
+with every request running full verification and with the verified token
+cache, on a workload of a few users polling with the same token.
+
+Run from the backend directory:
+    python benchmarks/auth_benchmark.py [requests] [users]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_JWT_SECRET", "benchmark-secret-with-at-least-32-bytes")
+
+import numpy as np
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+
+from services import jwt_verifier
+
+KEY_ID = "benchmark-key"
+
+
+def es256_signer():
+    """A private key PEM for signing, with its public JWK loaded into the JWKS cache"""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = {**jwk.construct(public_pem, "ES256").to_dict(), "kid": KEY_ID}
+    jwt_verifier.jwks_cache.keys = {KEY_ID: public_jwk}
+    jwt_verifier.jwks_cache.fetched_at = time.time()
+    return private_pem
+
+
+def make_tokens(users, algorithm, key):
+    exp = int(time.time()) + 3600
+    headers = {"kid": KEY_ID} if algorithm != "HS256" else None
+    return [jwt.encode({"sub": f"user-{i}", "aud": "authenticated", "exp": exp}, key,
+                       algorithm=algorithm, headers=headers) for i in range(users)]
+
+
+def run(tokens, requests, cache_size):
+    """Per-request verification latency (µs) for requests cycling through tokens"""
+    jwt_verifier.token_cache.max_size = cache_size
+    jwt_verifier.token_cache.clear()
+    latencies = np.empty(requests)
+    for i in range(requests):
+        token = tokens[i % len(tokens)]
+        start = time.perf_counter()
+        user_id = jwt_verifier.verify_access_token(token)
+        latencies[i] = (time.perf_counter() - start) * 1e6
+        assert user_id == f"user-{i % len(tokens)}"
+    return latencies
+
+
+def report(label, latencies):
+    print(f"{label}: mean {latencies.mean():.1f} µs, p50 {np.percentile(latencies, 50):.1f} µs, "
+          f"p99 {np.percentile(latencies, 99):.1f} µs")
+    return latencies.mean()
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"{requests} requests from {users} users reusing their tokens")
+
+    ok = True
+    signers = [("HS256", jwt_verifier.SUPABASE_JWT_SECRET), ("ES256", es256_signer())]
+    for algorithm, key in signers:
+        tokens = make_tokens(users, algorithm, key)
+        uncached = report(f"{algorithm} full verification", run(tokens, requests, cache_size=0))
+        cached = report(f"{algorithm} with token cache ", run(tokens, requests, cache_size=1024))
+        if cached < uncached:
+            print(f"✅ {algorithm}: auth overhead per request {uncached:.1f} -> {cached:.1f} µs "
+                  f"({uncached / cached:.0f}x less)")
+        else:
+            print(f"❌ {algorithm}: token cache did not reduce auth overhead ({uncached:.1f} -> {cached:.1f} µs)")
+            ok = False
+
+    jwt_verifier.jwks_cache.shutdown()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for server cold start.
+
+Profiles `import server` with `python -X importtime` (total time and the
+slowest top-level packages), checks that the heavy SDKs are left for first
+use, and times a fresh uvicorn process from spawn to its first successful
+/health response.
+
+Run from the backend directory (pass another checkout's backend directory
+to compare against it):
+    python benchmarks/cold_start_benchmark.py [runs] [backend_dir]
+"""
+import os
+import re
+import sys
+import time
+import socket
+import subprocess
+import statistics
+import urllib.request
+from collections import Counter
+
+DEFERRED_MODULES = ["google.genai", "supabase", "httpx", "models"]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(backend_dir):
+    """(total ms for `import server`, self ms per top-level package)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=backend_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_ms = 0.0
+    per_package = Counter()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        per_package[module.split(".")[0]] += int(self_us) / 1000
+        if module == "server":
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, per_package
+
+
+def loaded_at_import(backend_dir):
+    """Which DEFERRED_MODULES `import server` loads"""
+    code = f"import sys, server; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True)
+    return [module for module in result.stdout.strip().splitlines()[-1].split(",") if module] if result.stdout.strip() else []
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_health(backend_dir, timeout=60):
+    """Seconds from spawning uvicorn to the first 200 from /health"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Server did not become healthy")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backend_dir = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__)))
+
+    profiles = [import_profile(backend_dir) for _ in range(runs)]
+    import_ms = statistics.median(total for total, _ in profiles)
+    print(f"import server: median {import_ms:.0f} ms over {runs} runs")
+    print("Slowest packages (self time, last run):")
+    for package, ms in profiles[-1][1].most_common(8):
+        print(f"  {package:<20} {ms:7.1f} ms")
+
+    health = [time_to_first_health(backend_dir) * 1000 for _ in range(runs)]
+    print(f"Cold start to first /health: median {statistics.median(health):.0f} ms "
+          f"(min {min(health):.0f}, max {max(health):.0f})")
+
+    loaded = loaded_at_import(backend_dir)
+    if loaded:
+        print(f"❌ Loaded at import instead of first use: {', '.join(loaded)}")
+        sys.exit(1)
+    print(f"✅ {', '.join(DEFERRED_MODULES)} are loaded on first use, not at start-up")
+
+
+if __name__ == "__main__":
+    main()
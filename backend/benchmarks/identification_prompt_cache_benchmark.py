@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Gemini context caching of the clothing identification prompt.
+
+Runs identify_clothing_from_image on a sample photo with the prompt sent
+inline, then with it served from Gemini cached content, and reports input
+tokens (total and served from cache) and latency per itemization.
+
+Needs a real GEMINI_API_KEY. Run from the backend directory:
+    python benchmarks/identification_prompt_cache_benchmark.py [runs] [image]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from services import clothing_identifier
+from services import prompt_cache
+
+
+def run(image, runs, use_cache):
+    """Identify the image `runs` times, returning (input tokens, cached tokens, latency) per call"""
+    prompt_cache.PROMPT_CACHE_ENABLED = use_cache
+    clothing_identifier.identification_prompt_cache.invalidate()
+    if use_cache and clothing_identifier.identification_prompt_cache.get() is None:
+        return None
+
+    samples = []
+    original = clothing_identifier.generate_content
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        response = original(*args, **kwargs)
+        usage = response.usage_metadata
+        samples.append((
+            usage.prompt_token_count or 0,
+            usage.cached_content_token_count or 0,
+            time.perf_counter() - start
+        ))
+        return response
+
+    clothing_identifier.generate_content = timed
+    try:
+        for _ in range(runs):
+            clothing_identifier.identify_clothing_from_image(image, generate_id=False)
+    finally:
+        clothing_identifier.generate_content = original
+    return samples
+
+
+def report(label, samples):
+    input_tokens = np.mean([sample[0] for sample in samples])
+    cached_tokens = np.mean([sample[1] for sample in samples])
+    latencies = np.array([sample[2] for sample in samples]) * 1000
+    print(f"{label}: {input_tokens:.0f} input tokens ({cached_tokens:.0f} from cache, "
+          f"{input_tokens - cached_tokens:.0f} billed at the full rate), "
+          f"p50 {np.percentile(latencies, 50):.0f} ms, p95 {np.percentile(latencies, 95):.0f} ms")
+    return input_tokens - cached_tokens, np.percentile(latencies, 50)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    image_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "orange-jacket.jpg")
+    image = Image.open(image_path).convert("RGB")
+
+    prompt = clothing_identifier.generate_clothing_identification_prompt()
+    print(f"Static prompt: {len(prompt)} chars; per-call instruction with cache: "
+          f"{len(clothing_identifier.IDENTIFICATION_INSTRUCTION)} chars")
+
+    inline = run(image, runs, use_cache=False)
+    inline_tokens, inline_latency = report("Inline prompt", inline)
+
+    cached = run(image, runs, use_cache=True)
+    if cached is None:
+        print("❌ Could not create cached content for the identification prompt (see log)")
+        sys.exit(1)
+    cached_tokens, cached_latency = report("Cached prompt", cached)
+
+    if cached_tokens < inline_tokens:
+        print(f"✅ Full-rate input tokens per itemization: {inline_tokens:.0f} -> {cached_tokens:.0f}; "
+              f"p50 latency {inline_latency:.0f} -> {cached_latency:.0f} ms")
+    else:
+        print(f"❌ Cached prompt did not reduce full-rate input tokens ({inline_tokens:.0f} -> {cached_tokens:.0f})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the garment models.
+
+Compares slotted garment models against the original __dict__-based layout
+(kept below for reference) on a large synthetic wardrobe, and checks that an
+outfit photo is released once itemizing is done and only the models still
+point at it.
+
+Run from the backend directory:
+    python benchmarks/model_memory_benchmark.py [num_items]
+"""
+import gc
+import os
+import sys
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from models import Jeans, Sweater, Sneakers, Coat
+
+
+class LegacyClothes:
+    """Original layout: per-instance __dict__ and a strong image reference"""
+
+    def __init__(self, id, clothing_category, name, primary_color, secondary_color, image, is_owned=True):
+        self.id = id
+        self.clothing_category = clothing_category
+        self.name = name
+        self.primary_color = primary_color
+        self.secondary_color = secondary_color
+        self.image = image
+        self.is_owned = is_owned
+
+
+class LegacyJeans(LegacyClothes):
+    def __init__(self, id, name, primary_color, secondary_color, image, fit="Regular"):
+        super().__init__(id, "Jeans", name, primary_color, secondary_color, image)
+        self.fit = fit
+
+
+class LegacySweater(LegacyClothes):
+    def __init__(self, id, name, primary_color, secondary_color, image, material="Wool"):
+        super().__init__(id, "Sweater", name, primary_color, secondary_color, image)
+        self.material = material
+
+
+class LegacySneakers(LegacyClothes):
+    def __init__(self, id, name, primary_color, secondary_color, image, style="Casual"):
+        super().__init__(id, "Sneakers", name, primary_color, secondary_color, image)
+        self.style = style
+
+
+class LegacyCoat(LegacyClothes):
+    def __init__(self, id, name, primary_color, secondary_color, image, length="Long"):
+        super().__init__(id, "Coat", name, primary_color, secondary_color, image)
+        self.length = length
+
+
+COLORS = ["Black", "White", "Navy", "Grey", "Beige", "Olive", "Red", "Blue"]
+
+
+def build_wardrobe(classes, count, image, seed=42):
+    rng = random.Random(seed)
+    return [
+        rng.choice(classes)(i, f"Item {i}", rng.choice(COLORS), rng.choice(COLORS), image)
+        for i in range(count)
+    ]
+
+
+def measure(classes, count, image):
+    """Bytes allocated to hold `count` models"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    wardrobe = build_wardrobe(classes, count, image)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del wardrobe
+    return after - before
+
+
+def photo_retained(classes):
+    """Whether items still keep the outfit photo alive after itemizing returns"""
+    photo = Image.new("RGB", (2048, 2048))
+    items = build_wardrobe(classes, 5, photo)
+    del photo
+    gc.collect()
+    return any(getattr(item, "image", None) is not None for item in items)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    image = Image.new("RGB", (1, 1))
+
+    slotted_bytes = measure([Jeans, Sweater, Sneakers, Coat], count, image)
+    legacy_bytes = measure([LegacyJeans, LegacySweater, LegacySneakers, LegacyCoat], count, image)
+
+    print(f"Items: {count}")
+    print(f"Legacy (__dict__):  {legacy_bytes / 1024 / 1024:7.2f} MiB ({legacy_bytes / count:.0f} B/item)")
+    print(f"Slotted models:     {slotted_bytes / 1024 / 1024:7.2f} MiB ({slotted_bytes / count:.0f} B/item)")
+    print(f"Reduction: {(1 - slotted_bytes / legacy_bytes) * 100:.0f}%")
+
+    failed = False
+    if photo_retained([LegacyJeans, LegacySweater]):
+        print("ℹ️  Legacy models keep the outfit photo alive")
+    if photo_retained([Jeans, Sweater]):
+        print("❌ Slotted models keep the outfit photo alive")
+        failed = True
+    else:
+        print("✅ Outfit photo is released once only models reference it")
+
+    if slotted_bytes >= legacy_bytes:
+        print("❌ Slotted models use no less memory than the legacy layout")
+        failed = True
+    else:
+        print("✅ Slotted models use less memory per item")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
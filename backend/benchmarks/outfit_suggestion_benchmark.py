@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the outfit suggestion engine.
+
+Scores a synthetic wardrobe with outfit_suggestion_service and checks that,
+on a wardrobe small enough to enumerate, the beam search finds an outfit
+scoring as high as the best one from scoring every combination one at a time.
+
+Run from the backend directory:
+    python benchmarks/outfit_suggestion_benchmark.py [num_items]
+"""
+import os
+import sys
+import time
+import random
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services import outfit_suggestion_service as suggestions
+from services.color_service import COLOR_RGB
+
+CATEGORIES = {
+    "tops": ["TShirt", "Dress Shirt", "Blouse", "Sweater", "Hoodie", "Cardigan"],
+    "bottoms": ["Jeans", "Chinos", "Dress Pants", "Shorts", "Skirt", "Joggers"],
+    "footwear": ["Sneakers", "Dress Shoes", "Boots", "Sandals", "Heels"],
+    "outerwear": ["Jacket", "Blazer", "Coat", "Winter Coat", "Vest"],
+    "dresses": ["Casual Dress", "Formal Dress", "Jumpsuit"]
+}
+COLORS = list(COLOR_RGB) + ["Dark Green", "Light Blue", "Navy Blue", "Heather"]
+
+
+def generate_wardrobe(count, seed=42):
+    rng = random.Random(seed)
+    weights = {"tops": 0.35, "bottoms": 0.25, "footwear": 0.15, "outerwear": 0.15, "dresses": 0.1}
+    clothes = []
+    for i in range(count):
+        display_category = rng.choices(list(weights), list(weights.values()))[0]
+        category = rng.choice(CATEGORIES[display_category])
+        clothes.append({
+            "id": f"item-{i}",
+            "name": f"{category} {i}",
+            "category": category,
+            "display_category": display_category,
+            "primary_color": rng.choice(COLORS),
+            "features": {"material": rng.choice(["Wool", "Cotton", "Linen"])}
+        })
+    return clothes
+
+
+def brute_force_best(slots, season, occasion):
+    """Score every combination in plain Python loops"""
+    pairs = {}
+    for i, first in enumerate(suggestions.SLOTS):
+        for second in suggestions.SLOTS[i + 1:]:
+            pairs[first, second] = suggestions.pair_scores(slots[first], slots[second])
+    unary = {slot: suggestions.unary_scores(slots[slot], season, occasion) for slot in suggestions.SLOTS}
+
+    best_score, best_picks = -np.inf, None
+    for picks in itertools.product(*(range(len(slots[slot])) for slot in suggestions.SLOTS)):
+        chosen = dict(zip(suggestions.SLOTS, picks))
+        top, bottom = chosen["top"], chosen["bottom"]
+        if slots["top"].onepiece[top] == slots["bottom"].real[bottom]:
+            continue
+
+        pair_sum = pair_count = 0.0
+        for (first, second), (scores, real) in pairs.items():
+            pair_sum += scores[chosen[first], chosen[second]]
+            pair_count += real[chosen[first], chosen[second]]
+        real_slots = [slot for slot in suggestions.SLOTS if slots[slot].real[chosen[slot]]]
+        score = pair_sum / max(pair_count, 1) + sum(unary[slot][chosen[slot]] for slot in real_slots) / len(real_slots)
+        if season and suggestions.SEASON_WARMTH[season] >= suggestions.NO_LAYER_MIN_WARMTH \
+                and not slots["outerwear"].real[chosen["outerwear"]]:
+            score -= suggestions.NO_LAYER_PENALTY
+
+        if score > best_score:
+            best_score = score
+            best_picks = {slot: (index if slots[slot].real[index] else -1) for slot, index in chosen.items()}
+    return best_score, best_picks
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    failed = False
+
+    wardrobe = generate_wardrobe(count)
+    start = time.perf_counter()
+    slots = suggestions.build_slots(wardrobe)
+    load_time = time.perf_counter() - start
+
+    timings = []
+    for season, occasion in [(None, None), ("winter", "formal"), ("summer", "casual")]:
+        start = time.perf_counter()
+        outfits = suggestions.score_outfits(slots, k=10, season=season, occasion=occasion)
+        timings.append(time.perf_counter() - start)
+        if len(outfits) != 10:
+            print(f"❌ Expected 10 outfits for {season}/{occasion}, got {len(outfits)}")
+            failed = True
+
+    sizes = {slot: int(slots[slot].real.sum()) for slot in suggestions.SLOTS}
+    combinations = np.prod([len(slots[slot]) for slot in suggestions.SLOTS], dtype=np.float64)
+    print(f"Items: {count} ({sizes}), {combinations:,.0f} combinations")
+    print(f"Loading into arrays: {load_time * 1000:.1f} ms")
+    print(f"Scoring top 10: {min(timings) * 1000:.1f} ms best, {max(timings) * 1000:.1f} ms worst")
+
+    small = suggestions.build_slots(generate_wardrobe(60, seed=7))
+    for season, occasion in [(None, None), ("winter", "formal"), ("summer", "casual")]:
+        expected_score, expected = brute_force_best(small, season, occasion)
+        score, picks = suggestions.score_outfits(small, k=1, season=season, occasion=occasion)[0]
+        # Compare scores, since identical synthetic items can tie
+        if abs(score - expected_score) > 1e-4:
+            print(f"❌ Beam search missed the best {season}/{occasion} outfit: {picks} ({score:.4f}) vs {expected} ({expected_score:.4f})")
+            failed = True
+    if not failed:
+        print("✅ Beam search matches exhaustive scoring on a small wardrobe")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
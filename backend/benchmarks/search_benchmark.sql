@@ -0,0 +1,87 @@
+-- Search benchmark: seeds 100k wardrobe rows and compares the old ILIKE outfit
+-- search with the indexed search_wardrobe function.
+--
+-- Run against a database initialised with database_init.sql:
+--   psql "$DATABASE_URL" -f benchmarks/search_benchmark.sql
+--
+-- Everything runs in one transaction that is rolled back at the end.
+
+BEGIN;
+
+-- Skip the auth.users foreign key so benchmark profiles can be inserted directly
+-- (needs a superuser connection, e.g. the postgres role)
+SET LOCAL session_replication_role = replica;
+
+CREATE TEMP TABLE bench_words (kind TEXT, words TEXT[]) ON COMMIT DROP;
+INSERT INTO bench_words VALUES
+  ('name', ARRAY['Slim', 'Relaxed', 'Cropped', 'Oversized', 'Vintage', 'Classic', 'Pleated', 'Ribbed', 'Quilted', 'Linen']),
+  ('category', ARRAY['shirt', 'jeans', 'jacket', 'sweater', 'dress', 'skirt', 'blazer', 'hoodie', 'coat', 'shorts']),
+  ('color', ARRAY['black', 'white', 'navy', 'olive', 'beige', 'burgundy', 'grey', 'red', 'mustard', 'teal']),
+  ('accessory', ARRAY['watch', 'belt', 'scarf', 'cap', 'sunglasses', 'bracelet', 'tote', 'beanie', 'necklace', 'wallet']),
+  ('occasion', ARRAY['weekend', 'office', 'date night', 'gym', 'wedding', 'travel', 'brunch', 'festival', 'interview', 'beach']);
+
+CREATE FUNCTION pg_temp.pick(p_kind TEXT, p_seed INTEGER) RETURNS TEXT AS $$
+  SELECT words[1 + (p_seed % array_length(words, 1))] FROM bench_words WHERE kind = p_kind
+$$ LANGUAGE sql STABLE;
+
+-- 100 profiles; the first one is the profile searched below
+INSERT INTO public.profiles (id, email)
+SELECT ('00000000-0000-0000-0000-' || lpad(g::TEXT, 12, '0'))::UUID, 'bench' || g || '@example.com'
+FROM generate_series(1, 100) g;
+
+-- 60k clothes, 25k accessories, 15k outfits = 100k rows
+INSERT INTO public.clothes (profile_id, name, category, primary_color, secondary_color, image_url)
+SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 100)::TEXT, 12, '0'))::UUID,
+       pg_temp.pick('color', g / 7) || ' ' || pg_temp.pick('name', g / 3) || ' ' || pg_temp.pick('category', g),
+       pg_temp.pick('category', g),
+       pg_temp.pick('color', g / 7),
+       pg_temp.pick('color', g / 11),
+       'bench://clothes/' || g
+FROM generate_series(1, 60000) g;
+
+INSERT INTO public.accessories (profile_id, name, category, primary_color, secondary_color, image_url)
+SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 100)::TEXT, 12, '0'))::UUID,
+       pg_temp.pick('color', g / 5) || ' ' || pg_temp.pick('accessory', g),
+       pg_temp.pick('accessory', g),
+       pg_temp.pick('color', g / 5),
+       NULL,
+       'bench://accessories/' || g
+FROM generate_series(1, 25000) g;
+
+INSERT INTO public.outfits (profile_id, name, description)
+SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 100)::TEXT, 12, '0'))::UUID,
+       initcap(pg_temp.pick('occasion', g)) || ' look #' || g,
+       pg_temp.pick('color', g / 3) || ' ' || pg_temp.pick('category', g / 2) || ' with ' || pg_temp.pick('accessory', g)
+FROM generate_series(1, 15000) g;
+
+ANALYZE public.clothes;
+ANALYZE public.accessories;
+ANALYZE public.outfits;
+
+\echo '== Old outfit search: ILIKE on name/description =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.outfits
+WHERE profile_id = '00000000-0000-0000-0000-000000000001'
+AND (name ILIKE '%office%' OR description ILIKE '%office%');
+
+\echo '== search_wardrobe: outfits only =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_wardrobe('00000000-0000-0000-0000-000000000001', 'office', ARRAY['outfit']);
+
+\echo '== search_wardrobe: all kinds, multi-word query =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_wardrobe('00000000-0000-0000-0000-000000000001', 'navy jacket');
+
+\echo '== search_wardrobe: partial word / typo (trigram) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_wardrobe('00000000-0000-0000-0000-000000000001', 'burgandy');
+
+\echo '== search_wardrobe: second page =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_wardrobe('00000000-0000-0000-0000-000000000001', 'black', ARRAY['outfit', 'clothing', 'accessory'], 20, 20);
+
+\echo '== Sample ranked results =='
+SELECT kind, name, rank, total_count
+FROM public.search_wardrobe('00000000-0000-0000-0000-000000000001', 'navy jacket', ARRAY['outfit', 'clothing', 'accessory'], 10, 0);
+
+ROLLBACK;
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark for visual similarity search.
+
+Computes descriptors for synthetic garment images, fills a 10k-item
+DescriptorIndex in a temporary directory and times top-10 queries. Also
+checks that storing descriptors as float16 keeps the float32 top 10 and
+that a re-saved copy of an image is reported as a duplicate.
+
+Run from the backend directory:
+    python benchmarks/similarity_benchmark.py [num_items]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from services import similarity_service as similarity
+
+SHAPES = ["rectangle", "ellipse", "tshirt", "trousers"]
+
+
+def synthetic_garment(rng):
+    """A garment-like shape in one or two colors on a transparent background"""
+    image = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    color = tuple(int(c) for c in rng.integers(0, 256, 3)) + (255,)
+    accent = tuple(int(c) for c in rng.integers(0, 256, 3)) + (255,)
+    shape = SHAPES[rng.integers(len(SHAPES))]
+    left, top = (int(v) for v in rng.integers(10, 60, 2))
+    right, bottom = (int(v) for v in rng.integers(196, 246, 2))
+
+    if shape == "rectangle":
+        draw.rectangle([left, top, right, bottom], fill=color)
+    elif shape == "ellipse":
+        draw.ellipse([left, top, right, bottom], fill=color)
+    elif shape == "tshirt":
+        draw.rectangle([left + 40, top, right - 40, bottom], fill=color)
+        draw.polygon([(left + 40, top), (left, top + 50), (left + 40, top + 70)], fill=color)
+        draw.polygon([(right - 40, top), (right, top + 50), (right - 40, top + 70)], fill=color)
+    else:
+        middle = (left + right) // 2
+        draw.rectangle([left, top, right, top + 40], fill=color)
+        draw.rectangle([left, top + 40, middle - 5, bottom], fill=color)
+        draw.rectangle([middle + 5, top + 40, right, bottom], fill=color)
+
+    stripe = int(rng.integers(top, bottom - 20))
+    draw.rectangle([left, stripe, right, stripe + 15], fill=accent)
+    return image
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    failed = False
+    rng = np.random.default_rng(42)
+
+    # Descriptors for a sample of images, the rest are perturbed copies to reach `count`
+    sample = [synthetic_garment(rng) for _ in range(200)]
+    start = time.perf_counter()
+    sample_descriptors = np.array([similarity.compute_descriptor(image) for image in sample])
+    descriptor_time = (time.perf_counter() - start) / len(sample)
+
+    noise = rng.normal(0, 0.05, (count, similarity.DESCRIPTOR_DIM)).astype(np.float32)
+    descriptors = sample_descriptors[rng.integers(len(sample), size=count)] + noise
+    descriptors /= np.linalg.norm(descriptors, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = similarity.DescriptorIndex(directory, "bench-user")
+        start = time.perf_counter()
+        for begin in range(0, count, 500):
+            index.add([(("clothing", f"item-{i}"), descriptors[i]) for i in range(begin, min(begin + 500, count))])
+        add_time = time.perf_counter() - start
+        file_size = os.path.getsize(index.vectors_path)
+
+        queries = rng.integers(count, size=200)
+        timings = []
+        recalls = []
+        for row in queries:
+            start = time.perf_counter()
+            results = index.search(descriptors[row], k=10, exclude=("clothing", f"item-{row}"))
+            timings.append(time.perf_counter() - start)
+
+            scores = descriptors @ descriptors[row]
+            scores[row] = -np.inf
+            exact = {f"item-{i}" for i in np.argsort(-scores)[:10]}
+            recalls.append(len(exact & {item_id for (_, item_id), _ in results}) / 10)
+
+        reopened = similarity.DescriptorIndex(directory, "bench-user")
+        if len(reopened) != count:
+            print(f"❌ Reopened index has {len(reopened)} items, expected {count}")
+            failed = True
+
+        timings = np.array(timings) * 1000
+        print(f"Items: {count}, descriptor dim {similarity.DESCRIPTOR_DIM}")
+        print(f"Descriptor: {descriptor_time * 1000:.1f} ms per image")
+        print(f"Indexing: {add_time * 1000:.0f} ms in batches of 500, {file_size / 1024 / 1024:.1f} MB on disk")
+        print(f"Top-10 query: p50 {np.percentile(timings, 50):.2f} ms, p95 {np.percentile(timings, 95):.2f} ms")
+
+        recall = float(np.mean(recalls))
+        if recall >= 0.95:
+            print(f"✅ float16 recall@10 vs float32: {recall:.3f}")
+        else:
+            print(f"❌ float16 recall@10 vs float32: {recall:.3f}")
+            failed = True
+
+    duplicate = similarity.compute_descriptor(sample[0].resize((200, 200)))
+    similarity_score = float(duplicate @ sample_descriptors[0])
+    others = float(np.max(np.delete(sample_descriptors, 0, axis=0) @ duplicate))
+    if similarity_score >= similarity.DUPLICATE_THRESHOLD:
+        print(f"✅ Resized copy detected as duplicate ({similarity_score:.3f}; closest other image {others:.3f})")
+    else:
+        print(f"❌ Resized copy scored {similarity_score:.3f}, below {similarity.DUPLICATE_THRESHOLD}")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
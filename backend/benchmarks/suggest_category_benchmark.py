@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for other_config.suggest_category.
+
+Compares the compiled keyword matcher against the original nested-loop
+implementation (kept below for reference) and checks both give the same
+suggestion for every item.
+
+Run from the backend directory:
+    python benchmarks/suggest_category_benchmark.py [num_items]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models.other_config as other_config
+
+
+def legacy_suggest_category(item_name: str, description: str = "") -> str:
+    """Original implementation: one substring scan per keyword (per word for word lists)"""
+    combined = f"{item_name.lower()} {description.lower()}"
+
+    for specialty in other_config.SPECIALTY_ITEMS:
+        if specialty.lower() in combined:
+            return "Specialty"
+    for costume in other_config.COSTUME_ITEMS:
+        if any(word in combined for word in costume.lower().split()):
+            return "Costume"
+    for work in other_config.WORK_WEAR:
+        if any(word in combined for word in work.lower().split()):
+            return "Work Uniform"
+    for cultural in other_config.CULTURAL_ITEMS:
+        if cultural.lower() in combined:
+            return "Cultural"
+    for religious in other_config.RELIGIOUS_ITEMS:
+        if religious.lower() in combined:
+            return "Religious"
+    for athletic in other_config.ATHLETIC_SPECIALTY:
+        if any(word in combined for word in athletic.lower().split()):
+            return "Athletic Gear"
+    for vintage in other_config.VINTAGE_ITEMS:
+        if any(word in combined for word in vintage.lower().split()):
+            return "Vintage"
+    return "Miscellaneous"
+
+
+def generate_item_names(count: int, seed: int = 42):
+    """Mix of item names that hit each category and names that match nothing"""
+    rng = random.Random(seed)
+    keywords = (
+        other_config.SPECIALTY_ITEMS + other_config.COSTUME_ITEMS + other_config.WORK_WEAR
+        + other_config.CULTURAL_ITEMS + other_config.RELIGIOUS_ITEMS
+        + other_config.ATHLETIC_SPECIALTY + other_config.VINTAGE_ITEMS
+    )
+    fillers = ["Blue", "Cozy", "Striped", "Handmade", "Oversized", "Linen", "Knit", "Item", "Piece", "Thing"]
+
+    names = []
+    for _ in range(count):
+        words = rng.sample(fillers, 2)
+        if rng.random() < 0.5:
+            words.insert(rng.randint(0, 2), rng.choice(keywords))
+        names.append(" ".join(words))
+    return names
+
+
+def time_it(func, names, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(name) for name in names]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    names = generate_item_names(count)
+
+    # Build the matcher outside the timed loop
+    other_config.suggest_category("warmup")
+
+    legacy_time, legacy_results = time_it(legacy_suggest_category, names)
+    matcher_time, matcher_results = time_it(other_config.suggest_category, names)
+
+    start = time.perf_counter()
+    batch_results = other_config.suggest_categories(names)
+    batch_time = time.perf_counter() - start
+
+    mismatches = [
+        (name, old, new) for name, old, new in zip(names, legacy_results, matcher_results) if old != new
+    ]
+
+    print(f"Items: {count}")
+    print(f"Legacy nested loops: {legacy_time * 1000:8.1f} ms ({legacy_time / count * 1e6:.2f} us/item)")
+    print(f"Keyword matcher:     {matcher_time * 1000:8.1f} ms ({matcher_time / count * 1e6:.2f} us/item)")
+    print(f"Batch (suggest_categories): {batch_time * 1000:8.1f} ms")
+    print(f"Speedup: {legacy_time / matcher_time:.1f}x")
+
+    if mismatches or batch_results != matcher_results:
+        print(f"❌ {len(mismatches)} mismatches, e.g. {mismatches[:5]}")
+        sys.exit(1)
+    print("✅ Suggestions match the original implementation")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,11 @@ CREATE TABLE IF NOT EXISTS public.clothes (
     size TEXT,
     image_url TEXT NOT NULL,
     is_owned BOOLEAN DEFAULT true NOT NULL,
+    features JSONB DEFAULT '{}'::jsonb NOT NULL,
+    display_category TEXT,
+    primary_lab REAL[],
+    secondary_lab REAL[],
+    color_family TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
 );
 
@@ -84,6 +89,10 @@ CREATE TABLE IF NOT EXISTS public.accessories (
     size TEXT,
     image_url TEXT NOT NULL,
     is_owned BOOLEAN DEFAULT true NOT NULL,
+    features JSONB DEFAULT '{}'::jsonb NOT NULL,
+    primary_lab REAL[],
+    secondary_lab REAL[],
+    color_family TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
 );
 
@@ -137,6 +146,18 @@ CREATE TABLE IF NOT EXISTS public.outfit_items (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
 );
 
+-- Remove duplicate outfit items left over from before the unique index existed
+DELETE FROM public.outfit_items a
+    USING public.outfit_items b
+    WHERE a.outfit_id = b.outfit_id
+    AND a.item_type = b.item_type
+    AND a.item_id = b.item_id
+    AND (a.created_at, a.id) > (b.created_at, b.id);
+
+-- An item can appear in an outfit only once (lets adds skip the duplicate check)
+CREATE UNIQUE INDEX IF NOT EXISTS outfit_items_outfit_item_key
+    ON public.outfit_items (outfit_id, item_type, item_id);
+
 -- Enable RLS on outfit_items
 ALTER TABLE public.outfit_items ENABLE ROW LEVEL SECURITY;
 
@@ -175,4 +196,286 @@ CREATE POLICY "Users can delete own outfit items" ON public.outfit_items
             WHERE outfits.id = outfit_items.outfit_id
             AND outfits.profile_id = auth.uid()
         )
-    );
\ No newline at end of file
+    );
+
+-- Copy an outfit and its items in one transaction, returning the new outfit with item details
+-- (same shape as outfit_service.get_outfit_by_id). Returns NULL if the outfit isn't the user's.
+CREATE OR REPLACE FUNCTION public.duplicate_outfit(p_outfit_id UUID, p_profile_id UUID, p_new_name TEXT DEFAULT NULL)
+RETURNS jsonb AS $$
+DECLARE
+  new_outfit public.outfits%ROWTYPE;
+BEGIN
+  INSERT INTO public.outfits (profile_id, name, description)
+  SELECT o.profile_id, COALESCE(p_new_name, o.name || ' (Copy)'), o.description
+  FROM public.outfits o
+  WHERE o.id = p_outfit_id AND o.profile_id = p_profile_id
+  RETURNING * INTO new_outfit;
+
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  -- Only copy items that still exist
+  INSERT INTO public.outfit_items (outfit_id, item_type, item_id)
+  SELECT new_outfit.id, oi.item_type, oi.item_id
+  FROM public.outfit_items oi
+  WHERE oi.outfit_id = p_outfit_id
+  AND (
+    (oi.item_type = 'clothing' AND EXISTS (SELECT 1 FROM public.clothes c WHERE c.id = oi.item_id))
+    OR (oi.item_type = 'accessory' AND EXISTS (SELECT 1 FROM public.accessories a WHERE a.id = oi.item_id))
+  )
+  ORDER BY oi.created_at;
+
+  RETURN to_jsonb(new_outfit) || jsonb_build_object('items', COALESCE((
+    SELECT jsonb_agg(item.details || jsonb_build_object('item_type', oi.item_type, 'outfit_item_id', oi.id) ORDER BY oi.created_at)
+    FROM public.outfit_items oi
+    CROSS JOIN LATERAL (
+      SELECT to_jsonb(c) AS details FROM public.clothes c WHERE oi.item_type = 'clothing' AND c.id = oi.item_id
+      UNION ALL
+      SELECT to_jsonb(a) FROM public.accessories a WHERE oi.item_type = 'accessory' AND a.id = oi.item_id
+    ) item
+    WHERE oi.outfit_id = new_outfit.id
+  ), '[]'::jsonb));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Garment features (per-type attributes validated against the models/*_config allowed_values).
+-- jsonb_path_ops keeps the index small and serves the features @> '{"material": "Wool"}' filters.
+ALTER TABLE public.clothes ADD COLUMN IF NOT EXISTS features JSONB DEFAULT '{}'::jsonb NOT NULL;
+ALTER TABLE public.accessories ADD COLUMN IF NOT EXISTS features JSONB DEFAULT '{}'::jsonb NOT NULL;
+
+CREATE INDEX IF NOT EXISTS clothes_features_idx ON public.clothes USING GIN (features jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS accessories_features_idx ON public.accessories USING GIN (features jsonb_path_ops);
+
+-- Display category (tops, bottoms, ...) resolved from category by the backend at write time
+-- (services/category_resolver.py); NULL for rows saved before the column existed.
+ALTER TABLE public.clothes ADD COLUMN IF NOT EXISTS display_category TEXT;
+
+CREATE INDEX IF NOT EXISTS clothes_profile_display_category_idx ON public.clothes (profile_id, display_category);
+
+-- A user's clothes grouped by display category, newest first within each group
+CREATE OR REPLACE FUNCTION public.get_categorized_clothes(p_profile_id UUID)
+RETURNS TABLE (display_category TEXT, items jsonb) AS $$
+  SELECT c.display_category, jsonb_agg(to_jsonb(c) ORDER BY c.created_at DESC)
+  FROM public.clothes c
+  WHERE c.profile_id = p_profile_id
+  GROUP BY c.display_category
+$$ LANGUAGE sql STABLE;
+
+-- Colors as CIELAB [L, a, b] (from the product image's dominant color or the color name)
+-- and the normalized color family ("navy", "gray", ...), set by services/color_service.py.
+-- NULL for rows saved before the columns existed; the backend falls back to the color name.
+ALTER TABLE public.clothes ADD COLUMN IF NOT EXISTS primary_lab REAL[];
+ALTER TABLE public.clothes ADD COLUMN IF NOT EXISTS secondary_lab REAL[];
+ALTER TABLE public.clothes ADD COLUMN IF NOT EXISTS color_family TEXT;
+ALTER TABLE public.accessories ADD COLUMN IF NOT EXISTS primary_lab REAL[];
+ALTER TABLE public.accessories ADD COLUMN IF NOT EXISTS secondary_lab REAL[];
+ALTER TABLE public.accessories ADD COLUMN IF NOT EXISTS color_family TEXT;
+
+CREATE INDEX IF NOT EXISTS clothes_profile_color_family_idx ON public.clothes (profile_id, color_family);
+CREATE INDEX IF NOT EXISTS accessories_profile_color_family_idx ON public.accessories (profile_id, color_family);
+
+-- Search: full-text (tsvector) and trigram indexes over outfits, clothes and accessories.
+-- Indexes are built on IMMUTABLE helper expressions rather than stored columns so that
+-- select("*") responses don't carry the search documents.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- String feature values (e.g. "Wool Slim") as searchable text
+CREATE OR REPLACE FUNCTION public.features_search_text(p_features JSONB)
+RETURNS TEXT AS $$
+  SELECT coalesce(string_agg(value #>> '{}', ' '), '')
+  FROM jsonb_each(coalesce(p_features, '{}'::jsonb))
+  WHERE jsonb_typeof(value) = 'string'
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION public.item_search_vector(p_name TEXT, p_category TEXT, p_primary_color TEXT, p_secondary_color TEXT, p_features JSONB)
+RETURNS tsvector AS $$
+  SELECT setweight(to_tsvector('english', coalesce(p_name, '')), 'A')
+      || setweight(to_tsvector('english', coalesce(p_category, '')), 'B')
+      || setweight(to_tsvector('english', coalesce(p_primary_color, '') || ' ' || coalesce(p_secondary_color, '')), 'C')
+      || setweight(to_tsvector('english', public.features_search_text(p_features)), 'D')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION public.item_search_text(p_name TEXT, p_category TEXT, p_primary_color TEXT, p_secondary_color TEXT, p_features JSONB)
+RETURNS TEXT AS $$
+  SELECT lower(coalesce(p_name, '') || ' ' || coalesce(p_category, '') || ' ' || coalesce(p_primary_color, '') || ' '
+      || coalesce(p_secondary_color, '') || ' ' || public.features_search_text(p_features))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION public.outfit_search_vector(p_name TEXT, p_description TEXT)
+RETURNS tsvector AS $$
+  SELECT setweight(to_tsvector('english', coalesce(p_name, '')), 'A')
+      || setweight(to_tsvector('english', coalesce(p_description, '')), 'B')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION public.outfit_search_text(p_name TEXT, p_description TEXT)
+RETURNS TEXT AS $$
+  SELECT lower(coalesce(p_name, '') || ' ' || coalesce(p_description, ''))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX IF NOT EXISTS clothes_profile_id_idx ON public.clothes (profile_id);
+CREATE INDEX IF NOT EXISTS clothes_search_vector_idx ON public.clothes
+    USING GIN (public.item_search_vector(name, category, primary_color, secondary_color, features));
+CREATE INDEX IF NOT EXISTS clothes_search_text_trgm_idx ON public.clothes
+    USING GIN (public.item_search_text(name, category, primary_color, secondary_color, features) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS accessories_profile_id_idx ON public.accessories (profile_id);
+CREATE INDEX IF NOT EXISTS accessories_search_vector_idx ON public.accessories
+    USING GIN (public.item_search_vector(name, category, primary_color, secondary_color, features));
+CREATE INDEX IF NOT EXISTS accessories_search_text_trgm_idx ON public.accessories
+    USING GIN (public.item_search_text(name, category, primary_color, secondary_color, features) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS outfits_profile_id_idx ON public.outfits (profile_id);
+CREATE INDEX IF NOT EXISTS outfits_search_vector_idx ON public.outfits
+    USING GIN (public.outfit_search_vector(name, description));
+CREATE INDEX IF NOT EXISTS outfits_search_text_trgm_idx ON public.outfits
+    USING GIN (public.outfit_search_text(name, description) gin_trgm_ops);
+
+-- Ranked, paginated search over a user's outfits, clothes and accessories.
+-- Matches whole words via full-text search and partial words / typos via trigrams;
+-- total_count is the number of matches before pagination.
+CREATE OR REPLACE FUNCTION public.search_wardrobe(
+  p_profile_id UUID,
+  p_query TEXT,
+  p_kinds TEXT[] DEFAULT ARRAY['outfit', 'clothing', 'accessory'],
+  p_limit INTEGER DEFAULT 20,
+  p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (kind TEXT, id UUID, name TEXT, rank REAL, item jsonb, total_count BIGINT) AS $$
+  WITH q AS (
+    SELECT
+      websearch_to_tsquery('english', p_query) AS tsq,
+      lower(trim(p_query)) AS term,
+      '%' || replace(replace(replace(lower(trim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+  ),
+  hits AS (
+    SELECT 'outfit'::TEXT AS kind, o.id, o.name,
+      ts_rank(public.outfit_search_vector(o.name, o.description), q.tsq)
+        + word_similarity(q.term, public.outfit_search_text(o.name, o.description)) AS rank,
+      to_jsonb(o) AS item
+    FROM public.outfits o, q
+    WHERE 'outfit' = ANY(p_kinds) AND o.profile_id = p_profile_id
+    AND (
+      public.outfit_search_vector(o.name, o.description) @@ q.tsq
+      OR public.outfit_search_text(o.name, o.description) LIKE q.pattern
+      OR q.term <% public.outfit_search_text(o.name, o.description)
+    )
+
+    UNION ALL
+
+    SELECT 'clothing'::TEXT, c.id, c.name,
+      ts_rank(public.item_search_vector(c.name, c.category, c.primary_color, c.secondary_color, c.features), q.tsq)
+        + word_similarity(q.term, public.item_search_text(c.name, c.category, c.primary_color, c.secondary_color, c.features)),
+      to_jsonb(c)
+    FROM public.clothes c, q
+    WHERE 'clothing' = ANY(p_kinds) AND c.profile_id = p_profile_id
+    AND (
+      public.item_search_vector(c.name, c.category, c.primary_color, c.secondary_color, c.features) @@ q.tsq
+      OR public.item_search_text(c.name, c.category, c.primary_color, c.secondary_color, c.features) LIKE q.pattern
+      OR q.term <% public.item_search_text(c.name, c.category, c.primary_color, c.secondary_color, c.features)
+    )
+
+    UNION ALL
+
+    SELECT 'accessory'::TEXT, a.id, a.name,
+      ts_rank(public.item_search_vector(a.name, a.category, a.primary_color, a.secondary_color, a.features), q.tsq)
+        + word_similarity(q.term, public.item_search_text(a.name, a.category, a.primary_color, a.secondary_color, a.features)),
+      to_jsonb(a)
+    FROM public.accessories a, q
+    WHERE 'accessory' = ANY(p_kinds) AND a.profile_id = p_profile_id
+    AND (
+      public.item_search_vector(a.name, a.category, a.primary_color, a.secondary_color, a.features) @@ q.tsq
+      OR public.item_search_text(a.name, a.category, a.primary_color, a.secondary_color, a.features) LIKE q.pattern
+      OR q.term <% public.item_search_text(a.name, a.category, a.primary_color, a.secondary_color, a.features)
+    )
+  )
+  SELECT kind, id, name, rank::REAL, item, count(*) OVER () AS total_count
+  FROM hits
+  ORDER BY rank DESC, name, id
+  LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
+
+-- Create gemini_usage table (aggregated Gemini token usage, flushed periodically by the backend)
+CREATE TABLE IF NOT EXISTS public.gemini_usage (
+    id BIGSERIAL PRIMARY KEY,
+    profile_id UUID REFERENCES public.profiles(id) ON DELETE SET NULL,
+    endpoint TEXT NOT NULL,
+    model TEXT,
+    operation TEXT,
+    calls INTEGER DEFAULT 0 NOT NULL,
+    input_tokens BIGINT DEFAULT 0 NOT NULL,
+    output_tokens BIGINT DEFAULT 0 NOT NULL,
+    image_input_tokens BIGINT DEFAULT 0 NOT NULL,
+    image_output_tokens BIGINT DEFAULT 0 NOT NULL,
+    cached_tokens BIGINT DEFAULT 0 NOT NULL,
+    cache_hits INTEGER DEFAULT 0 NOT NULL,
+    latency_ms_total DOUBLE PRECISION DEFAULT 0 NOT NULL,
+    cost_usd NUMERIC(14, 6) DEFAULT 0 NOT NULL,
+    items_ingested INTEGER DEFAULT 0 NOT NULL,
+    window_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    window_end TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Enable RLS on gemini_usage (written by the service role only)
+ALTER TABLE public.gemini_usage ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own gemini usage" ON public.gemini_usage
+    FOR SELECT USING (auth.uid() = profile_id);
+
+CREATE INDEX IF NOT EXISTS gemini_usage_profile_window_idx ON public.gemini_usage (profile_id, window_end);
+CREATE INDEX IF NOT EXISTS gemini_usage_endpoint_window_idx ON public.gemini_usage (endpoint, window_end);
+
+-- Flushed usage summed per (user, endpoint, model, operation), for all users or one
+CREATE OR REPLACE FUNCTION public.gemini_usage_totals(p_profile_id UUID DEFAULT NULL)
+RETURNS TABLE (
+  profile_id UUID, endpoint TEXT, model TEXT, operation TEXT,
+  calls BIGINT, input_tokens NUMERIC, output_tokens NUMERIC, image_input_tokens NUMERIC,
+  image_output_tokens NUMERIC, cached_tokens NUMERIC, cache_hits BIGINT,
+  latency_ms_total DOUBLE PRECISION, cost_usd NUMERIC, items_ingested BIGINT
+) AS $$
+  SELECT u.profile_id, u.endpoint, u.model, u.operation,
+    sum(u.calls), sum(u.input_tokens), sum(u.output_tokens), sum(u.image_input_tokens),
+    sum(u.image_output_tokens), sum(u.cached_tokens), sum(u.cache_hits),
+    sum(u.latency_ms_total), sum(u.cost_usd), sum(u.items_ingested)
+  FROM public.gemini_usage u
+  WHERE p_profile_id IS NULL OR u.profile_id = p_profile_id
+  GROUP BY u.profile_id, u.endpoint, u.model, u.operation
+  ORDER BY u.profile_id, u.endpoint, u.model, u.operation
+$$ LANGUAGE sql STABLE;
+
+-- Create batch_jobs table (file-based Gemini batch extraction jobs; written by the service role)
+CREATE TABLE IF NOT EXISTS public.batch_jobs (
+    job_name TEXT PRIMARY KEY,
+    profile_id UUID REFERENCES public.profiles(id) ON DELETE SET NULL,
+    status TEXT DEFAULT 'submitted' NOT NULL,
+    items JSONB DEFAULT '[]'::jsonb NOT NULL,
+    total_items INTEGER DEFAULT 0 NOT NULL,
+    successful_items INTEGER DEFAULT 0 NOT NULL,
+    error TEXT,
+    -- File API files uploaded for the job (image, JSONL requests), deleted once results are processed
+    artifacts JSONB DEFAULT '[]'::jsonb NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Create batch_job_items table (one extracted item per row, written while streaming the result file)
+CREATE TABLE IF NOT EXISTS public.batch_job_items (
+    id BIGSERIAL PRIMARY KEY,
+    job_name TEXT NOT NULL REFERENCES public.batch_jobs(job_name) ON DELETE CASCADE,
+    item_index INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    success BOOLEAN DEFAULT FALSE NOT NULL,
+    image_url TEXT,
+    description TEXT,
+    error TEXT,
+    UNIQUE (job_name, item_index)
+);
+
+-- For databases created before batch_jobs tracked uploaded files
+ALTER TABLE public.batch_jobs ADD COLUMN IF NOT EXISTS artifacts JSONB DEFAULT '[]'::jsonb NOT NULL;
+
+ALTER TABLE public.batch_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.batch_job_items ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own batch jobs" ON public.batch_jobs
+    FOR SELECT USING (auth.uid() = profile_id);
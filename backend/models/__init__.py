@@ -58,4 +58,25 @@ __all__ = [
     'Pajamas', 'Nightgown', 'Robe',
     # Other
     'Other'
-]
\ No newline at end of file
+]
+
+def _check_feature_fields() -> None:
+    """
+    Keep each model's FEATURE_FIELDS in step with the optional params of its
+    PARAMETER_CONFIG entry (Other keeps its own free-form fields).
+    """
+    from importlib import import_module
+
+    for category in ("tops", "bottoms", "footwear", "outerwear", "accessories",
+                     "undergarments", "dresses", "sleepwear"):
+        config = import_module(f"{__name__}.{category}_config")
+        for clothing_type, params in config.PARAMETER_CONFIG.items():
+            expected = tuple(params["optional_params"] or ())
+            declared = globals()[clothing_type].FEATURE_FIELDS
+            if declared != expected:
+                raise TypeError(
+                    f"{clothing_type}.FEATURE_FIELDS {declared} doesn't match its optional params {expected}"
+                )
+
+
+_check_feature_fields()
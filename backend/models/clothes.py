@@ -1,6 +1,21 @@
+import weakref
+from typing import Any, Dict, Optional
 from PIL import Image
 
 class Clothes:
+    """
+    Base garment record.
+
+    Slotted so each item stays small, with subclasses declaring their
+    type-specific attributes in FEATURE_FIELDS. The source image is held
+    through a weak reference so identified items don't keep the whole
+    outfit photo alive after processing.
+    """
+
+    # Type-specific attribute names, declared by each subclass
+    FEATURE_FIELDS = ()
+    __slots__ = ("id", "clothing_category", "name", "primary_color", "secondary_color", "is_owned", "_image_ref")
+
     def __init__(self, id, clothing_category, name, primary_color, secondary_color, image, is_owned=True):
         self.id = id
         self.clothing_category = clothing_category
@@ -8,4 +23,29 @@ class Clothes:
         self.primary_color = primary_color
         self.secondary_color = secondary_color
         self.image = image
-        self.is_owned = is_owned
\ No newline at end of file
+        self.is_owned = is_owned
+
+    @property
+    def image(self) -> Optional[Image.Image]:
+        """The source image, or None once nothing else holds a reference to it"""
+        return self._image_ref() if self._image_ref is not None else None
+
+    @image.setter
+    def image(self, image: Optional[Image.Image]):
+        if image is None:
+            self._image_ref = None
+            return
+        try:
+            self._image_ref = weakref.ref(image)
+        except TypeError:
+            # Objects that don't support weak references are held directly
+            self._image_ref = lambda: image
+
+    def features(self) -> Dict[str, Any]:
+        """Type-specific attributes that are set, e.g. {"material": "Wool"}"""
+        features = {}
+        for field in self.FEATURE_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                features[field] = value
+        return features
@@ -2,28 +2,43 @@ from .clothes import Clothes
 
 
 class CasualDress(Clothes):
+    FEATURE_FIELDS = ("length",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, length="Knee-Length"):
         super().__init__(id, "Casual Dress", name, primary_color, secondary_color, image)
         self.length = length
 
 class FormalDress(Clothes):
+    FEATURE_FIELDS = ("length",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, length="Floor-Length"):
         super().__init__(id, "Formal Dress", name, primary_color, secondary_color, image)
         self.length = length
 
 class MaxiDress(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Maxi Dress", name, primary_color, secondary_color, image)
 
 class MiniDress(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Mini Dress", name, primary_color, secondary_color, image)
 
 class Jumpsuit(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Long"):
         super().__init__(id, "Jumpsuit", name, primary_color, secondary_color, image)
         self.style = style
 
 class Romper(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Romper", name, primary_color, secondary_color, image)
\ No newline at end of file
@@ -2,36 +2,57 @@ from .clothes import Clothes
 
 
 class Sneakers(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Athletic"):
         super().__init__(id, "Sneakers", name, primary_color, secondary_color, image)
         self.style = style
 
 class DressShoes(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Oxford"):
         super().__init__(id, "Dress Shoes", name, primary_color, secondary_color, image)
         self.style = style
 
 class Boots(Clothes):
+    FEATURE_FIELDS = ("height",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, height="Ankle"):
         super().__init__(id, "Boots", name, primary_color, secondary_color, image)
         self.height = height
 
 class Sandals(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Flat"):
         super().__init__(id, "Sandals", name, primary_color, secondary_color, image)
         self.style = style
 
 class Flats(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Ballet"):
         super().__init__(id, "Flats", name, primary_color, secondary_color, image)
         self.style = style
 
 class Heels(Clothes):
+    FEATURE_FIELDS = ("height",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, height="Medium"):
         super().__init__(id, "Heels", name, primary_color, secondary_color, image)
         self.height = height
 
 class AthleticShoes(Clothes):
+    FEATURE_FIELDS = ("sport",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, sport="Running"):
         super().__init__(id, "Athletic Shoes", name, primary_color, secondary_color, image)
         self.sport = sport
\ No newline at end of file
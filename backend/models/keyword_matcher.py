@@ -0,0 +1,86 @@
+"""
+Multi-keyword substring matcher (Aho-Corasick automaton).
+
+Finds which of many keywords occur anywhere in a text in a single pass over
+the text, instead of one substring search per keyword. Each keyword carries a
+priority; `best_match` returns the lowest priority among the keywords found.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive Aho-Corasick matcher over (keyword, priority) pairs.
+
+    Example:
+        >>> matcher = KeywordMatcher([("apron", 0), ("costume", 1)])
+        >>> matcher.best_match("Kitchen Apron")
+        0
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        # Trie transitions, failure links, and the best priority ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+
+        for keyword, priority in keywords:
+            self._add(keyword.lower(), priority)
+
+        self._min_priority = min((p for p in self._best if p is not None), default=None)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, priority: int) -> None:
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            state = next_state
+        current = self._best[state]
+        self._best[state] = priority if current is None else min(current, priority)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+
+                # A state also matches every keyword that is a suffix of it
+                inherited = self._best[self._fail[next_state]]
+                if inherited is not None:
+                    current = self._best[next_state]
+                    self._best[next_state] = inherited if current is None else min(current, inherited)
+
+    def best_match(self, text: str) -> Optional[int]:
+        """Lowest priority of any keyword occurring in text, or None if none occur"""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best = None
+
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            priority = best_at[state]
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == self._min_priority:
+                    break
+
+        return best
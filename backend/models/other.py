@@ -13,6 +13,9 @@ class Other(Clothes):
     Includes a suggestion system to help categorize items appropriately.
     """
     
+    FEATURE_FIELDS = ("item_type", "suggested_category")
+    __slots__ = FEATURE_FIELDS
+    
     def __init__(self, id: Optional[int], name: str, primary_color: str, 
                  secondary_color: str, image: Image.Image, 
                  item_type: str = "Unknown", suggested_category: str = "other"):
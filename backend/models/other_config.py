@@ -3,7 +3,9 @@ Configuration for 'other' clothing category for unclassified or miscellaneous it
 This category handles any clothing that doesn't fit into the standard categories.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from .keyword_matcher import KeywordMatcher
 
 # Available clothing types in the other category
 CLOTHING_TYPES = [
@@ -243,6 +245,34 @@ def get_allowed_values(clothing_type: str, parameter: str) -> List[Any]:
     config = PARAMETER_CONFIG[clothing_type]
     return config.get("allowed_values", {}).get(parameter, [])
 
+# Suggested categories in precedence order, with whether the whole phrase must
+# appear ("phrase") or any single word of it is enough ("word")
+SUGGESTION_RULES = [
+    ("Specialty", SPECIALTY_ITEMS, "phrase"),
+    ("Costume", COSTUME_ITEMS, "word"),
+    ("Work Uniform", WORK_WEAR, "word"),
+    ("Cultural", CULTURAL_ITEMS, "phrase"),
+    ("Religious", RELIGIOUS_ITEMS, "phrase"),
+    ("Athletic Gear", ATHLETIC_SPECIALTY, "word"),
+    ("Vintage", VINTAGE_ITEMS, "word"),
+]
+
+_suggestion_matcher = None
+
+def _get_suggestion_matcher() -> KeywordMatcher:
+    """Compile all suggestion keywords into one matcher (built on first use)"""
+    global _suggestion_matcher
+    if _suggestion_matcher is None:
+        keywords = []
+        for priority, (_, items, mode) in enumerate(SUGGESTION_RULES):
+            for item in items:
+                if mode == "phrase":
+                    keywords.append((item, priority))
+                else:
+                    keywords.extend((word, priority) for word in item.lower().split())
+        _suggestion_matcher = KeywordMatcher(keywords)
+    return _suggestion_matcher
+
 def suggest_category(item_name: str, description: str = "") -> str:
     """
     Suggest a more specific category for an 'Other' item based on its name and description.
@@ -254,43 +284,23 @@ def suggest_category(item_name: str, description: str = "") -> str:
     Returns:
         str: Suggested category
     """
-    item_lower = item_name.lower()
-    desc_lower = description.lower()
-    combined = f"{item_lower} {desc_lower}"
-    
-    # Check for specialty items
-    for specialty in SPECIALTY_ITEMS:
-        if specialty.lower() in combined:
-            return "Specialty"
-    
-    # Check for costume items
-    for costume in COSTUME_ITEMS:
-        if any(word in combined for word in costume.lower().split()):
-            return "Costume"
-    
-    # Check for work wear
-    for work in WORK_WEAR:
-        if any(word in combined for word in work.lower().split()):
-            return "Work Uniform"
-    
-    # Check for cultural items
-    for cultural in CULTURAL_ITEMS:
-        if cultural.lower() in combined:
-            return "Cultural"
+    combined = f"{item_name.lower()} {description.lower()}"
     
-    # Check for religious items
-    for religious in RELIGIOUS_ITEMS:
-        if religious.lower() in combined:
-            return "Religious"
-    
-    # Check for athletic specialty
-    for athletic in ATHLETIC_SPECIALTY:
-        if any(word in combined for word in athletic.lower().split()):
-            return "Athletic Gear"
-    
-    # Check for vintage items
-    for vintage in VINTAGE_ITEMS:
-        if any(word in combined for word in vintage.lower().split()):
-            return "Vintage"
+    priority = _get_suggestion_matcher().best_match(combined)
+    if priority is None:
+        return "Miscellaneous"
+    return SUGGESTION_RULES[priority][0]
+
+def suggest_categories(item_names: List[str], descriptions: Optional[List[str]] = None) -> List[str]:
+    """
+    Suggest categories for many 'Other' items at once.
     
-    return "Miscellaneous"
\ No newline at end of file
+    Args:
+        item_names (List[str]): Names of the clothing items
+        descriptions (Optional[List[str]]): Optional descriptions, aligned with item_names
+        
+    Returns:
+        List[str]: Suggested category for each item
+    """
+    descriptions = descriptions or [""] * len(item_names)
+    return [suggest_category(name, description) for name, description in zip(item_names, descriptions)]
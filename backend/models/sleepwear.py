@@ -2,16 +2,25 @@ from .clothes import Clothes
 
 
 class Pajamas(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Set"):
         super().__init__(id, "Pajamas", name, primary_color, secondary_color, image)
         self.style = style
 
 class Nightgown(Clothes):
+    FEATURE_FIELDS = ("length",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, length="Knee-Length"):
         super().__init__(id, "Nightgown", name, primary_color, secondary_color, image)
         self.length = length
 
 class Robe(Clothes):
+    FEATURE_FIELDS = ("material",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, material="Cotton"):
         super().__init__(id, "Robe", name, primary_color, secondary_color, image)
         self.material = material
\ No newline at end of file
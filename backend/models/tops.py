@@ -2,43 +2,67 @@ from .clothes import Clothes
 
 
 class TShirt(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Shirt", name, primary_color, secondary_color, image)
 
 class DressShirt(Clothes):
+    FEATURE_FIELDS = ("pattern",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, pattern=None):
         super().__init__(id, "Dress Shirt", name, primary_color, secondary_color, image)
         self.pattern = pattern
 
 class Blouse(Clothes):
+    FEATURE_FIELDS = ("sleeve_type",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, sleeve_type="Long"):
         super().__init__(id, "Blouse", name, primary_color, secondary_color, image)
         self.sleeve_type = sleeve_type
 
 class TankTop(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Tank Top", name, primary_color, secondary_color, image)
 
 class Sweater(Clothes):
+    FEATURE_FIELDS = ("material",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, material="Cotton"):
         super().__init__(id, "Sweater", name, primary_color, secondary_color, image)
         self.material = material
 
 class Hoodie(Clothes):
+    FEATURE_FIELDS = ("has_zipper",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, has_zipper=False):
         super().__init__(id, "Hoodie", name, primary_color, secondary_color, image)
         self.has_zipper = has_zipper
 
 class Sweatshirt(Clothes):
+    __slots__ = ()
+
     def __init__(self, id, name, primary_color, secondary_color, image):
         super().__init__(id, "Sweatshirt", name, primary_color, secondary_color, image)
 
 class Cardigan(Clothes):
+    FEATURE_FIELDS = ("material",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, material="Wool"):
         super().__init__(id, "Cardigan", name, primary_color, secondary_color, image)
         self.material = material
 
 class WorkoutTop(Clothes):
+    FEATURE_FIELDS = ("style",)
+    __slots__ = FEATURE_FIELDS
+
     def __init__(self, id, name, primary_color, secondary_color, image, style="Tank"):
         super().__init__(id, "Workout Top", name, primary_color, secondary_color, image)
         self.style = style
\ No newline at end of file
@@ -1,6 +1,10 @@
 from PIL import Image
 import os
 import glob
+import logging
+
+# Child of the application logger so records go through its queue handler
+logger = logging.getLogger(f"dripdrop.{__name__}")
 
 def pad_image_to_aspect_ratio(img, target_width=None, target_height=None):
     """
@@ -21,7 +25,7 @@ def pad_image_to_aspect_ratio(img, target_width=None, target_height=None):
     try:
         width, height = img.size
         
-        print(f"Processing image (original size: {width}x{height})")
+        logger.debug("Processing image (original size: %sx%s)", width, height)
         
         # Determine target dimensions
         if target_width is None and target_height is None:
@@ -38,7 +42,7 @@ def pad_image_to_aspect_ratio(img, target_width=None, target_height=None):
         
         # If the image is already the target size, return it as is
         if width == target_width and height == target_height:
-            print(f"Image already matches target size: {target_width}x{target_height}")
+            logger.debug("Image already matches target size: %sx%s", target_width, target_height)
             return img
         
         # Create a new white image with the target size
@@ -67,12 +71,12 @@ def pad_image_to_aspect_ratio(img, target_width=None, target_height=None):
         # Paste the resized image onto the white background
         padded_img.paste(resized_img, (x_offset, y_offset))
         
-        print(f"Successfully padded to size: {target_width}x{target_height}")
+        logger.debug("Successfully padded to size: %sx%s", target_width, target_height)
         
         return padded_img
         
     except Exception as e:
-        print(f"Error processing image: {str(e)}")
+        logger.error("Error processing image: %s", str(e))
         return None
 
 def pad_image_to_square(img):
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
 from typing import List, Optional
 import json
 
@@ -14,7 +14,11 @@ from services.accessory_service import (
     upload_accessory_image_to_supabase,
     smart_save_accessory_item
 )
+from services.color_service import count_color_families
+from services.similarity_service import find_similar_items, ITEM_TABLES, MAX_SIMILAR_RESULTS
 from services.image_processing import process_uploaded_image, image_to_base64
+from services.clothing_identifier import parse_feature_filters
+from services.usage_accounting import record_items_ingested
 
 router = APIRouter()
 
@@ -43,6 +47,7 @@ async def create_accessory_smart(
             is_owned=is_owned,
             image=image
         )
+        record_items_ingested(1)
 
         return {
             "message": "Accessory created successfully",
@@ -84,7 +89,8 @@ async def create_accessory_basic(
             secondary_color=secondary_color,
             size=size,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         return {
@@ -97,23 +103,34 @@ async def create_accessory_basic(
 
 @router.get("/accessories")
 async def get_accessories(
+    request: Request,
     owned_only: Optional[bool] = None,
     category: Optional[str] = None,
     user_id: str = Depends(verify_token)
 ):
-    """Get all accessories for the current user"""
+    """Get all accessories for the current user; any other query params filter on features (e.g. material=Wool)"""
     try:
 
+        try:
+            features = parse_feature_filters({
+                key: value for key, value in request.query_params.items()
+                if key not in ("owned_only", "category")
+            })
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         if category:
-            accessories = await get_accessories_by_category(user_id, category, owned_only)
+            accessories = await get_accessories_by_category(user_id, category, owned_only, features)
         else:
-            accessories = await get_user_accessories(user_id, owned_only)
+            accessories = await get_user_accessories(user_id, owned_only, features)
 
         return {
             "accessories": accessories,
             "total": len(accessories)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting accessories: {str(e)}")
 
@@ -149,6 +166,38 @@ async def get_accessory(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting accessory: {str(e)}")
 
+@router.get("/accessories/{accessory_id}/similar")
+async def get_similar_accessories(
+    accessory_id: str,
+    k: int = 10,
+    types: Optional[str] = None,  # Comma-separated subset of clothing,accessory
+    user_id: str = Depends(verify_token)
+):
+    """Get the current user's items that look most like this accessory"""
+    try:
+        if k < 1 or k > MAX_SIMILAR_RESULTS:
+            raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_SIMILAR_RESULTS}")
+
+        item_types = [item_type.strip() for item_type in types.split(",") if item_type.strip()] if types else None
+        if item_types and any(item_type not in ITEM_TABLES for item_type in item_types):
+            raise HTTPException(status_code=400, detail=f"types must be a comma-separated subset of {', '.join(ITEM_TABLES)}")
+
+        similar = await find_similar_items(user_id, "accessory", accessory_id, k, item_types)
+
+        if similar is None:
+            raise HTTPException(status_code=404, detail="Accessory not found or has no indexed image")
+
+        return {
+            "accessory_id": accessory_id,
+            "similar": similar,
+            "total": len(similar)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar items: {str(e)}")
+
 @router.put("/accessories/{accessory_id}")
 async def update_accessory(
     accessory_id: str,
@@ -245,7 +294,8 @@ async def get_accessories_summary(user_id: str = Depends(verify_token)):
             "owned_accessories": len(owned_accessories),
             "wishlist_accessories": len(all_accessories) - len(owned_accessories),
             "total_categories": len(categories),
-            "categories": categories
+            "categories": categories,
+            "colors": count_color_families(all_accessories)
         }
 
     except Exception as e:
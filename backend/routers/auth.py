@@ -1,27 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-from jose import JWTError, jwt
-import os
+from jose import JOSEError
 from typing import Optional
-from supabase import create_client, Client
-from dotenv import load_dotenv
 
-load_dotenv()
+from services.authService import get_supabase_client
+from services.jwt_verifier import verify_access_token_async
+from services.logger import get_logger
+from services.request_context import current_user_id
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
 
-# Supabase configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
-
-if not all([SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_JWT_SECRET]):
-    raise ValueError("Missing required Supabase environment variables")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
 class UserSignUp(BaseModel):
     email: EmailStr
     password: str
@@ -35,24 +27,24 @@ class UserResponse(BaseModel):
     email: str
     created_at: str
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token from Supabase"""
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Verify JWT token from Supabase and attribute the rest of the request to the user
+    
+    Verified tokens are cached until they expire (see jwt_verifier), so repeat
+    requests with the same token skip signature verification.
+    """
     try:
-        payload = jwt.decode(
-            credentials.credentials, 
-            SUPABASE_JWT_SECRET, 
-            algorithms=["HS256"],
-            audience="authenticated"
-        )
-        user_id: str = payload.get("sub")
+        user_id: str = await verify_access_token_async(credentials.credentials)
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        current_user_id.set(user_id)
         return user_id
-    except JWTError:
+    except JOSEError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -63,6 +55,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
 async def signup(user: UserSignUp):
     """Sign up a new user"""
     try:
+        supabase = get_supabase_client()
         response = supabase.auth.sign_up({
             "email": user.email,
             "password": user.password
@@ -81,7 +74,7 @@ async def signup(user: UserSignUp):
                 supabase.table("profiles").insert(profile_data).execute()
             except Exception as profile_error:
                 # Profile creation failed, but user was created
-                print(f"Profile creation failed: {profile_error}")
+                logger.warning("Profile creation failed: %s", profile_error)
             
             return {
                 "message": "User created successfully",
@@ -105,6 +98,7 @@ async def signup(user: UserSignUp):
 async def signin(user: UserSignIn):
     """Sign in user"""
     try:
+        supabase = get_supabase_client()
         response = supabase.auth.sign_in_with_password({
             "email": user.email,
             "password": user.password
@@ -135,6 +129,7 @@ async def signin(user: UserSignIn):
 async def get_current_user(user_id: str = Depends(verify_token)):
     """Get current user information"""
     try:
+        supabase = get_supabase_client()
         response = supabase.table("profiles").select("*").eq("id", user_id).execute()
         
         if response.data:
@@ -159,6 +154,7 @@ async def get_current_user(user_id: str = Depends(verify_token)):
 async def signout(user_id: str = Depends(verify_token)):
     """Sign out user"""
     try:
+        supabase = get_supabase_client()
         response = supabase.auth.sign_out()
         return {"message": "Sign out successful"}
     except Exception as e:
@@ -1,11 +1,15 @@
 import time
-import json
-from typing import List
-from fastapi import APIRouter, File, UploadFile, Form, Depends
+from typing import List, Optional
+from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException
 
-from services import clothing_service
+from services import clothing_service, usage_accounting
+from services.image_processing import process_uploaded_image
+from services.image_handles import get_image_part_async
+from services.logger import get_logger, SAMPLED
 from .auth import verify_token
 
+logger = get_logger(__name__)
+
 router = APIRouter(prefix="/api", tags=["clothing-analysis"])
 
 @router.post("/extract-clothing")
@@ -74,68 +78,36 @@ async def itemize_clothing(
         outfit_items = await clothing_service.identify_clothing_items(image)
         saved_items = []
         
-        # Process and save clothing items
-        for item in outfit_items["clothing_items"]:
-            try:
-                # Create a temporary image URL (we'll update with real images later if needed)
-                temp_image_url = f"temp://itemized-{int(time.time())}"
-                
-                # Extract item details
-                item_name = item.get("name", "Unknown Item")
-                item_type = item.get("type", "clothing")
-                primary_color = item.get("primary_color")
-                secondary_color = item.get("secondary_color")
-                
-                # Save to database
-                saved_item = await clothing_service.save_clothing_item_to_db(
-                    user_id=user_id,
-                    name=item_name,
-                    category=item_type.lower(),
-                    primary_color=primary_color,
-                    secondary_color=secondary_color,
-                    image_url=temp_image_url,
-                    features=item.get("features", {})
-                )
-                
-                # Add saved item info to the response
-                item["saved_item_id"] = saved_item["id"]
-                saved_items.append(saved_item)
-                
-            except Exception as save_error:
-                print(f"Error saving clothing item {item.get('name', 'unknown')}: {save_error}")
-                item["save_error"] = str(save_error)
+        # Save clothing items and accessories in one insert
+        # (accessories are stored in the clothes table here as well)
+        temp_image_url = f"temp://itemized-{int(time.time())}"
+        detected = (
+            [(item, "Unknown Item", "clothing") for item in outfit_items["clothing_items"]]
+            + [(item, "Unknown Accessory", "accessory") for item in outfit_items["accessories"]]
+        )
+        rows = [
+            {
+                "name": item.get("name", default_name),
+                "category": item.get("type", default_type).lower(),
+                "primary_color": item.get("primary_color"),
+                "secondary_color": item.get("secondary_color"),
+                "image_url": temp_image_url,
+                "features": item.get("features", {})
+            }
+            for item, default_name, default_type in detected
+        ]
+        results = await clothing_service.save_clothing_items_to_db(user_id, rows)
         
-        # Process and save accessories
-        for item in outfit_items["accessories"]:
-            try:
-                # Create a temporary image URL
-                temp_image_url = f"temp://itemized-{int(time.time())}"
-                
-                # Extract item details
-                item_name = item.get("name", "Unknown Accessory")
-                item_type = item.get("type", "accessory")
-                primary_color = item.get("primary_color")
-                secondary_color = item.get("secondary_color")
-                
-                # Save to database
-                saved_item = await clothing_service.save_clothing_item_to_db(
-                    user_id=user_id,
-                    name=item_name,
-                    category=item_type.lower(),
-                    primary_color=primary_color,
-                    secondary_color=secondary_color,
-                    image_url=temp_image_url,
-                    features=item.get("features", {})
-                )
-                
+        for (item, _, default_type), result in zip(detected, results):
+            if result["success"]:
                 # Add saved item info to the response
-                item["saved_item_id"] = saved_item["id"]
-                saved_items.append(saved_item)
-                
-            except Exception as save_error:
-                print(f"Error saving accessory {item.get('name', 'unknown')}: {save_error}")
-                item["save_error"] = str(save_error)
+                item["saved_item_id"] = result["data"]["id"]
+                saved_items.append(result["data"])
+            else:
+                logger.error("Error saving %s %s: %s", default_type, item.get('name', 'unknown'), result["error"])
+                item["save_error"] = result["error"]
         
+        usage_accounting.record_items_ingested(len(saved_items))
         return {
             "success": True,
             "clothing_items": outfit_items["clothing_items"],
@@ -154,6 +126,32 @@ async def itemize_clothing(
             "accessories": []
         }
 
+@router.post("/extract-clothes")
+async def extract_clothes(
+    image: UploadFile = File(...),
+    clothing_items: str = Form(...),
+    deadline_ms: Optional[int] = Form(None),
+    user_id: str = Depends(verify_token)
+):
+    """
+    Extract specific clothing items, letting the server choose concurrent or batch mode
+    
+    Args:
+        image: Single image containing clothing items
+        clothing_items: JSON string array of specific clothing items to extract
+        deadline_ms: Optional latency budget; short budgets always run concurrently
+    """
+    try:
+        result = await clothing_service.extract_clothing_items(image, clothing_items, user_id, deadline_ms)
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error extracting clothing items: {str(e)}",
+            "extracted_images": []
+        }
+
 @router.post("/extract-clothes-specific")
 async def extract_clothes_specific(
     image: UploadFile = File(...),
@@ -204,7 +202,8 @@ async def extract_clothes_batch(
 @router.post("/extract-clothes-batch-file")
 async def extract_clothes_batch_file(
     image: UploadFile = File(...),
-    clothing_items: str = Form(...)
+    clothing_items: str = Form(...),
+    user_id: str = Depends(verify_token)
 ):
     """
     Extract specific clothing items using file-based batch mode for large requests
@@ -214,7 +213,7 @@ async def extract_clothes_batch_file(
         clothing_items: JSON string array of specific clothing items to extract
     """
     try:
-        result = await clothing_service.extract_specific_clothing_items_batch_file(image, clothing_items)
+        result = await clothing_service.extract_specific_clothing_items_batch_file(image, clothing_items, user_id)
         return result
         
     except Exception as e:
@@ -224,24 +223,33 @@ async def extract_clothes_batch_file(
             "batch_job_id": None
         }
 
-@router.get("/batch-status/{batch_job_id}")
-async def get_batch_status(batch_job_id: str):
+@router.get("/batch-status/{batch_job_id:path}")
+async def get_batch_status(
+    batch_job_id: str,
+    offset: int = 0,
+    limit: int = 20,
+    user_id: str = Depends(verify_token)
+):
     """
-    Check the status of a batch job and retrieve results if completed
+    Check the status of one of the user's batch jobs and retrieve a page of results if completed
     
     Args:
-        batch_job_id: The ID of the batch job to check
+        batch_job_id: The ID of the batch job to check (e.g. batches/abc123)
+        offset: Index of the first item result to return
+        limit: Number of item results to return (max 100)
     """
     try:
-        result = clothing_service.check_batch_status(batch_job_id)
-        return result
-        
+        result = await clothing_service.check_batch_status(batch_job_id, user_id, offset, limit)
     except Exception as e:
         return {
             "success": False,
             "status": "error",
             "error": f"Error checking batch status: {str(e)}"
         }
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return result
 
 @router.post("/extract-clothes-concurrent")
 async def extract_clothes_concurrent(
@@ -279,12 +287,17 @@ async def add_fit_to_wardrobe(
         image: Single image containing clothing items
     """
     try:
-        print(f"Starting add_fit_to_wardrobe for user: {user_id}, image: {image.filename}")
+        logger.info("Starting add_fit_to_wardrobe for user: %s, image: %s", user_id, image.filename)
+        
+        # Decode the photo once and upload it once; identification and every
+        # extraction request reference the same image part
+        processed_image = process_uploaded_image(image)
+        image_part = await get_image_part_async(processed_image)
         
         # Step 1: Itemize the clothing in the image
-        print("Step 1: Itemizing clothing items...")
-        outfit_items = await clothing_service.identify_clothing_items(image)
-        print(f"Found {len(outfit_items.get('clothing_items', []))} clothing items and {len(outfit_items.get('accessories', []))} accessories")
+        logger.info("Step 1: Itemizing clothing items...")
+        outfit_items = clothing_service.itemize_photo(processed_image, image_part)
+        logger.info("Found %s clothing items and %s accessories", len(outfit_items.get('clothing_items', [])), len(outfit_items.get('accessories', [])))
         
         if not outfit_items["clothing_items"] and not outfit_items["accessories"]:
             return {
@@ -294,7 +307,7 @@ async def add_fit_to_wardrobe(
             }
         
         # Step 2: Prepare items for extraction
-        print("Step 2: Preparing items for extraction...")
+        logger.info("Step 2: Preparing items for extraction...")
         all_items = []
         for item in outfit_items["clothing_items"]:
             all_items.append({
@@ -316,13 +329,12 @@ async def add_fit_to_wardrobe(
         
         # Step 3: Extract images for all items concurrently
         item_names = [item["name"] for item in all_items]
-        print(f"Step 3: Extracting {len(item_names)} items concurrently: {item_names}")
-        
-        # Reset the image file pointer to the beginning so it can be read again
-        await image.seek(0)
+        logger.info("Step 3: Extracting %s items concurrently: %s", len(item_names), item_names)
         
-        extraction_result = await clothing_service.extract_specific_clothing_items_concurrent(image, json.dumps(item_names))
-        print(f"Extraction completed, success: {extraction_result.get('success', False)}")
+        extraction_result = await clothing_service.extract_clothing_items_from_image(
+            processed_image, item_names, image_part=image_part, filename=image.filename
+        )
+        logger.info("Extraction completed, success: %s", extraction_result.get('success', False))
         
         if not extraction_result.get("success", False):
             return {
@@ -331,73 +343,69 @@ async def add_fit_to_wardrobe(
                 "saved_items": []
             }
         
-        # Step 4: Save items to database with uploaded images
-        print("Step 4: Saving items to database with uploaded images...")
+        # Step 4: Upload extracted images, then save all items in one insert
+        logger.info("Step 4: Saving items to database with uploaded images...")
         saved_items = []
         extraction_map = {ext["item"]: ext for ext in extraction_result.get("extracted_images", [])}
-        print(f"Extraction map has {len(extraction_map)} items")
+        logger.info("Extraction map has %s items", len(extraction_map))
         
+        rows = []
         for item in all_items:
-            try:
-                item_name = item["name"]
-                extracted_item = extraction_map.get(item_name)
-                
-                if extracted_item and extracted_item.get("success") and extracted_item.get("generated_image_base64"):
-                    # Upload image to Supabase storage
-                    try:
-                        filename = f"{item_name.replace(' ', '-').lower()}-{int(time.time())}.png"
-                        image_url = await clothing_service.upload_image_to_supabase(
-                            extracted_item["generated_image_base64"], 
-                            filename
-                        )
-                        print(f"Item {item_name} extracted and uploaded successfully to: {image_url}")
-                    except Exception as upload_error:
-                        print(f"Failed to upload image for {item_name}: {upload_error}")
-                        # Use a placeholder if upload failed but keep the extracted image info
-                        image_url = f"upload-failed://extracted-{int(time.time())}"
-                else:
-                    # Use a placeholder if extraction failed
-                    image_url = f"temp://failed-{int(time.time())}"
-                    print(f"Item {item_name} extraction failed")
-                
-                # Save to database
-                print(f"Saving item to database: {item['name']}, category: {item['category']}")
-                saved_item = await clothing_service.save_clothing_item_to_db(
-                    user_id=user_id,
-                    name=item["name"],
-                    category=item["category"],
-                    primary_color=item.get("primary_color"),
-                    secondary_color=item.get("secondary_color"),
-                    image_url=image_url,
-                    features=item.get("features", {})
-                )
-                print(f"Successfully saved item with ID: {saved_item.get('id')}")
-                
-                # Add extraction info to saved item
-                saved_item["extraction_success"] = extracted_item.get("success", False) if extracted_item else False
-                saved_item["extraction_error"] = extracted_item.get("error") if extracted_item and not extracted_item.get("success") else None
-                
-                saved_items.append(saved_item)
-                
-            except Exception as item_error:
-                print(f"Error processing item {item['name']}: {item_error}")
-                # Still try to save item without proper image
+            item_name = item["name"]
+            extracted_item = extraction_map.get(item_name)
+            
+            if extracted_item and extracted_item.get("success") and extracted_item.get("generated_image_base64"):
+                # Upload image to Supabase storage
                 try:
-                    saved_item = await clothing_service.save_clothing_item_to_db(
-                        user_id=user_id,
-                        name=item["name"],
-                        category=item["category"],
-                        primary_color=item.get("primary_color"),
-                        secondary_color=item.get("secondary_color"),
-                        image_url=f"temp://error-{int(time.time())}",
-                        features=item.get("features", {})
+                    filename = f"{item_name.replace(' ', '-').lower()}-{int(time.time())}.png"
+                    image_url = await clothing_service.upload_image_to_supabase(
+                        extracted_item["generated_image_base64"], 
+                        filename
                     )
-                    saved_item["extraction_success"] = False
-                    saved_item["extraction_error"] = str(item_error)
-                    saved_items.append(saved_item)
-                except Exception as save_error:
-                    print(f"Failed to save item {item['name']} even without image: {save_error}")
+                    logger.debug("Item %s extracted and uploaded successfully to: %s", item_name, image_url, extra=SAMPLED)
+                except Exception as upload_error:
+                    logger.error("Failed to upload image for %s: %s", item_name, upload_error)
+                    # Use a placeholder if upload failed but keep the extracted image info
+                    image_url = f"upload-failed://extracted-{int(time.time())}"
+            else:
+                # Use a placeholder if extraction failed
+                image_url = f"temp://failed-{int(time.time())}"
+                logger.warning("Item %s extraction failed", item_name)
+            
+            rows.append({
+                **item,
+                "image_url": image_url,
+                # Only used for color and similarity indexing
+                "image_base64": extracted_item.get("generated_image_base64") if extracted_item else None,
+                "extraction_success": extracted_item.get("success", False) if extracted_item else False,
+                "extraction_error": extracted_item.get("error") if extracted_item and not extracted_item.get("success") else None
+            })
+        
+        logger.debug("Saving %s items to database", len(rows), extra=SAMPLED)
+        results = await clothing_service.save_clothing_items_to_db(user_id, rows)
+        
+        # Still try to save items that failed without their image
+        retry_rows = []
+        for row, result in zip(rows, results):
+            if result["success"]:
+                saved_items.append({
+                    **result["data"],
+                    "extraction_success": row["extraction_success"],
+                    "extraction_error": row["extraction_error"]
+                })
+            else:
+                logger.error("Error processing item %s: %s", row['name'], result["error"])
+                retry_rows.append({**row, "image_url": f"temp://error-{int(time.time())}", "extraction_error": result["error"]})
+        
+        if retry_rows:
+            retry_results = await clothing_service.save_clothing_items_to_db(user_id, retry_rows)
+            for row, result in zip(retry_rows, retry_results):
+                if result["success"]:
+                    saved_items.append({**result["data"], "extraction_success": False, "extraction_error": row["extraction_error"]})
+                else:
+                    logger.error("Failed to save item %s even without image: %s", row['name'], result["error"])
         
+        usage_accounting.record_items_ingested(len(saved_items))
         return {
             "success": True,
             "message": f"Added {len(saved_items)} items to your wardrobe",
@@ -412,7 +420,7 @@ async def add_fit_to_wardrobe(
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"Full error in add_fit_to_wardrobe: {error_details}")
+        logger.exception("Error in add_fit_to_wardrobe: %s", e)
         return {
             "success": False,
             "error": f"Error adding fit to wardrobe: {str(e)}",
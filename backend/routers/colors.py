@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+
+from .auth import verify_token
+from services.color_service import find_items_near_color, MAX_NEAREST_RESULTS
+
+router = APIRouter()
+
+COLOR_ITEM_TYPES = ['clothing', 'accessory']
+
+@router.get("/colors/nearest")
+async def get_items_near_color(
+    color: str,  # Color name ("navy blue") or hex swatch ("#1f2a44")
+    k: int = 10,
+    max_distance: Optional[float] = None,
+    types: Optional[str] = None,  # Comma-separated subset of clothing,accessory
+    user_id: str = Depends(verify_token)
+):
+    """Get the current user's items whose primary color is closest to a color"""
+    try:
+        if k < 1 or k > MAX_NEAREST_RESULTS:
+            raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_NEAREST_RESULTS}")
+
+        if max_distance is not None and max_distance < 0:
+            raise HTTPException(status_code=400, detail="max_distance must not be negative")
+
+        item_types = [item_type.strip() for item_type in types.split(",") if item_type.strip()] if types else None
+        if item_types and any(item_type not in COLOR_ITEM_TYPES for item_type in item_types):
+            raise HTTPException(status_code=400, detail=f"types must be a comma-separated subset of {', '.join(COLOR_ITEM_TYPES)}")
+
+        result = await find_items_near_color(user_id, color, k, max_distance, item_types)
+
+        return {
+            **result,
+            "total": len(result["results"])
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding items near color: {str(e)}")
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from services import metrics
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Export request, Gemini, Supabase and image-processing metrics in Prometheus format"""
+    return Response(content=metrics.render_latest(), media_type=metrics.CONTENT_TYPE)
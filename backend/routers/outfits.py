@@ -3,19 +3,28 @@ from typing import List, Optional
 import json
 
 from .auth import verify_token
+from services.logger import get_logger
 from services.outfit_service import (
     create_outfit,
+    create_outfits,
     get_user_outfits,
     get_outfit_by_id,
     update_outfit,
     delete_outfit,
     add_item_to_outfit,
+    add_items_to_outfit,
+    remove_items_from_outfit,
+    insert_outfit_items,
+    get_items_with_details_for_outfits,
     remove_item_from_outfit,
     duplicate_outfit,
     get_outfit_statistics,
     search_outfits,
     get_outfits_containing_item
 )
+from services.outfit_suggestion_service import suggest_outfits, MAX_SUGGESTIONS
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -69,6 +78,33 @@ async def get_outfits_statistics(user_id: str = Depends(verify_token)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting outfit statistics: {str(e)}")
 
+@router.get("/outfits/suggest")
+async def suggest_outfits_endpoint(
+    k: int = 10,
+    season: Optional[str] = None,  # summer, spring, fall or winter
+    occasion: Optional[str] = None,  # casual, smart or formal
+    include_wishlist: bool = False,
+    user_id: str = Depends(verify_token)
+):
+    """Suggest the best-matching outfits from the current user's wardrobe"""
+    try:
+        if k < 1 or k > MAX_SUGGESTIONS:
+            raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_SUGGESTIONS}")
+
+        suggestions = await suggest_outfits(user_id, k, season, occasion, include_wishlist)
+
+        return {
+            "suggestions": suggestions,
+            "total": len(suggestions)
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error suggesting outfits: {str(e)}")
+
 @router.get("/outfits/{outfit_id}")
 async def get_outfit(
     outfit_id: str,
@@ -189,6 +225,62 @@ async def remove_item_from_outfit_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error removing item from outfit: {str(e)}")
 
+def _parse_outfit_items(items: str) -> List[dict]:
+    """Parse a JSON array of {"id", "type"} items into outfit_service item dicts"""
+    try:
+        items_data = json.loads(items)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON format for items")
+
+    if not isinstance(items_data, list) or not all(isinstance(item, dict) for item in items_data):
+        raise HTTPException(status_code=400, detail="items must be a JSON array of objects")
+
+    return [{"item_id": item.get('id'), "item_type": item.get('type')} for item in items_data]
+
+@router.post("/outfits/{outfit_id}/items/batch")
+async def add_items_to_outfit_endpoint(
+    outfit_id: str,
+    items: str = Form(...),  # JSON array of {"id": ..., "type": "clothing" | "accessory"}
+    user_id: str = Depends(verify_token)
+):
+    """Add several items to an outfit in one request"""
+    try:
+        result = await add_items_to_outfit(outfit_id, _parse_outfit_items(items), user_id)
+
+        return {
+            "message": f"Added {len(result['added'])} items to outfit",
+            "added": result["added"],
+            "already_in_outfit": result["already_in_outfit"],
+            "errors": result["errors"]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding items to outfit: {str(e)}")
+
+@router.post("/outfits/{outfit_id}/items/batch/remove")
+async def remove_items_from_outfit_endpoint(
+    outfit_id: str,
+    items: str = Form(...),  # JSON array of {"id": ..., "type": "clothing" | "accessory"}
+    user_id: str = Depends(verify_token)
+):
+    """Remove several items from an outfit in one request"""
+    try:
+        result = await remove_items_from_outfit(outfit_id, _parse_outfit_items(items), user_id)
+
+        return {
+            "message": f"Removed {len(result['removed'])} items from outfit",
+            "removed": result["removed"],
+            "not_in_outfit": result["not_in_outfit"],
+            "errors": result["errors"]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error removing items from outfit: {str(e)}")
+
 @router.post("/outfits/{outfit_id}/duplicate")
 async def duplicate_outfit_endpoint(
     outfit_id: str,
@@ -249,41 +341,47 @@ async def bulk_create_outfits_from_items(
         created_outfits = []
         errors = []
 
+        valid_outfits = []
         for outfit_info in outfits_data:
-            try:
-                # Create outfit
-                outfit_name = outfit_info.get('name')
-                outfit_description = outfit_info.get('description')
-                items = outfit_info.get('items', [])
-
-                if not outfit_name:
-                    errors.append({"outfit": outfit_info, "error": "Name is required"})
-                    continue
-
-                # Create the outfit
-                new_outfit = await create_outfit(user_id, outfit_name, outfit_description)
-
-                # Add items to outfit
-                items_added = 0
-                for item in items:
-                    item_id = item.get('id')
-                    item_type = item.get('type')
-
-                    if item_id and item_type and item_type in ['clothing', 'accessory']:
-                        try:
-                            await add_item_to_outfit(new_outfit['id'], item_id, item_type, user_id)
-                            items_added += 1
-                        except Exception as item_error:
-                            # Continue adding other items even if one fails
-                            print(f"Error adding item {item_id} to outfit: {item_error}")
-
-                # Get the complete outfit with items
-                complete_outfit = await get_outfit_by_id(new_outfit['id'], user_id)
-                complete_outfit['items_added'] = items_added
-                created_outfits.append(complete_outfit)
-
-            except Exception as outfit_error:
-                errors.append({"outfit": outfit_info, "error": str(outfit_error)})
+            if not isinstance(outfit_info, dict) or not outfit_info.get('name'):
+                errors.append({"outfit": outfit_info, "error": "Name is required"})
+                continue
+            valid_outfits.append(outfit_info)
+
+        # Create all outfits in one insert
+        new_outfits = []
+        for outfit_info, result in zip(valid_outfits, await create_outfits(user_id, valid_outfits)):
+            if result["success"]:
+                new_outfits.append((outfit_info, result["data"]))
+            else:
+                errors.append({"outfit": outfit_info, "error": result["error"]})
+
+        # Add the items of every new outfit in one insert
+        item_rows = []
+        for outfit_info, new_outfit in new_outfits:
+            seen = set()
+            for item in outfit_info.get('items', []):
+                item_id = item.get('id')
+                item_type = item.get('type')
+
+                if item_id and item_type and item_type in ['clothing', 'accessory'] and (item_id, item_type) not in seen:
+                    seen.add((item_id, item_type))
+                    item_rows.append({"outfit_id": new_outfit['id'], "item_id": item_id, "item_type": item_type})
+
+        items_added = {}
+        for row, result in zip(item_rows, await insert_outfit_items(item_rows)):
+            if result["success"]:
+                items_added[row["outfit_id"]] = items_added.get(row["outfit_id"], 0) + 1
+            else:
+                # Continue adding other items even if one fails
+                logger.error("Error adding item %s to outfit: %s", row["item_id"], result["error"])
+
+        # Load the complete outfits with items
+        items_by_outfit = await get_items_with_details_for_outfits([new_outfit['id'] for _, new_outfit in new_outfits])
+        for _, new_outfit in new_outfits:
+            new_outfit['items'] = items_by_outfit.get(new_outfit['id'], [])
+            new_outfit['items_added'] = items_added.get(new_outfit['id'], 0)
+            created_outfits.append(new_outfit)
 
         return {
             "message": f"Bulk outfit creation completed",
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+
+from .auth import verify_token
+from services.search_service import search_wardrobe, SEARCH_KINDS, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+@router.get("/search")
+async def search(
+    q: str,
+    types: Optional[str] = None,  # Comma-separated subset of outfit,clothing,accessory
+    limit: int = 20,
+    offset: int = 0,
+    user_id: str = Depends(verify_token)
+):
+    """Search the current user's outfits, clothes and accessories, best matches first"""
+    try:
+        if not q.strip():
+            raise HTTPException(status_code=400, detail="Query must not be empty")
+
+        kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else None
+        if kinds and any(kind not in SEARCH_KINDS for kind in kinds):
+            raise HTTPException(status_code=400, detail=f"types must be a comma-separated subset of {', '.join(SEARCH_KINDS)}")
+
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        if offset < 0:
+            raise HTTPException(status_code=400, detail="offset must not be negative")
+
+        page = await search_wardrobe(user_id, q, kinds, limit, offset)
+
+        return {
+            "query": q,
+            **page,
+            "has_more": offset + len(page["results"]) < page["total"]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching wardrobe: {str(e)}")
@@ -1,64 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from routers.auth import verify_token, supabase
-import models.tops_config as tops_config
-import models.bottoms_config as bottoms_config
-import models.footwear_config as footwear_config
-import models.outerwear_config as outerwear_config
-import models.accessories_config as accessories_config
-import models.undergarments_config as undergarments_config
-import models.dresses_config as dresses_config
-import models.sleepwear_config as sleepwear_config
+from routers.auth import verify_token
+from services.authService import get_supabase_client
+from services.category_resolver import resolve_display_category, DISPLAY_CATEGORIES
+from services import color_service, similarity_service
 
 router = APIRouter(prefix="/supabase", tags=["database"])
 
-# Category mapping based on model configs
-CATEGORY_CONFIGS = {
-    "tops": tops_config,
-    "bottoms": bottoms_config,
-    "footwear": footwear_config,
-    "outerwear": outerwear_config,
-    "accessories": accessories_config,
-    "undergarments": undergarments_config,
-    "dresses": dresses_config,
-    "sleepwear": sleepwear_config
-}
-
 def categorize_clothing_item(category: str) -> str:
     """
     Categorize a clothing item based on its stored category field.
     Maps database categories to display categories.
     """
-    if not category:
-        return "other"
-    
-    category_lower = category.lower()
-    
-    # Check each config to see if the category matches any clothing types
-    for display_category, config in CATEGORY_CONFIGS.items():
-        if hasattr(config, 'CLOTHING_TYPES'):
-            # Check if the category matches any clothing type in this config
-            for clothing_type in config.CLOTHING_TYPES:
-                if category_lower == clothing_type.lower() or category_lower in clothing_type.lower():
-                    return display_category
-    
-    # Also check for common category names
-    category_mapping = {
-        "clothing": "tops",  # Default fallback
-        "accessory": "accessories",
-        "top": "tops",
-        "bottom": "bottoms",
-        "shoe": "footwear",
-        "shoes": "footwear",
-        "jacket": "outerwear",
-        "coat": "outerwear",
-        "dress": "dresses",
-        "underwear": "undergarments",
-        "sleepwear": "sleepwear"
-    }
-    
-    return category_mapping.get(category_lower, "other")
+    return resolve_display_category(category)
 
 class ProfileCreate(BaseModel):
     email: str
@@ -91,6 +46,7 @@ class ClothingItemResponse(BaseModel):
 async def initialize_database():
     """Initialize database tables"""
     try:
+        supabase = get_supabase_client()
         # Create profiles table
         profiles_result = supabase.rpc('create_profiles_table').execute()
         
@@ -108,6 +64,7 @@ async def initialize_database():
 async def get_profile(user_id: str = Depends(verify_token)):
     """Get user profile"""
     try:
+        supabase = get_supabase_client()
         response = supabase.table("profiles").select("*").eq("id", user_id).execute()
         
         if response.data:
@@ -128,6 +85,7 @@ async def get_profile(user_id: str = Depends(verify_token)):
 async def add_clothing_item(item: ClothingItem, user_id: str = Depends(verify_token)):
     """Add a clothing item"""
     try:
+        supabase = get_supabase_client()
         item_data = {
             "profile_id": user_id,
             "name": item.name,
@@ -135,12 +93,15 @@ async def add_clothing_item(item: ClothingItem, user_id: str = Depends(verify_to
             "primary_color": item.primary_color,
             "secondary_color": item.secondary_color,
             "size": item.size,
-            "image_url": item.image_url
+            "image_url": item.image_url,
+            "display_category": resolve_display_category(item.category),
+            **color_service.color_fields(item.primary_color, item.secondary_color)
         }
         
         response = supabase.table("clothes").insert(item_data).execute()
         
         if response.data:
+            color_service.invalidate_color_index(user_id)
             return ClothingItemResponse(**response.data[0])
         else:
             raise HTTPException(
@@ -157,6 +118,7 @@ async def add_clothing_item(item: ClothingItem, user_id: str = Depends(verify_to
 async def get_clothing_items(user_id: str = Depends(verify_token)):
     """Get all clothing items for user"""
     try:
+        supabase = get_supabase_client()
         response = supabase.table("clothes").select("*").eq("profile_id", user_id).execute()
         
         return [ClothingItemResponse(**item) for item in response.data]
@@ -170,33 +132,29 @@ async def get_clothing_items(user_id: str = Depends(verify_token)):
 async def get_categorized_clothing_items(user_id: str = Depends(verify_token)):
     """Get clothing items organized by category"""
     try:
-        response = supabase.table("clothes").select("*").eq("profile_id", user_id).execute()
+        supabase = get_supabase_client()
+        # Items come back grouped by their stored display_category
+        response = supabase.rpc("get_categorized_clothes", {"p_profile_id": user_id}).execute()
         
         # Initialize categories
-        categorized_items = {
-            "accessories": [],
-            "bottoms": [],
-            "dresses": [],
-            "footwear": [],
-            "outerwear": [],
-            "sleepwear": [],
-            "tops": [],
-            "undergarments": [],
-            "other": []
-        }
+        categorized_items = {category: [] for category in DISPLAY_CATEGORIES}
+        total_items = 0
         
-        # Categorize each item
-        for item in response.data:
-            category = categorize_clothing_item(item.get("category", ""))
-            if category not in categorized_items:
-                categorized_items["other"].append(item)
+        for group in response.data or []:
+            display_category = group["display_category"]
+            total_items += len(group["items"])
+            
+            if display_category is None:
+                # Rows saved before display_category existed
+                for item in group["items"]:
+                    categorized_items[categorize_clothing_item(item.get("category", ""))].append(item)
             else:
-                categorized_items[category].append(item)
+                categorized_items.get(display_category, categorized_items["other"]).extend(group["items"])
         
         return {
             "success": True,
             "categories": categorized_items,
-            "total_items": len(response.data)
+            "total_items": total_items
         }
     except Exception as e:
         raise HTTPException(
@@ -208,6 +166,7 @@ async def get_categorized_clothing_items(user_id: str = Depends(verify_token)):
 async def delete_clothing_item(item_id: str, user_id: str = Depends(verify_token)):
     """Delete a clothing item"""
     try:
+        supabase = get_supabase_client()
         # First check if the item belongs to the user
         check_response = supabase.table("clothes").select("profile_id").eq("id", item_id).execute()
         
@@ -225,6 +184,8 @@ async def delete_clothing_item(item_id: str, user_id: str = Depends(verify_token
         
         # Delete the item
         response = supabase.table("clothes").delete().eq("id", item_id).execute()
+        color_service.invalidate_color_index(user_id)
+        await similarity_service.remove_item(user_id, "clothing", item_id)
         
         return {"message": "Clothing item deleted successfully"}
     except HTTPException:
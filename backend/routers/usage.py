@@ -0,0 +1,30 @@
+import os
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from .auth import verify_token
+from services import usage_accounting
+
+router = APIRouter()
+
+# Comma-separated profile IDs allowed to see usage across all users
+ADMIN_USER_IDS = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+
+@router.get("/usage/report")
+async def usage_report(
+    limit: int = 10,
+    user_id: str = Depends(verify_token)
+):
+    """Gemini token usage and cost by user, endpoint and model (admins see all users)"""
+    scope: Optional[str] = None if user_id in ADMIN_USER_IDS else user_id
+    try:
+        report = await asyncio.to_thread(usage_accounting.get_usage_report, limit=limit, user_id=scope)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building usage report: {str(e)}")
+    return {
+        "success": True,
+        "scope": "all" if scope is None else "user",
+        "report": report
+    }
@@ -1,6 +1,8 @@
-from typing import List
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import json
+from typing import List, Optional
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Form
 
+from .auth import verify_token
 from services import virtual_tryon_service
 
 router = APIRouter(prefix="/api", tags=["virtual-tryon"])
@@ -28,6 +30,62 @@ async def try_on_clothes(
             "error": f"Error generating iterative try-on visualization: {str(e)}"
         }
 
+def _parse_tryon_items(items: str) -> List[dict]:
+    """Parse a JSON array of {"id", "type"} items into item refs"""
+    try:
+        items_data = json.loads(items)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON format for items")
+
+    if not isinstance(items_data, list) or not all(isinstance(item, dict) for item in items_data):
+        raise HTTPException(status_code=400, detail="items must be a JSON array of objects")
+
+    refs = [{"item_id": item.get("id"), "item_type": item.get("type")} for item in items_data]
+    if any(not ref["item_id"] or ref["item_type"] not in ("clothing", "accessory") for ref in refs):
+        raise HTTPException(status_code=400, detail='Each item needs an "id" and a "type" of clothing or accessory')
+    return refs
+
+@router.post("/try-on-wardrobe")
+async def try_on_wardrobe(
+    person_image: UploadFile = File(...),
+    items: Optional[str] = Form(None),  # JSON array of {"id": ..., "type": "clothing" | "accessory"}
+    outfit_id: Optional[str] = Form(None),
+    user_id: str = Depends(verify_token)
+):
+    """
+    Virtual try-on of items from the user's wardrobe, by item IDs or an outfit ID
+    
+    Args:
+        person_image: Image of the person
+        items: JSON array of wardrobe items, applied in the given order
+        outfit_id: Outfit whose items to try on (instead of items)
+    """
+    if bool(items) == bool(outfit_id):
+        raise HTTPException(status_code=400, detail="Provide either items or outfit_id")
+
+    item_refs = _parse_tryon_items(items) if items else None
+
+    try:
+        wardrobe_items = await virtual_tryon_service.resolve_tryon_items(user_id, item_refs, outfit_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading wardrobe items: {str(e)}")
+
+    if wardrobe_items is None:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+    if not wardrobe_items:
+        raise HTTPException(status_code=404, detail="No matching wardrobe items found")
+
+    try:
+        return await virtual_tryon_service.perform_wardrobe_tryon(person_image, wardrobe_items)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error generating wardrobe try-on visualization: {str(e)}"
+        }
+
 @router.post("/fit-transfer")
 async def fit_transfer(
     clothing_image: UploadFile = File(...),
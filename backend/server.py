@@ -1,10 +1,36 @@
-from fastapi import FastAPI
+import time
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import image_generation, virtual_tryon, clothing_analysis, health, auth, supabase, accessories, outfits, clothing
+from routers import image_generation, virtual_tryon, clothing_analysis, health, auth, supabase, accessories, outfits, clothing, usage, search, colors, metrics as metrics_router
+from services import clients, jwt_verifier, metrics, warmup
+from services.logger import configure_logging
+from services.request_context import current_endpoint, current_request_id
+
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Share one client registry for the app's lifetime and close its connections on shutdown
+    
+    Heavy dependencies load on first use; with STARTUP_WARMUP they are loaded
+    in the background right after start-up instead.
+    """
+    app.state.clients = clients.registry
+    warmup_task = asyncio.create_task(asyncio.to_thread(warmup.warm_up)) if warmup.STARTUP_WARMUP else None
+    yield
+    if warmup_task is not None:
+        await warmup_task
+    jwt_verifier.jwks_cache.shutdown()
+    await clients.close_all()
 
 # Initialize FastAPI app
-app = FastAPI(title="Drip Drop Image Generator", description="Generate images using Gemini AI with context images")
+app = FastAPI(title="Drip Drop Image Generator", description="Generate images using Gemini AI with context images", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -15,9 +41,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Record latency, in-flight count and body size for every request, labelled by route template"""
+    endpoint = metrics.resolve_endpoint(app, request.scope)
+    token = current_endpoint.set(endpoint)
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        metrics.observe_payload("request_body", int(content_length))
+
+    metrics.http_requests_in_flight.inc(endpoint=endpoint)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.http_request_duration.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            endpoint=endpoint,
+            status=str(status_code)
+        )
+        metrics.http_requests_in_flight.dec(endpoint=endpoint)
+        current_endpoint.reset(token)
+
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Propagate the caller's X-Request-ID (or generate one) so logs can be correlated"""
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = current_request_id.set(request_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        current_request_id.reset(token)
+
 
 # Include routers
 app.include_router(health.router)
+app.include_router(metrics_router.router)
 app.include_router(auth.router)
 app.include_router(supabase.router)
 app.include_router(image_generation.router)
@@ -26,6 +93,9 @@ app.include_router(clothing_analysis.router)
 app.include_router(clothing.router, prefix="/api/v1", tags=["clothing"])
 app.include_router(accessories.router, prefix="/api/v1", tags=["accessories"])
 app.include_router(outfits.router, prefix="/api/v1", tags=["outfits"])
+app.include_router(search.router, prefix="/api/v1", tags=["search"])
+app.include_router(colors.router, prefix="/api/v1", tags=["colors"])
+app.include_router(usage.router, prefix="/api/v1", tags=["usage"])
 
 if __name__ == "__main__":
     import uvicorn
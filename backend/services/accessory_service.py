@@ -9,8 +9,16 @@ from fastapi import UploadFile
 from PIL import Image
 
 from .authService import get_supabase_client
-from .image_processing import image_to_base64
+from .db_batch import insert_rows
+from .clothing_identifier import validate_features
+from . import color_service, similarity_service
+from .image_processing import image_to_base64, decode_item_image
+from . import metrics
+from .logger import get_logger
 
+logger = get_logger(__name__)
+
+@metrics.stage("upload")
 async def upload_accessory_image_to_supabase(image_base64: str, filename: str) -> str:
     """Upload base64 accessory image to Supabase storage and return public URL"""
     try:
@@ -21,39 +29,42 @@ async def upload_accessory_image_to_supabase(image_base64: str, filename: str) -
 
         # Create unique filename
         unique_filename = f'accessories/{int(time.time())}-{filename}'
-        print(f"Uploading accessory image: {unique_filename}, size: {len(image_bytes)} bytes")
+        logger.info("Uploading accessory image: %s, size: %s bytes", unique_filename, len(image_bytes))
+        metrics.observe_payload("storage_upload", len(image_bytes))
 
         # Upload to Supabase storage
-        result = supabase.storage.from_('clothing-items').upload(
-            unique_filename,
-            image_bytes,
-            file_options={'content-type': 'image/png'}
-        )
+        with metrics.supabase_call("storage.upload"):
+            result = supabase.storage.from_('clothing-items').upload(
+                unique_filename,
+                image_bytes,
+                file_options={'content-type': 'image/png'}
+            )
 
-        print(f"Upload result: {result}")
+        logger.debug("Upload result: %s", result)
 
         if result and hasattr(result, 'path'):
             # Get public URL using the path from the upload response
             public_url = supabase.storage.from_('clothing-items').get_public_url(result.path)
-            print(f"Generated public URL: {public_url}")
+            logger.debug("Generated public URL: %s", public_url)
             return public_url
         else:
             raise Exception(f"Upload failed: {result}")
 
     except Exception as e:
-        print(f"Error uploading accessory image to Supabase: {e}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+        logger.exception("Error uploading accessory image to Supabase: %s", e)
         raise e
 
 async def save_accessory_item_to_db(user_id: str, name: str, category: str,
                                   primary_color: str = None, secondary_color: str = None,
                                   size: str = None, image_url: str = None,
-                                  is_owned: bool = True) -> Dict[str, Any]:
-    """Save accessory item to Supabase database"""
+                                  is_owned: bool = True, features: Dict[str, Any] = None,
+                                  image_base64: str = None) -> Dict[str, Any]:
+    """Save accessory item to Supabase database (image_base64 is only used for its dominant color and similarity descriptor)"""
     try:
         supabase = get_supabase_client()
 
+        image = decode_item_image(image_base64)
+
         item_data = {
             "profile_id": user_id,
             "name": name,
@@ -62,28 +73,64 @@ async def save_accessory_item_to_db(user_id: str, name: str, category: str,
             "secondary_color": secondary_color,
             "size": size,
             "image_url": image_url,
-            "is_owned": is_owned
+            "is_owned": is_owned,
+            "features": validate_features(category, features),
+            **color_service.color_fields(primary_color, secondary_color, image)
         }
 
-        result = supabase.table("accessories").insert(item_data).execute()
+        with metrics.supabase_call("accessories.insert"):
+            result = supabase.table("accessories").insert(item_data).execute()
 
         if result.data:
+            color_service.invalidate_color_index(user_id)
+            await similarity_service.index_saved_items(user_id, "accessory", [{"success": True, "data": result.data[0]}], [image])
             return result.data[0]
         else:
             raise Exception(f"Database insert failed: {result}")
 
     except Exception as e:
-        print(f"Error saving accessory item to database: {e}")
+        logger.error("Error saving accessory item to database: %s", e)
         raise e
 
+async def save_accessory_items_to_db(user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Save many accessory items in a single insert.
+
+    Each item takes the same fields as save_accessory_item_to_db. Returns one
+    result per item, in order: {"success": True, "data": row} or
+    {"success": False, "error": message}.
+    """
+    images = [decode_item_image(item.get("image_base64")) for item in items]
+    rows = [
+        {
+            "profile_id": user_id,
+            "name": item["name"],
+            "category": item["category"],
+            "primary_color": item.get("primary_color"),
+            "secondary_color": item.get("secondary_color"),
+            "size": item.get("size"),
+            "image_url": item.get("image_url"),
+            "is_owned": item.get("is_owned", True),
+            "features": validate_features(item["category"], item.get("features")),
+            **color_service.color_fields(item.get("primary_color"), item.get("secondary_color"), image)
+        }
+        for item, image in zip(items, images)
+    ]
+    results = await insert_rows("accessories", rows)
+    if any(result["success"] for result in results):
+        color_service.invalidate_color_index(user_id)
+    await similarity_service.index_saved_items(user_id, "accessory", results, images)
+    return results
+
 async def update_accessory_item_image_url(item_id: str, image_url: str) -> Dict[str, Any]:
     """Update the image URL for an accessory item in the database"""
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("accessories").update({
-            "image_url": image_url
-        }).eq("id", item_id).execute()
+        with metrics.supabase_call("accessories.update"):
+            result = supabase.table("accessories").update({
+                "image_url": image_url
+            }).eq("id", item_id).execute()
 
         if result.data:
             return result.data[0]
@@ -91,7 +138,7 @@ async def update_accessory_item_image_url(item_id: str, image_url: str) -> Dict[
             raise Exception(f"Database update failed: {result}")
 
     except Exception as e:
-        print(f"Error updating accessory item image URL: {e}")
+        logger.error("Error updating accessory item image URL: %s", e)
         raise e
 
 async def find_accessory_item_by_name_and_user(user_id: str, name: str) -> Dict[str, Any]:
@@ -99,7 +146,8 @@ async def find_accessory_item_by_name_and_user(user_id: str, name: str) -> Dict[
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("accessories").select("*").eq("profile_id", user_id).eq("name", name).limit(1).execute()
+        with metrics.supabase_call("accessories.select"):
+            result = supabase.table("accessories").select("*").eq("profile_id", user_id).eq("name", name).limit(1).execute()
 
         if result.data and len(result.data) > 0:
             return result.data[0]
@@ -107,11 +155,11 @@ async def find_accessory_item_by_name_and_user(user_id: str, name: str) -> Dict[
             return None
 
     except Exception as e:
-        print(f"Error finding accessory item: {e}")
+        logger.error("Error finding accessory item: %s", e)
         return None
 
-async def get_user_accessories(user_id: str, owned_only: bool = None) -> List[Dict[str, Any]]:
-    """Get all accessory items for a user, optionally filtered by ownership"""
+async def get_user_accessories(user_id: str, owned_only: bool = None, features: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Get all accessory items for a user, optionally filtered by ownership and features"""
     try:
         supabase = get_supabase_client()
 
@@ -120,12 +168,17 @@ async def get_user_accessories(user_id: str, owned_only: bool = None) -> List[Di
         if owned_only is not None:
             query = query.eq("is_owned", owned_only)
 
-        result = query.order("created_at", desc=True).execute()
+        # JSONB containment (features @> filter) uses the features GIN index
+        if features:
+            query = query.contains("features", features)
+
+        with metrics.supabase_call("accessories.select"):
+            result = query.order("created_at", desc=True).execute()
 
         return result.data if result.data else []
 
     except Exception as e:
-        print(f"Error getting user accessories: {e}")
+        logger.error("Error getting user accessories: %s", e)
         return []
 
 async def smart_save_accessory_item(user_id: str, name: str, category: str,
@@ -154,21 +207,21 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         )
 
         # Step 1: Check image quality
-        print(f"Checking image quality for accessory item: {name}")
+        logger.info("Checking image quality for accessory item: %s", name)
         processed_image = process_uploaded_image(image)
         quality_analysis = check_professional_clothing_image(processed_image)
 
         use_original_image = quality_analysis.get("passed", False)
-        print(f"Quality check result - passed: {use_original_image}")
+        logger.info("Quality check result - passed: %s", use_original_image)
 
         if use_original_image:
             # Use original image since it passed quality check
-            print("Using original image (quality check passed)")
+            logger.info("Using original image (quality check passed)")
             image_base64 = image_to_base64(processed_image)
 
         else:
             # Extract accessory item to create professional image
-            print("Extracting accessory item (quality check failed)")
+            logger.info("Extracting accessory item (quality check failed)")
 
             # Reset image file pointer
             await image.seek(0)
@@ -178,18 +231,18 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
 
             if not extraction_result.get("generated_image_base64"):
                 # Fallback to original image if extraction fails
-                print("Extraction failed, falling back to original image")
+                logger.warning("Extraction failed, falling back to original image")
                 await image.seek(0)
                 processed_image = process_uploaded_image(image)
                 image_base64 = image_to_base64(processed_image)
             else:
-                print("Successfully extracted accessory item")
+                logger.info("Successfully extracted accessory item")
                 image_base64 = extraction_result["generated_image_base64"]
 
         # Step 2: Upload image to Supabase storage
         filename = f"accessory-{name.replace(' ', '-').lower()}-{int(time.time())}.png"
         image_url = await upload_accessory_image_to_supabase(image_base64, filename)
-        print(f"Accessory image uploaded successfully: {image_url}")
+        logger.info("Accessory image uploaded successfully: %s", image_url)
 
         # Step 3: Save to database
         saved_item = await save_accessory_item_to_db(
@@ -200,7 +253,8 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
             secondary_color=secondary_color,
             size=size,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         # Add metadata about the process
@@ -211,7 +265,7 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         return saved_item
 
     except Exception as e:
-        print(f"Error in smart accessory item creation: {e}")
+        logger.error("Error in smart accessory item creation: %s", e)
         raise e
 
 async def get_accessory_by_id(accessory_id: str, user_id: str = None) -> Dict[str, Any]:
@@ -224,7 +278,8 @@ async def get_accessory_by_id(accessory_id: str, user_id: str = None) -> Dict[st
         if user_id:
             query = query.eq("profile_id", user_id)
 
-        result = query.limit(1).execute()
+        with metrics.supabase_call("accessories.select"):
+            result = query.limit(1).execute()
 
         if result.data and len(result.data) > 0:
             return result.data[0]
@@ -232,7 +287,7 @@ async def get_accessory_by_id(accessory_id: str, user_id: str = None) -> Dict[st
             return None
 
     except Exception as e:
-        print(f"Error getting accessory by ID: {e}")
+        logger.error("Error getting accessory by ID: %s", e)
         return None
 
 async def update_accessory_item(item_id: str, user_id: str, **updates) -> Dict[str, Any]:
@@ -246,16 +301,19 @@ async def update_accessory_item(item_id: str, user_id: str, **updates) -> Dict[s
 
         if not update_data:
             raise ValueError("No valid update data provided")
+        update_data.update(color_service.color_updates(update_data))
 
-        result = supabase.table("accessories").update(update_data).eq("id", item_id).eq("profile_id", user_id).execute()
+        with metrics.supabase_call("accessories.update"):
+            result = supabase.table("accessories").update(update_data).eq("id", item_id).eq("profile_id", user_id).execute()
 
         if result.data:
+            color_service.invalidate_color_index(user_id)
             return result.data[0]
         else:
             raise Exception(f"Database update failed: {result}")
 
     except Exception as e:
-        print(f"Error updating accessory item: {e}")
+        logger.error("Error updating accessory item: %s", e)
         raise e
 
 async def delete_accessory_item(item_id: str, user_id: str) -> bool:
@@ -263,16 +321,20 @@ async def delete_accessory_item(item_id: str, user_id: str) -> bool:
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("accessories").delete().eq("id", item_id).eq("profile_id", user_id).execute()
+        with metrics.supabase_call("accessories.delete"):
+            result = supabase.table("accessories").delete().eq("id", item_id).eq("profile_id", user_id).execute()
+        color_service.invalidate_color_index(user_id)
+        await similarity_service.remove_item(user_id, "accessory", item_id)
 
         return len(result.data) > 0 if result.data else False
 
     except Exception as e:
-        print(f"Error deleting accessory item: {e}")
+        logger.error("Error deleting accessory item: %s", e)
         return False
 
-async def get_accessories_by_category(user_id: str, category: str, owned_only: bool = None) -> List[Dict[str, Any]]:
-    """Get accessory items by category for a user"""
+async def get_accessories_by_category(user_id: str, category: str, owned_only: bool = None,
+                                      features: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Get accessory items by category for a user, optionally filtered by features"""
     try:
         supabase = get_supabase_client()
 
@@ -281,12 +343,16 @@ async def get_accessories_by_category(user_id: str, category: str, owned_only: b
         if owned_only is not None:
             query = query.eq("is_owned", owned_only)
 
-        result = query.order("created_at", desc=True).execute()
+        if features:
+            query = query.contains("features", features)
+
+        with metrics.supabase_call("accessories.select"):
+            result = query.order("created_at", desc=True).execute()
 
         return result.data if result.data else []
 
     except Exception as e:
-        print(f"Error getting accessories by category: {e}")
+        logger.error("Error getting accessories by category: %s", e)
         return []
 
 async def smart_save_accessory_item(user_id: str, name: str, category: str,
@@ -315,21 +381,21 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         )
 
         # Step 1: Check image quality
-        print(f"Checking image quality for accessory item: {name}")
+        logger.info("Checking image quality for accessory item: %s", name)
         processed_image = process_uploaded_image(image)
         quality_analysis = check_professional_clothing_image(processed_image)
 
         use_original_image = quality_analysis.get("passed", False)
-        print(f"Quality check result - passed: {use_original_image}")
+        logger.info("Quality check result - passed: %s", use_original_image)
 
         if use_original_image:
             # Use original image since it passed quality check
-            print("Using original image (quality check passed)")
+            logger.info("Using original image (quality check passed)")
             image_base64 = image_to_base64(processed_image)
 
         else:
             # Extract accessory item to create professional image
-            print("Extracting accessory item (quality check failed)")
+            logger.info("Extracting accessory item (quality check failed)")
 
             # Reset image file pointer
             await image.seek(0)
@@ -339,18 +405,18 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
 
             if not extraction_result.get("generated_image_base64"):
                 # Fallback to original image if extraction fails
-                print("Extraction failed, falling back to original image")
+                logger.warning("Extraction failed, falling back to original image")
                 await image.seek(0)
                 processed_image = process_uploaded_image(image)
                 image_base64 = image_to_base64(processed_image)
             else:
-                print("Successfully extracted accessory item")
+                logger.info("Successfully extracted accessory item")
                 image_base64 = extraction_result["generated_image_base64"]
 
         # Step 2: Upload image to Supabase storage
         filename = f"accessory-{name.replace(' ', '-').lower()}-{int(time.time())}.png"
         image_url = await upload_accessory_image_to_supabase(image_base64, filename)
-        print(f"Accessory image uploaded successfully: {image_url}")
+        logger.info("Accessory image uploaded successfully: %s", image_url)
 
         # Step 3: Save to database
         saved_item = await save_accessory_item_to_db(
@@ -361,7 +427,8 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
             secondary_color=secondary_color,
             size=size,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         # Add metadata about the process
@@ -372,7 +439,7 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         return saved_item
 
     except Exception as e:
-        print(f"Error in smart accessory item creation: {e}")
+        logger.error("Error in smart accessory item creation: %s", e)
         raise e
 
 async def get_unique_accessory_categories(user_id: str) -> List[str]:
@@ -380,7 +447,8 @@ async def get_unique_accessory_categories(user_id: str) -> List[str]:
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("accessories").select("category").eq("profile_id", user_id).execute()
+        with metrics.supabase_call("accessories.select"):
+            result = supabase.table("accessories").select("category").eq("profile_id", user_id).execute()
 
         if result.data:
             categories = list(set([item['category'] for item in result.data if item.get('category')]))
@@ -389,7 +457,7 @@ async def get_unique_accessory_categories(user_id: str) -> List[str]:
             return []
 
     except Exception as e:
-        print(f"Error getting unique accessory categories: {e}")
+        logger.error("Error getting unique accessory categories: %s", e)
         return []
 
 async def smart_save_accessory_item(user_id: str, name: str, category: str,
@@ -418,21 +486,21 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         )
 
         # Step 1: Check image quality
-        print(f"Checking image quality for accessory item: {name}")
+        logger.info("Checking image quality for accessory item: %s", name)
         processed_image = process_uploaded_image(image)
         quality_analysis = check_professional_clothing_image(processed_image)
 
         use_original_image = quality_analysis.get("passed", False)
-        print(f"Quality check result - passed: {use_original_image}")
+        logger.info("Quality check result - passed: %s", use_original_image)
 
         if use_original_image:
             # Use original image since it passed quality check
-            print("Using original image (quality check passed)")
+            logger.info("Using original image (quality check passed)")
             image_base64 = image_to_base64(processed_image)
 
         else:
             # Extract accessory item to create professional image
-            print("Extracting accessory item (quality check failed)")
+            logger.info("Extracting accessory item (quality check failed)")
 
             # Reset image file pointer
             await image.seek(0)
@@ -442,18 +510,18 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
 
             if not extraction_result.get("generated_image_base64"):
                 # Fallback to original image if extraction fails
-                print("Extraction failed, falling back to original image")
+                logger.warning("Extraction failed, falling back to original image")
                 await image.seek(0)
                 processed_image = process_uploaded_image(image)
                 image_base64 = image_to_base64(processed_image)
             else:
-                print("Successfully extracted accessory item")
+                logger.info("Successfully extracted accessory item")
                 image_base64 = extraction_result["generated_image_base64"]
 
         # Step 2: Upload image to Supabase storage
         filename = f"accessory-{name.replace(' ', '-').lower()}-{int(time.time())}.png"
         image_url = await upload_accessory_image_to_supabase(image_base64, filename)
-        print(f"Accessory image uploaded successfully: {image_url}")
+        logger.info("Accessory image uploaded successfully: %s", image_url)
 
         # Step 3: Save to database
         saved_item = await save_accessory_item_to_db(
@@ -464,7 +532,8 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
             secondary_color=secondary_color,
             size=size,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         # Add metadata about the process
@@ -475,11 +544,11 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         return saved_item
 
     except Exception as e:
-        print(f"Error in smart accessory item creation: {e}")
+        logger.error("Error in smart accessory item creation: %s", e)
         raise e
 
     except Exception as e:
-        print(f"Error getting unique accessory categories: {e}")
+        logger.error("Error getting unique accessory categories: %s", e)
         return []
 
 async def smart_save_accessory_item(user_id: str, name: str, category: str,
@@ -508,21 +577,21 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         )
 
         # Step 1: Check image quality
-        print(f"Checking image quality for accessory item: {name}")
+        logger.info("Checking image quality for accessory item: %s", name)
         processed_image = process_uploaded_image(image)
         quality_analysis = check_professional_clothing_image(processed_image)
 
         use_original_image = quality_analysis.get("passed", False)
-        print(f"Quality check result - passed: {use_original_image}")
+        logger.info("Quality check result - passed: %s", use_original_image)
 
         if use_original_image:
             # Use original image since it passed quality check
-            print("Using original image (quality check passed)")
+            logger.info("Using original image (quality check passed)")
             image_base64 = image_to_base64(processed_image)
 
         else:
             # Extract accessory item to create professional image
-            print("Extracting accessory item (quality check failed)")
+            logger.info("Extracting accessory item (quality check failed)")
 
             # Reset image file pointer
             await image.seek(0)
@@ -532,18 +601,18 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
 
             if not extraction_result.get("generated_image_base64"):
                 # Fallback to original image if extraction fails
-                print("Extraction failed, falling back to original image")
+                logger.warning("Extraction failed, falling back to original image")
                 await image.seek(0)
                 processed_image = process_uploaded_image(image)
                 image_base64 = image_to_base64(processed_image)
             else:
-                print("Successfully extracted accessory item")
+                logger.info("Successfully extracted accessory item")
                 image_base64 = extraction_result["generated_image_base64"]
 
         # Step 2: Upload image to Supabase storage
         filename = f"accessory-{name.replace(' ', '-').lower()}-{int(time.time())}.png"
         image_url = await upload_accessory_image_to_supabase(image_base64, filename)
-        print(f"Accessory image uploaded successfully: {image_url}")
+        logger.info("Accessory image uploaded successfully: %s", image_url)
 
         # Step 3: Save to database
         saved_item = await save_accessory_item_to_db(
@@ -554,7 +623,8 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
             secondary_color=secondary_color,
             size=size,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         # Add metadata about the process
@@ -565,5 +635,5 @@ async def smart_save_accessory_item(user_id: str, name: str, category: str,
         return saved_item
 
     except Exception as e:
-        print(f"Error in smart accessory item creation: {e}")
+        logger.error("Error in smart accessory item creation: %s", e)
         raise e
\ No newline at end of file
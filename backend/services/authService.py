@@ -1,14 +1,10 @@
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import os
+from typing import TYPE_CHECKING
 
-load_dotenv()
+from . import clients
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+if TYPE_CHECKING:
+    from supabase import Client
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-def get_supabase_client() -> Client:
-    """Get Supabase client instance"""
-    return supabase
\ No newline at end of file
+def get_supabase_client() -> "Client":
+    """Get Supabase client instance (created on first use, see clients)"""
+    return clients.get(clients.SUPABASE)
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Streaming processing of file-based Gemini batch job results.
+
+A finished batch job's result file is JSONL with one response per
+requested item, each carrying a base64 image. Instead of downloading the
+whole file and building one response with every image, the file is
+streamed and parsed line by line: each image goes straight to Supabase
+storage (PNG bytes are uploaded as is, other formats are converted) and
+the item's outcome is upserted into batch_job_items in chunks. Job status
+lives in batch_jobs, and results are read back a page at a time.
+
+If processing fails partway, the next status check processes the file
+again: items already stored are skipped, images are stored under names
+derived from the job and item (so a re-upload overwrites), and the job's
+token usage is recorded only once its results are complete.
+"""
+
+import io
+import re
+import json
+import base64
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .authService import get_supabase_client
+from .clients import get_http_client
+from .gemini_client import GEMINI_API_KEY, get_gemini_client
+from .storage_service import upload_image_bytes_to_supabase
+from . import metrics, usage_accounting
+from .logger import get_logger, SAMPLED
+
+logger = get_logger(__name__)
+
+GEMINI_DOWNLOAD_URL = "https://generativelanguage.googleapis.com/download/v1beta/{file_name}:download"
+STREAM_CHUNK_BYTES = 64 * 1024
+ITEM_UPSERT_BATCH = 50
+MAX_PAGE_SIZE = 100
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# One result processor per job in this process, with the number of callers holding or waiting for it
+_processing_locks: Dict[str, asyncio.Lock] = {}
+_processing_waiters: Dict[str, int] = {}
+
+
+async def iter_jsonl(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    """Parse JSON objects from a stream of byte chunks, one per non-empty line"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        # Lines can be several MB, so only the new bytes are searched for line ends
+        start = len(buffer)
+        buffer += chunk
+        line_start = 0
+        end = buffer.find(b"\n", start)
+        while end != -1:
+            line = buffer[line_start:end]
+            if line.strip():
+                yield json.loads(line)
+            line_start = end + 1
+            end = buffer.find(b"\n", line_start)
+        if line_start:
+            del buffer[:line_start]
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def stream_result_file(file_name: str) -> AsyncIterator[Dict[str, Any]]:
+    """Stream a batch result file from the Gemini File API as parsed JSONL records"""
+    import httpx
+
+    url = GEMINI_DOWNLOAD_URL.format(file_name=file_name)
+    size = 0
+    with metrics.gemini_call("gemini-2.5-flash-image-preview", "batch_download"):
+        async with get_http_client().stream("GET", url, params={"alt": "media"},
+                                            headers={"x-goog-api-key": GEMINI_API_KEY},
+                                            timeout=httpx.Timeout(30, read=300)) as response:
+            response.raise_for_status()
+
+            async def chunks():
+                nonlocal size
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_BYTES):
+                    size += len(chunk)
+                    yield chunk
+
+            async for record in iter_jsonl(chunks()):
+                yield record
+    metrics.observe_payload("batch_result", size)
+
+
+def parse_item_key(key: str, items: List[str]) -> Tuple[int, str]:
+    """Item index and name from a request key ("item_<index>_<name>")"""
+    match = re.match(r"item_(\d+)_(.*)", key or "", re.DOTALL)
+    if not match:
+        return -1, key or "unknown"
+    index = int(match.group(1))
+    return index, items[index] if index < len(items) else match.group(2)
+
+
+def png_bytes(inline_data: Dict[str, Any]) -> bytes:
+    """PNG bytes of an inline image part, converting only if it isn't PNG already"""
+    data = base64.b64decode(inline_data["data"])
+    if inline_data.get("mimeType") == "image/png" or data.startswith(PNG_SIGNATURE):
+        return data
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(data)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _storage_name(job_name: str, index: int, item: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", item.lower()).strip("-") or "item"
+    return f"batch-{job_name.split('/')[-1]}-{index}-{slug}.png"
+
+
+def job_seconds(batch_job: Any) -> float:
+    """How long a finished Gemini batch job ran (0 if the API didn't say)"""
+    if getattr(batch_job, "create_time", None) and getattr(batch_job, "end_time", None):
+        return max((batch_job.end_time - batch_job.create_time).total_seconds(), 0.0)
+    return 0.0
+
+
+async def process_record(job_name: str, record: Dict[str, Any], items: List[str]) -> Dict[str, Any]:
+    """Turn one result line into a batch_job_items row, uploading its image"""
+    index, item = parse_item_key(record.get("key"), items)
+    row = {"job_name": job_name, "item_index": index, "item": item,
+           "success": False, "image_url": None, "description": None, "error": None}
+
+    if "error" in record:
+        row["error"] = str(record["error"])
+        return row
+
+    try:
+        image_data = None
+        for candidate in record.get("response", {}).get("candidates", [])[:1]:
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("text"):
+                    row["description"] = part["text"]
+                elif part.get("inlineData"):
+                    image_data = part["inlineData"]
+
+        if image_data is None:
+            row["error"] = "No image in response"
+            return row
+
+        row["image_url"] = await upload_image_bytes_to_supabase(png_bytes(image_data), _storage_name(job_name, index, item),
+                                                                unique=False)
+        row["description"] = row["description"] or f"Professional {item} product image generated"
+        row["success"] = True
+    except Exception as e:
+        logger.error("Error processing batch result for %s: %s", item, e)
+        row["error"] = f"Error processing response for {item}: {str(e)}"
+    return row
+
+
+async def delete_artifacts(file_names: List[str]) -> None:
+    """Delete a job's uploaded input files from the File API (best effort)"""
+    client = get_gemini_client()
+    for file_name in file_names:
+        try:
+            await client.aio.files.delete(name=file_name)
+        except Exception as e:
+            logger.warning("Could not delete batch file %s: %s", file_name, e)
+
+
+async def close_failed_job(job_name: str, job: Optional[Dict[str, Any]], status: str, error: Optional[str] = None) -> None:
+    """Record a failed or cancelled job once and delete its uploaded files"""
+    if not job or job.get("status") == status:
+        return
+    save_job(job_name, status=status, error=error)
+    await delete_artifacts(job.get("artifacts") or [])
+
+
+def _save_items(rows: List[Dict[str, Any]]) -> None:
+    with metrics.supabase_call("batch_job_items.upsert"):
+        get_supabase_client().table("batch_job_items").upsert(rows, on_conflict="job_name,item_index").execute()
+
+
+def save_job(job_name: str, **fields) -> None:
+    """Create or update a batch_jobs row"""
+    with metrics.supabase_call("batch_jobs.upsert"):
+        get_supabase_client().table("batch_jobs").upsert({"job_name": job_name, **fields}, on_conflict="job_name").execute()
+
+
+def _stored_items(job_name: str) -> Dict[int, Dict[str, Any]]:
+    """The successful batch_job_items rows already saved for a job, by item index"""
+    with metrics.supabase_call("batch_job_items.select"):
+        result = (
+            get_supabase_client().table("batch_job_items")
+            .select("job_name,item_index,item,success,image_url,description,error")
+            .eq("job_name", job_name)
+            .eq("success", True)
+            .execute()
+        )
+    return {row["item_index"]: row for row in result.data or []}
+
+
+def get_job(job_name: str) -> Optional[Dict[str, Any]]:
+    with metrics.supabase_call("batch_jobs.select"):
+        result = get_supabase_client().table("batch_jobs").select("*").eq("job_name", job_name).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+async def process_result_file(job_name: str, file_name: str,
+                              items: List[str]) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """
+    Stream a finished job's result file into storage and batch_job_items.
+
+    Memory use is bounded by one result line plus ITEM_UPSERT_BATCH rows;
+    items already stored by an earlier, interrupted run are not uploaded
+    again. Returns ({"total_items", "successful_items"}, the usage metadata
+    of every response line) so usage can be recorded once the job is done.
+    """
+    total = successful = 0
+    pending: List[Dict[str, Any]] = []
+    usage: List[Dict[str, Any]] = []
+    stored = _stored_items(job_name)
+
+    with metrics.stage("batch_results"):
+        async for record in stream_result_file(file_name):
+            if "response" in record:
+                usage.append({"usageMetadata": record["response"].get("usageMetadata") or {}})
+            index, _ = parse_item_key(record.get("key"), items)
+            row = stored.get(index) if index >= 0 else None
+            if row is None:
+                row = await process_record(job_name, record, items)
+                if row["item_index"] < 0:
+                    row["item_index"] = len(items) + total
+                pending.append(row)
+            total += 1
+            successful += row["success"]
+            logger.debug("Processed batch result %s for %s", row["item_index"], job_name, extra=SAMPLED)
+
+            if len(pending) >= ITEM_UPSERT_BATCH:
+                _save_items(pending)
+                pending = []
+
+        if pending:
+            _save_items(pending)
+
+    return {"total_items": total, "successful_items": successful}, usage
+
+
+async def ensure_processed(job_name: str, file_name: str, job: Optional[Dict[str, Any]],
+                           latency_seconds: float = 0.0) -> Dict[str, Any]:
+    """
+    Process a succeeded job's results once (concurrent status checks wait for the first).
+
+    Each response's token usage is recorded with latency_seconds (how long
+    the job ran) after the job is marked completed, so a retried run doesn't
+    count it twice.
+    """
+    lock = _processing_locks.setdefault(job_name, asyncio.Lock())
+    _processing_waiters[job_name] = _processing_waiters.get(job_name, 0) + 1
+    try:
+        async with lock:
+            job = get_job(job_name) or job or {}
+            if job.get("status") == "completed":
+                return job
+
+            save_job(job_name, status="processing")
+            try:
+                counts, usage = await process_result_file(job_name, file_name, job.get("items") or [])
+            except Exception as e:
+                save_job(job_name, status="succeeded", error=f"Error processing results: {str(e)}")
+                raise
+            completed = {
+                **job,
+                **counts,
+                "job_name": job_name,
+                "status": "completed",
+                "error": None,
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            }
+            save_job(job_name, **{field: completed[field] for field in
+                                  ("status", "total_items", "successful_items", "error", "completed_at")})
+            for response in usage:
+                usage_accounting.record_call("gemini-2.5-flash-image-preview", "batch_generate", response,
+                                             latency_seconds, batch=True)
+            # The uploaded image and requests are no longer needed once results are stored
+            await delete_artifacts(job.get("artifacts") or [])
+            return completed
+    finally:
+        _processing_waiters[job_name] -= 1
+        if not _processing_waiters[job_name]:
+            del _processing_waiters[job_name]
+            _processing_locks.pop(job_name, None)
+
+
+def get_item_page(job_name: str, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    """A page of a job's item results in request order"""
+    with metrics.supabase_call("batch_job_items.select"):
+        result = (
+            get_supabase_client().table("batch_job_items")
+            .select("item_index,item,success,image_url,description,error")
+            .eq("job_name", job_name)
+            .order("item_index")
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+    return result.data or []
@@ -0,0 +1,72 @@
+"""
+Resolve stored clothing categories to display categories (tops, bottoms, ...).
+
+A stored category resolves to the first display category (in config order)
+that has a clothing type containing it, case-insensitively - so "jeans",
+"dress" and "shirt" resolve like their full type names. All substrings of
+every type name are precomputed into one dict when first used, which makes
+resolving a single lookup instead of a scan over every config's types.
+"""
+
+from typing import Dict, Optional
+
+from .lazy_modules import LazyModules
+
+# Display categories in precedence order (first match wins), configs imported on first use
+CATEGORY_CONFIGS = LazyModules({
+    "tops": "models.tops_config",
+    "bottoms": "models.bottoms_config",
+    "footwear": "models.footwear_config",
+    "outerwear": "models.outerwear_config",
+    "accessories": "models.accessories_config",
+    "undergarments": "models.undergarments_config",
+    "dresses": "models.dresses_config",
+    "sleepwear": "models.sleepwear_config"
+})
+
+DISPLAY_CATEGORIES = sorted(CATEGORY_CONFIGS) + ["other"]
+
+# Common category names that aren't substrings of any clothing type
+CATEGORY_ALIASES = {
+    "clothing": "tops",  # Default fallback
+    "accessory": "accessories",
+    "top": "tops",
+    "bottom": "bottoms",
+    "shoe": "footwear",
+    "shoes": "footwear",
+    "jacket": "outerwear",
+    "coat": "outerwear",
+    "dress": "dresses",
+    "underwear": "undergarments",
+    "sleepwear": "sleepwear"
+}
+
+_resolution_table: Optional[Dict[str, str]] = None
+
+
+def _build_resolution_table() -> Dict[str, str]:
+    table: Dict[str, str] = {}
+
+    # Every substring of every type name, keeping the first display category to claim it
+    for display_category, config in CATEGORY_CONFIGS.items():
+        for clothing_type in getattr(config, "CLOTHING_TYPES", []):
+            name = clothing_type.lower()
+            for start in range(len(name)):
+                for end in range(start + 1, len(name) + 1):
+                    table.setdefault(name[start:end], display_category)
+
+    # Aliases only apply when no clothing type matched
+    for alias, display_category in CATEGORY_ALIASES.items():
+        table.setdefault(alias, display_category)
+
+    return table
+
+
+def resolve_display_category(category: Optional[str]) -> str:
+    """Map a stored category (e.g. "jeans", "Hoodie") to its display category"""
+    global _resolution_table
+    if not category:
+        return "other"
+    if _resolution_table is None:
+        _resolution_table = _build_resolution_table()
+    return _resolution_table.get(category.lower(), "other")
@@ -0,0 +1,150 @@
+"""
+Process-wide registry of external API clients.
+
+Every module gets its Supabase, Gemini and HTTP clients from here instead
+of building its own at import time. Clients are constructed on first use
+(so importing the app needs no credentials and opens no connections),
+shared by every caller, and closed by close_all() when the app shuts down
+(see the lifespan in server.py).
+
+Tests and benchmarks can inject fakes before anything asks for a client:
+    >>> clients.override("supabase", FakeSupabase())
+    >>> clients.reset()  # back to the real factories
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv()
+
+SUPABASE = "supabase"
+GEMINI = "gemini"
+HTTP = "http"
+
+# Keep-alive pool for image downloads (wardrobe images, batch result files)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_TIMEOUT_SECONDS = 30
+
+
+def _create_supabase():
+    from supabase import create_client
+
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        raise ValueError("Missing required Supabase environment variables")
+    return create_client(url, key)
+
+
+def _close_supabase(client) -> None:
+    # Sub-clients are created lazily, so only the ones in use have sessions
+    for sub_client in (client._postgrest, client._storage, client._functions):
+        session = getattr(sub_client, "session", None)
+        if session is not None:
+            session.close()
+    client.auth._http_client.close()
+
+
+def _create_gemini():
+    from google import genai
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is required")
+    return genai.Client(api_key=api_key)
+
+
+async def _close_gemini(client) -> None:
+    client.close()
+    await client.aio.aclose()
+
+
+def _create_http():
+    import httpx
+
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS)
+    )
+
+
+async def _close_http(client) -> None:
+    await client.aclose()
+
+
+class ClientRegistry:
+    """Named clients built lazily by their factories, one instance each"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.factories: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[Any], Any]]]] = {}
+        self.instances: Dict[str, Any] = {}
+        self.overridden: set = set()
+
+    def register(self, name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], Any]] = None) -> None:
+        """Add a client factory and an optional (sync or async) close function"""
+        self.factories[name] = (factory, close)
+
+    def get(self, name: str) -> Any:
+        """The shared client, created on first use"""
+        client = self.instances.get(name)
+        if client is not None:
+            return client
+        with self.lock:
+            if name not in self.instances:
+                self.instances[name] = self.factories[name][0]()
+                logger.info("Created %s client", name)
+            return self.instances[name]
+
+    def override(self, name: str, client: Any) -> None:
+        """Use the given client (e.g. a fake) instead of building one"""
+        with self.lock:
+            self.instances[name] = client
+            self.overridden.add(name)
+
+    def reset(self) -> None:
+        """Forget all clients and overrides without closing them"""
+        with self.lock:
+            self.instances.clear()
+            self.overridden.clear()
+
+    async def close_all(self) -> None:
+        """Close every client this registry created; overrides are left to their owners"""
+        with self.lock:
+            created = [(name, client) for name, client in self.instances.items() if name not in self.overridden]
+            for name, _ in created:
+                del self.instances[name]
+
+        for name, client in created:
+            close = self.factories[name][1]
+            if close is None:
+                continue
+            try:
+                result = close(client)
+                if hasattr(result, "__await__"):
+                    await result
+            except Exception as e:
+                logger.warning("Error closing %s client: %s", name, e)
+
+
+registry = ClientRegistry()
+registry.register(SUPABASE, _create_supabase, _close_supabase)
+registry.register(GEMINI, _create_gemini, _close_gemini)
+registry.register(HTTP, _create_http, _close_http)
+
+get = registry.get
+override = registry.override
+reset = registry.reset
+close_all = registry.close_all
+
+
+def get_http_client():
+    """The shared async HTTP client (pooled keep-alive connections)"""
+    return registry.get(HTTP)
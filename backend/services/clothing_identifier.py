@@ -3,40 +3,42 @@ import io
 import base64
 import sys
 import os
-from typing import List, Dict, Any, Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
 from PIL import Image
 
+if TYPE_CHECKING:
+    from google.genai import types
+
 # Add backend directory to path if running directly
 if __name__ == "__main__":
     backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if backend_dir not in sys.path:
         sys.path.insert(0, backend_dir)
 
-from services.gemini_client import get_gemini_client, analysis_model
-from models import *
-import models.tops_config as tops_config
-import models.bottoms_config as bottoms_config
-import models.footwear_config as footwear_config
-import models.outerwear_config as outerwear_config
-import models.accessories_config as accessories_config
-import models.undergarments_config as undergarments_config
-import models.dresses_config as dresses_config
-import models.sleepwear_config as sleepwear_config
-import models.other_config as other_config
-
-
-# Map category names to their config modules
-CONFIG_MODULES = {
-    "tops": tops_config,
-    "bottoms": bottoms_config,
-    "footwear": footwear_config,
-    "outerwear": outerwear_config,
-    "accessories": accessories_config,
-    "undergarments": undergarments_config,
-    "dresses": dresses_config,
-    "sleepwear": sleepwear_config,
-    "other": other_config
-}
+from services.gemini_client import analysis_model, generate_content
+from services.prompt_cache import PromptCache, is_missing_cache_error
+from services.color_service import normalize_color_name
+from services.logger import get_logger
+from services.lazy_modules import LazyModules
+
+
+# Map category names to their config modules (imported on first use)
+CONFIG_MODULES = LazyModules({
+    "tops": "models.tops_config",
+    "bottoms": "models.bottoms_config",
+    "footwear": "models.footwear_config",
+    "outerwear": "models.outerwear_config",
+    "accessories": "models.accessories_config",
+    "undergarments": "models.undergarments_config",
+    "dresses": "models.dresses_config",
+    "sleepwear": "models.sleepwear_config",
+    "other": "models.other_config"
+})
+
+logger = get_logger(__name__)
+
+_MISSING = object()
 
 def get_clothing_category(clothing_type: str) -> str:
     """Determine which category a clothing type belongs to."""
@@ -45,8 +47,87 @@ def get_clothing_category(clothing_type: str) -> str:
             return category
     return "other"
 
+def _normalize_feature_value(value: Any) -> str:
+    return str(value).strip().lower()
+
+_feature_schema: Optional[Dict[str, Dict[str, Any]]] = None
+
+def get_feature_schema() -> Dict[str, Dict[str, Any]]:
+    """
+    Build (once) the feature schema from the config modules.
+
+    Returns a dict of lowercased clothing type -> {"type": ClassName,
+    "params": {param: {normalized value: allowed value}}}. Types are keyed in
+    lowercase because stored categories are lowercased clothing types.
+    """
+    global _feature_schema
+    if _feature_schema is None:
+        schema = {}
+        for config in CONFIG_MODULES.values():
+            for clothing_type, params in config.PARAMETER_CONFIG.items():
+                schema[clothing_type.lower()] = {
+                    "type": clothing_type,
+                    "params": {
+                        param: {_normalize_feature_value(v): v for v in values if v is not None}
+                        for param, values in params.get("allowed_values", {}).items()
+                    }
+                }
+        _feature_schema = schema
+    return _feature_schema
+
+def validate_features(clothing_type: str, features: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Keep only the features allowed for a clothing type, mapped to their canonical values.
+
+    Matching is case-insensitive for both the type and the values (e.g. "wool" -> "Wool").
+    Unknown parameters and values outside allowed_values are dropped with a warning.
+    """
+    if not features:
+        return {}
+
+    type_schema = get_feature_schema().get((clothing_type or "").lower())
+    if type_schema is None:
+        return {}
+
+    validated = {}
+    for param, value in features.items():
+        allowed = type_schema["params"].get(param)
+        if allowed is None or value is None:
+            continue
+        canonical = allowed.get(_normalize_feature_value(value), _MISSING)
+        if canonical is _MISSING:
+            logger.warning("Dropping %s feature %s=%r: not in allowed values", type_schema["type"], param, value)
+            continue
+        validated[param] = canonical
+    return validated
+
+def parse_feature_filters(filters: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Turn query-string attribute filters (e.g. {"material": "wool"}) into a
+    JSONB containment filter with canonical values.
+
+    Raises:
+        ValueError: If a parameter or value isn't in any type's allowed values
+    """
+    # Union of allowed values per parameter across all clothing types
+    allowed_by_param: Dict[str, Dict[str, Any]] = {}
+    for type_schema in get_feature_schema().values():
+        for param, allowed in type_schema["params"].items():
+            allowed_by_param.setdefault(param, {}).update(allowed)
+
+    parsed = {}
+    for param, value in filters.items():
+        if param not in allowed_by_param:
+            raise ValueError(f"Unknown attribute filter: {param}")
+        canonical = allowed_by_param[param].get(_normalize_feature_value(value), _MISSING)
+        if canonical is _MISSING:
+            raise ValueError(f"Invalid value for {param}: {value}")
+        parsed[param] = canonical
+    return parsed
+
+@lru_cache(maxsize=1)
 def generate_clothing_identification_prompt() -> str:
-    """Generate a comprehensive prompt using all configuration files."""
+    """Generate a comprehensive prompt using all configuration files (built once; the configs are static)."""
     prompt_parts = [
         "Analyze this image and identify all visible clothing items and accessories. For each item, provide:",
         "",
@@ -139,13 +220,57 @@ def generate_clothing_identification_prompt() -> str:
     
     return "\n".join(prompt_parts)
 
-def identify_clothing_from_image(image: Image.Image, generate_id: bool = True) -> List[Dict[str, Any]]:
+# The identification prompt is registered as Gemini cached content; with the
+# cache each call only sends the image and this instruction
+identification_prompt_cache = PromptCache(analysis_model, "clothing-identification", generate_clothing_identification_prompt)
+IDENTIFICATION_INSTRUCTION = "Identify all visible clothing items and accessories in this image following the instructions above. Return ONLY the JSON array."
+
+def _inline_image_part(image: Image.Image) -> Dict[str, Any]:
+    """Image as an inline JPEG part"""
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG')
+    return {
+        "inline_data": {
+            "mime_type": "image/jpeg",
+            "data": base64.b64encode(buffer.getvalue()).decode()
+        }
+    }
+
+def _request_identification(image_part):
+    """Send the identification request, using the cached prompt when available"""
+    from google.genai import types
+
+    cached_content = identification_prompt_cache.get()
+    if cached_content:
+        try:
+            return generate_content(
+                analysis_model,
+                operation="identify",
+                contents=[{"parts": [{"text": IDENTIFICATION_INSTRUCTION}, image_part]}],
+                config=types.GenerateContentConfig(cached_content=cached_content)
+            )
+        except Exception as e:
+            # Only a cache that expired or was deleted server-side is worth retrying without
+            if not is_missing_cache_error(e):
+                raise
+            logger.warning("Cached identification prompt is gone, retrying with the full prompt: %s", e)
+            identification_prompt_cache.invalidate()
+
+    return generate_content(
+        analysis_model,
+        operation="identify",
+        contents=[{"parts": [{"text": generate_clothing_identification_prompt()}, image_part]}]
+    )
+
+def identify_clothing_from_image(image: Image.Image, generate_id: bool = True,
+                                 image_part: Optional["types.Part"] = None) -> List[Dict[str, Any]]:
     """
     Identify clothing items in an image using Gemini 1.5 and return appropriate clothing models.
     
     Args:
         image (PIL.Image): The image to analyze
         generate_id (bool): Whether to generate unique IDs for clothing items
+        image_part (types.Part): Already uploaded or encoded part for the image (see image_handles); sent inline as JPEG when omitted
         
     Returns:
         List[Dict[str, Any]]: List of dictionaries containing clothing information and model instances
@@ -157,34 +282,9 @@ def identify_clothing_from_image(image: Image.Image, generate_id: bool = True) -
         >>> for item in results:
         ...     print(f"Found {item['type']}: {item['model'].name}")
     """
-    client = get_gemini_client()
-    
-    # Convert PIL image to base64 for API
-    buffer = io.BytesIO()
-    image.save(buffer, format='JPEG')
-    image_data = base64.b64encode(buffer.getvalue()).decode()
-    
-    # Create comprehensive prompt using configuration files
-    prompt = generate_clothing_identification_prompt()
-    
     try:
-        # Send request to Gemini
-        response = client.models.generate_content(
-            model=analysis_model,
-            contents=[
-                {
-                    "parts": [
-                        {"text": prompt},
-                        {
-                            "inline_data": {
-                                "mime_type": "image/jpeg",
-                                "data": image_data
-                            }
-                        }
-                    ]
-                }
-            ]
-        )
+        # Send request to Gemini (the static prompt is sent from the context cache when possible)
+        response = _request_identification(image_part if image_part is not None else _inline_image_part(image))
         
         # Parse response
         response_text = response.text.strip()
@@ -235,13 +335,20 @@ def identify_clothing_from_image(image: Image.Image, generate_id: bool = True) -
                         'raw_data': item
                     })
             except Exception as e:
-                print(f"Error creating model for {item.get('clothing_type', 'unknown')}: {e}")
+                logger.error("Error creating model for %s: %s", item.get('clothing_type', 'unknown'), e)
                 continue
         
+        # Suggest a more specific category for all "Other" items in one batch
+        other_models = [result['model'] for result in results if result['type'] == 'Other']
+        if other_models:
+            suggestions = CONFIG_MODULES["other"].suggest_categories([model.name for model in other_models])
+            for model, suggestion in zip(other_models, suggestions):
+                model.suggested_category = suggestion
+        
         return results
         
     except Exception as e:
-        print(f"Error in clothing identification: {e}")
+        logger.error("Error in clothing identification: %s", e)
         return []
 
 
@@ -264,91 +371,14 @@ def create_clothing_model(clothing_type: str, name: str, primary_color: str,
     Returns:
         Clothing model instance or None if type not found
     """
-    # Map clothing types to their classes
-    clothing_classes = {
-        # Tops
-        'TShirt': TShirt,
-        'DressShirt': DressShirt,
-        'Blouse': Blouse,
-        'TankTop': TankTop,
-        'Sweater': Sweater,
-        'Hoodie': Hoodie,
-        'Sweatshirt': Sweatshirt,
-        'Cardigan': Cardigan,
-        'WorkoutTop': WorkoutTop,
-        
-        # Bottoms
-        'Pants': Pants,
-        'Shorts': Shorts,
-        'Jeans': Jeans,
-        'DressPants': DressPants,
-        'Trousers': Trousers,
-        'Chinos': Chinos,
-        'Skirt': Skirt,
-        'Leggings': Leggings,
-        'SweatPants': SweatPants,
-        'Joggers': Joggers,
-        'AthleticShorts': AthleticShorts,
-        'YogaPants': YogaPants,
-        
-        # Footwear
-        'Sneakers': Sneakers,
-        'DressShoes': DressShoes,
-        'Boots': Boots,
-        'Sandals': Sandals,
-        'Flats': Flats,
-        'Heels': Heels,
-        'AthleticShoes': AthleticShoes,
-        
-        # Outerwear
-        'Jacket': Jacket,
-        'Blazer': Blazer,
-        'Coat': Coat,
-        'WinterCoat': WinterCoat,
-        'RainJacket': RainJacket,
-        'Windbreaker': Windbreaker,
-        'Vest': Vest,
-        
-        # Accessories
-        'Hat': Hat,
-        'Cap': Cap,
-        'Belt': Belt,
-        'Scarf': Scarf,
-        'Gloves': Gloves,
-        'Sunglasses': Sunglasses,
-        'Watch': Watch,
-        
-        # Undergarments
-        'Underwear': Underwear,
-        'Bra': Bra,
-        'SportsBra': SportsBra,
-        'Undershirt': Undershirt,
-        'Socks': Socks,
-        'Pantyhose': Pantyhose,
-        'Tights': Tights,
-        
-        # Dresses
-        'CasualDress': CasualDress,
-        'FormalDress': FormalDress,
-        'MaxiDress': MaxiDress,
-        'MiniDress': MiniDress,
-        'Jumpsuit': Jumpsuit,
-        'Romper': Romper,
-        
-        # Sleepwear
-        'Pajamas': Pajamas,
-        'Nightgown': Nightgown,
-        'Robe': Robe,
-        
-        # Other
-        'Other': Other,
-    }
-    
-    if clothing_type not in clothing_classes:
-        print(f"Unknown clothing type: {clothing_type}")
+    import models
+
+    # Every clothing model class is exported by the models package
+    if clothing_type not in models.__all__ or clothing_type == "Clothes":
+        logger.warning("Unknown clothing type: %s", clothing_type)
         return None
     
-    clothing_class = clothing_classes[clothing_type]
+    clothing_class = getattr(models, clothing_type)
     
     # Get the category for this clothing type to access configuration
     category = get_clothing_category(clothing_type)
@@ -359,7 +389,7 @@ def create_clothing_model(clothing_type: str, name: str, primary_color: str,
         validation_result = config_module.validate_parameters(clothing_type, attributes)
         if validation_result.get("warnings"):
             for warning in validation_result["warnings"]:
-                print(f"Warning for {clothing_type}: {warning}")
+                logger.warning("Warning for %s: %s", clothing_type, warning)
     
     # Get default parameters and merge with provided attributes
     final_attributes = {}
@@ -381,12 +411,12 @@ def create_clothing_model(clothing_type: str, name: str, primary_color: str,
         else:
             return clothing_class(*base_args)
     except Exception as e:
-        print(f"Error creating {clothing_type} instance with attributes {final_attributes}: {e}")
+        logger.error("Error creating %s instance with attributes %s: %s", clothing_type, final_attributes, e)
         try:
             # Fallback to base arguments only
             return clothing_class(*base_args)
         except Exception as e2:
-            print(f"Fallback failed for {clothing_type}: {e2}")
+            logger.error("Fallback failed for %s: %s", clothing_type, e2)
             return None
 
 
@@ -402,7 +432,7 @@ def batch_identify_clothing(images: List[Image.Image]) -> List[List[Dict[str, An
     """
     results = []
     for i, image in enumerate(images):
-        print(f"Processing image {i + 1}/{len(images)}...")
+        logger.info("Processing image %s/%s...", i + 1, len(images))
         image_results = identify_clothing_from_image(image, generate_id=True)
         results.append(image_results)
     return results
@@ -431,8 +461,8 @@ def get_clothing_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Count categories
         categories[clothing_type] = categories.get(clothing_type, 0) + 1
         
-        # Count colors
-        primary_color = model.primary_color
+        # Count colors by normalized name so "navy" and "Navy Blue" group together
+        primary_color = normalize_color_name(model.primary_color) or model.primary_color
         colors[primary_color] = colors.get(primary_color, 0) + 1
     
     return {
@@ -457,20 +487,20 @@ def test_clothing_identification():
             image = Image.open(test_image_path)
             results = identify_clothing_from_image(image)
             
-            print(f"Identified {len(results)} clothing items:")
+            logger.info("Identified %s clothing items:", len(results))
             for item in results:
                 model = item['model']
-                print(f"- {item['type']}: {model.name} ({model.primary_color})")
+                logger.info("- %s: %s (%s)", item['type'], model.name, model.primary_color)
             
             summary = get_clothing_summary(results)
-            print(f"\nSummary: {summary}")
+            logger.info("\nSummary: %s", summary)
             
             return results
         else:
-            print(f"Test image not found: {test_image_path}")
+            logger.info("Test image not found: %s", test_image_path)
             return []
     except Exception as e:
-        print(f"Test failed: {e}")
+        logger.error("Test failed: %s", e)
         return []
 
 
@@ -2,62 +2,42 @@ import io
 import json
 import time
 import base64
-import os
+import uuid
 import asyncio
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from fastapi import UploadFile
 from PIL import Image
-from google import genai
-from google.genai import types
 
-from .gemini_client import get_gemini_client, editing_model, analysis_model
-from .image_processing import process_uploaded_image, image_to_base64
-from .clothing_identifier import identify_clothing_from_image
+from .gemini_client import get_gemini_client, editing_model, analysis_model, generate_content, generate_content_async
+from .image_processing import process_uploaded_image, image_to_base64, decode_item_image
+from .clothing_identifier import identify_clothing_from_image, validate_features
 from .authService import get_supabase_client
+from .db_batch import insert_rows
+from .category_resolver import resolve_display_category
+from . import color_service, similarity_service
+from .image_handles import get_image_part_async
+from .storage_service import upload_image_to_supabase
+from . import batch_results, usage_accounting
+from . import extraction_planner
+from . import metrics
+from .logger import get_logger
 import processing.utility.image_utils as image_utils
 
-async def upload_image_to_supabase(image_base64: str, filename: str) -> str:
-    """Upload base64 image to Supabase storage and return public URL"""
-    try:
-        supabase = get_supabase_client()
-        
-        # Convert base64 to bytes
-        image_bytes = base64.b64decode(image_base64)
-        
-        # Create unique filename
-        unique_filename = f'{int(time.time())}-{filename}'
-        print(f"Uploading image: {unique_filename}, size: {len(image_bytes)} bytes")
-        
-        # Upload to Supabase storage
-        result = supabase.storage.from_('clothing-items').upload(
-            unique_filename,
-            image_bytes,
-            file_options={'content-type': 'image/png'}
-        )
-        
-        print(f"Upload result: {result}")
-        
-        if result and hasattr(result, 'path'):
-            # Get public URL using the path from the upload response
-            public_url = supabase.storage.from_('clothing-items').get_public_url(result.path)
-            print(f"Generated public URL: {public_url}")
-            return public_url
-        else:
-            raise Exception(f"Upload failed: {result}")
-            
-    except Exception as e:
-        print(f"Error uploading image to Supabase: {e}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        raise e
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = get_logger(__name__)
 
 async def save_clothing_item_to_db(user_id: str, name: str, category: str,
                                  primary_color: str = None, secondary_color: str = None,
-                                 image_url: str = None, is_owned: bool = True, features: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Save clothing item to Supabase database"""
+                                 image_url: str = None, is_owned: bool = True, features: Dict[str, Any] = None,
+                                 image_base64: str = None) -> Dict[str, Any]:
+    """Save clothing item to Supabase database (image_base64 is only used for its dominant color and similarity descriptor)"""
     try:
         supabase = get_supabase_client()
         
+        image = decode_item_image(image_base64)
+
         item_data = {
             "profile_id": user_id,
             "name": name,
@@ -65,28 +45,65 @@ async def save_clothing_item_to_db(user_id: str, name: str, category: str,
             "primary_color": primary_color,
             "secondary_color": secondary_color,
             "image_url": image_url,
-            "is_owned": is_owned
+            "is_owned": is_owned,
+            "features": validate_features(category, features),
+            "display_category": resolve_display_category(category),
+            **color_service.color_fields(primary_color, secondary_color, image)
         }
         
-        result = supabase.table("clothes").insert(item_data).execute()
+        with metrics.supabase_call("clothes.insert"):
+            result = supabase.table("clothes").insert(item_data).execute()
         
         if result.data:
+            color_service.invalidate_color_index(user_id)
+            await similarity_service.index_saved_items(user_id, "clothing", [{"success": True, "data": result.data[0]}], [image])
             return result.data[0]
         else:
             raise Exception(f"Database insert failed: {result}")
             
     except Exception as e:
-        print(f"Error saving clothing item to database: {e}")
+        logger.error("Error saving clothing item to database: %s", e)
         raise e
 
+async def save_clothing_items_to_db(user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Save many clothing items in a single insert.
+
+    Each item takes the same fields as save_clothing_item_to_db. Returns one
+    result per item, in order: {"success": True, "data": row} or
+    {"success": False, "error": message}.
+    """
+    images = [decode_item_image(item.get("image_base64")) for item in items]
+    rows = [
+        {
+            "profile_id": user_id,
+            "name": item["name"],
+            "category": item["category"],
+            "primary_color": item.get("primary_color"),
+            "secondary_color": item.get("secondary_color"),
+            "image_url": item.get("image_url"),
+            "is_owned": item.get("is_owned", True),
+            "features": validate_features(item["category"], item.get("features")),
+            "display_category": resolve_display_category(item["category"]),
+            **color_service.color_fields(item.get("primary_color"), item.get("secondary_color"), image)
+        }
+        for item, image in zip(items, images)
+    ]
+    results = await insert_rows("clothes", rows)
+    if any(result["success"] for result in results):
+        color_service.invalidate_color_index(user_id)
+    await similarity_service.index_saved_items(user_id, "clothing", results, images)
+    return results
+
 async def update_clothing_item_image_url(item_id: str, image_url: str) -> Dict[str, Any]:
     """Update the image URL for a clothing item in the database"""
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table("clothes").update({
-            "image_url": image_url
-        }).eq("id", item_id).execute()
+        with metrics.supabase_call("clothes.update"):
+            result = supabase.table("clothes").update({
+                "image_url": image_url
+            }).eq("id", item_id).execute()
         
         if result.data:
             return result.data[0]
@@ -94,7 +111,7 @@ async def update_clothing_item_image_url(item_id: str, image_url: str) -> Dict[s
             raise Exception(f"Database update failed: {result}")
             
     except Exception as e:
-        print(f"Error updating clothing item image URL: {e}")
+        logger.error("Error updating clothing item image URL: %s", e)
         raise e
 
 async def find_clothing_item_by_name_and_user(user_id: str, name: str) -> Dict[str, Any]:
@@ -102,7 +119,8 @@ async def find_clothing_item_by_name_and_user(user_id: str, name: str) -> Dict[s
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table("clothes").select("*").eq("profile_id", user_id).eq("name", name).limit(1).execute()
+        with metrics.supabase_call("clothes.select"):
+            result = supabase.table("clothes").select("*").eq("profile_id", user_id).eq("name", name).limit(1).execute()
         
         if result.data and len(result.data) > 0:
             return result.data[0]
@@ -110,13 +128,11 @@ async def find_clothing_item_by_name_and_user(user_id: str, name: str) -> Dict[s
             return None
             
     except Exception as e:
-        print(f"Error finding clothing item: {e}")
+        logger.error("Error finding clothing item: %s", e)
         return None
 
 async def extract_single_clothing_item(image: UploadFile) -> dict:
     """Extract clothing item from photo and create professional product image"""
-    client = get_gemini_client()
-    
     # Process uploaded image
     processed_image = process_uploaded_image(image)
     
@@ -127,10 +143,7 @@ async def extract_single_clothing_item(image: UploadFile) -> dict:
     contents = [prompt, processed_image]
     
     # Generate the professional product image
-    response = client.models.generate_content(
-        model=editing_model,
-        contents=contents
-    )
+    response = generate_content(editing_model, contents, operation="extract_single")
     
     # Process response - check for both generated image and text description
     generated_image_base64 = None
@@ -154,6 +167,7 @@ async def analyze_clothing_quality(image: UploadFile) -> dict:
     processed_image = process_uploaded_image(image)
     return check_professional_clothing_image(processed_image)
 
+@metrics.stage("quality_check")
 def check_professional_clothing_image(image: Image.Image) -> dict:
     """
     Check if an image is a professional studio quality photo of a single clothing item
@@ -164,8 +178,6 @@ def check_professional_clothing_image(image: Image.Image) -> dict:
     Returns:
         dict: Analysis results containing is_professional, is_single_item, item_type, and confidence
     """
-    client = get_gemini_client()
-    
     try:
         # Create analysis prompt
         prompt = """
@@ -197,10 +209,7 @@ def check_professional_clothing_image(image: Image.Image) -> dict:
         contents = [prompt, image]
         
         # Call Gemini 1.5 Flash for analysis
-        response = client.models.generate_content(
-            model=analysis_model,
-            contents=contents
-        )
+        response = generate_content(analysis_model, contents, operation="quality_check")
         
         # Extract text response
         analysis_text = None
@@ -249,19 +258,21 @@ async def identify_clothing_items(image: UploadFile) -> dict:
     processed_image = process_uploaded_image(image)
     return itemize_photo(processed_image)
 
-def itemize_photo(image: Image.Image) -> dict:
+@metrics.stage("itemize")
+def itemize_photo(image: Image.Image, image_part: Optional["types.Part"] = None) -> dict:
     """
     Analyze an image and return a dict of clothing items and accessories found with their features
     
     Args:
         image: PIL Image object to analyze
+        image_part: Already uploaded or encoded part for the image (see image_handles)
         
     Returns:
         dict: Dict containing clothing items and accessories found in the image with detailed features
     """
     try:
         # Use the identify_clothing_from_image function to get detailed clothing analysis
-        identified_items = identify_clothing_from_image(image, generate_id=False)
+        identified_items = identify_clothing_from_image(image, generate_id=False, image_part=image_part)
         
         clothing_items = []
         accessories = []
@@ -277,20 +288,14 @@ def itemize_photo(image: Image.Image) -> dict:
                 "type": clothing_type,
                 "primary_color": model.primary_color,
                 "secondary_color": model.secondary_color,
-                "features": {}
+                # Type-specific fields are copied straight from the model's FEATURE_FIELDS
+                "features": {
+                    "clothing_category": model.clothing_category,
+                    "is_owned": model.is_owned,
+                    **model.features()
+                }
             }
             
-            # Extract features from the model based on its type
-            # Get all attributes that are not in the base clothing model
-            base_attrs = {'item_id', 'name', 'primary_color', 'secondary_color', 'image'}
-            for attr_name in dir(model):
-                if (not attr_name.startswith('_') and 
-                    attr_name not in base_attrs and
-                    not callable(getattr(model, attr_name))):
-                    attr_value = getattr(model, attr_name)
-                    if attr_value is not None:
-                        item_data["features"][attr_name] = attr_value
-            
             # Categorize as clothing item or accessory
             accessory_types = {
                 'Hat', 'Cap', 'Belt', 'Scarf', 'Gloves', 'Sunglasses', 'Watch'
@@ -308,11 +313,11 @@ def itemize_photo(image: Image.Image) -> dict:
         
     except Exception as e:
         # Log error and return empty dict
-        print(f"Error itemizing photo: {str(e)}")
+        logger.error("Error itemizing photo: %s", str(e))
         return {"clothing_items": [], "accessories": []}
 
-async def get_user_clothes(user_id: str, owned_only: bool = None) -> List[Dict[str, Any]]:
-    """Get all clothing items for a user, optionally filtered by ownership"""
+async def get_user_clothes(user_id: str, owned_only: bool = None, features: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Get all clothing items for a user, optionally filtered by ownership and features"""
     try:
         supabase = get_supabase_client()
 
@@ -321,12 +326,17 @@ async def get_user_clothes(user_id: str, owned_only: bool = None) -> List[Dict[s
         if owned_only is not None:
             query = query.eq("is_owned", owned_only)
 
-        result = query.execute()
+        # JSONB containment (features @> filter) uses the features GIN index
+        if features:
+            query = query.contains("features", features)
+
+        with metrics.supabase_call("clothes.select"):
+            result = query.execute()
 
         return result.data if result.data else []
 
     except Exception as e:
-        print(f"Error getting user clothes: {e}")
+        logger.error("Error getting user clothes: %s", e)
         return []
 
 async def get_clothing_by_id(clothing_id: str, user_id: str = None) -> Dict[str, Any]:
@@ -339,7 +349,8 @@ async def get_clothing_by_id(clothing_id: str, user_id: str = None) -> Dict[str,
         if user_id:
             query = query.eq("profile_id", user_id)
 
-        result = query.limit(1).execute()
+        with metrics.supabase_call("clothes.select"):
+            result = query.limit(1).execute()
 
         if result.data and len(result.data) > 0:
             return result.data[0]
@@ -347,7 +358,7 @@ async def get_clothing_by_id(clothing_id: str, user_id: str = None) -> Dict[str,
             return None
 
     except Exception as e:
-        print(f"Error getting clothing by ID: {e}")
+        logger.error("Error getting clothing by ID: %s", e)
         return None
 
 async def update_clothing_item(item_id: str, user_id: str, **updates) -> Dict[str, Any]:
@@ -362,15 +373,21 @@ async def update_clothing_item(item_id: str, user_id: str, **updates) -> Dict[st
         if not update_data:
             raise ValueError("No valid update data provided")
 
-        result = supabase.table("clothes").update(update_data).eq("id", item_id).eq("profile_id", user_id).execute()
+        if "category" in update_data:
+            update_data["display_category"] = resolve_display_category(update_data["category"])
+        update_data.update(color_service.color_updates(update_data))
+
+        with metrics.supabase_call("clothes.update"):
+            result = supabase.table("clothes").update(update_data).eq("id", item_id).eq("profile_id", user_id).execute()
 
         if result.data:
+            color_service.invalidate_color_index(user_id)
             return result.data[0]
         else:
             raise Exception(f"Database update failed: {result}")
 
     except Exception as e:
-        print(f"Error updating clothing item: {e}")
+        logger.error("Error updating clothing item: %s", e)
         raise e
 
 async def delete_clothing_item(item_id: str, user_id: str) -> bool:
@@ -378,16 +395,20 @@ async def delete_clothing_item(item_id: str, user_id: str) -> bool:
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("clothes").delete().eq("id", item_id).eq("profile_id", user_id).execute()
+        with metrics.supabase_call("clothes.delete"):
+            result = supabase.table("clothes").delete().eq("id", item_id).eq("profile_id", user_id).execute()
+        color_service.invalidate_color_index(user_id)
+        await similarity_service.remove_item(user_id, "clothing", item_id)
 
         return len(result.data) > 0 if result.data else False
 
     except Exception as e:
-        print(f"Error deleting clothing item: {e}")
+        logger.error("Error deleting clothing item: %s", e)
         return False
 
-async def get_clothes_by_category(user_id: str, category: str, owned_only: bool = None) -> List[Dict[str, Any]]:
-    """Get clothing items by category for a user"""
+async def get_clothes_by_category(user_id: str, category: str, owned_only: bool = None,
+                                  features: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Get clothing items by category for a user, optionally filtered by features"""
     try:
         supabase = get_supabase_client()
 
@@ -396,12 +417,16 @@ async def get_clothes_by_category(user_id: str, category: str, owned_only: bool
         if owned_only is not None:
             query = query.eq("is_owned", owned_only)
 
-        result = query.order("created_at", desc=True).execute()
+        if features:
+            query = query.contains("features", features)
+
+        with metrics.supabase_call("clothes.select"):
+            result = query.order("created_at", desc=True).execute()
 
         return result.data if result.data else []
 
     except Exception as e:
-        print(f"Error getting clothes by category: {e}")
+        logger.error("Error getting clothes by category: %s", e)
         return []
 
 async def get_unique_clothing_categories(user_id: str) -> List[str]:
@@ -409,7 +434,8 @@ async def get_unique_clothing_categories(user_id: str) -> List[str]:
     try:
         supabase = get_supabase_client()
 
-        result = supabase.table("clothes").select("category").eq("profile_id", user_id).execute()
+        with metrics.supabase_call("clothes.select"):
+            result = supabase.table("clothes").select("category").eq("profile_id", user_id).execute()
 
         if result.data:
             categories = list(set([item['category'] for item in result.data if item.get('category')]))
@@ -418,7 +444,7 @@ async def get_unique_clothing_categories(user_id: str) -> List[str]:
             return []
 
     except Exception as e:
-        print(f"Error getting unique clothing categories: {e}")
+        logger.error("Error getting unique clothing categories: %s", e)
         return []
 
 async def smart_save_clothing_item(user_id: str, name: str, category: str,
@@ -439,21 +465,21 @@ async def smart_save_clothing_item(user_id: str, name: str, category: str,
             raise ValueError("Image is required for clothing item creation")
 
         # Step 1: Check image quality
-        print(f"Checking image quality for clothing item: {name}")
+        logger.info("Checking image quality for clothing item: %s", name)
         processed_image = process_uploaded_image(image)
         quality_analysis = check_professional_clothing_image(processed_image)
 
         use_original_image = quality_analysis.get("passed", False)
-        print(f"Quality check result - passed: {use_original_image}")
+        logger.info("Quality check result - passed: %s", use_original_image)
 
         if use_original_image:
             # Use original image since it passed quality check
-            print("Using original image (quality check passed)")
+            logger.info("Using original image (quality check passed)")
             image_base64 = image_to_base64(processed_image)
 
         else:
             # Extract clothing item to create professional image
-            print("Extracting clothing item (quality check failed)")
+            logger.info("Extracting clothing item (quality check failed)")
 
             # Reset image file pointer
             await image.seek(0)
@@ -463,18 +489,18 @@ async def smart_save_clothing_item(user_id: str, name: str, category: str,
 
             if not extraction_result.get("generated_image_base64"):
                 # Fallback to original image if extraction fails
-                print("Extraction failed, falling back to original image")
+                logger.warning("Extraction failed, falling back to original image")
                 await image.seek(0)
                 processed_image = process_uploaded_image(image)
                 image_base64 = image_to_base64(processed_image)
             else:
-                print("Successfully extracted clothing item")
+                logger.info("Successfully extracted clothing item")
                 image_base64 = extraction_result["generated_image_base64"]
 
         # Step 2: Upload image to Supabase storage
         filename = f"{name.replace(' ', '-').lower()}-{int(time.time())}.png"
         image_url = await upload_image_to_supabase(image_base64, filename)
-        print(f"Image uploaded successfully: {image_url}")
+        logger.info("Image uploaded successfully: %s", image_url)
 
         # Step 3: Save to database
         saved_item = await save_clothing_item_to_db(
@@ -484,7 +510,8 @@ async def smart_save_clothing_item(user_id: str, name: str, category: str,
             primary_color=primary_color,
             secondary_color=secondary_color,
             image_url=image_url,
-            is_owned=is_owned
+            is_owned=is_owned,
+            image_base64=image_base64
         )
 
         # Add metadata about the process
@@ -495,13 +522,11 @@ async def smart_save_clothing_item(user_id: str, name: str, category: str,
         return saved_item
 
     except Exception as e:
-        print(f"Error in smart clothing item creation: {e}")
+        logger.error("Error in smart clothing item creation: %s", e)
         raise e
 
 async def extract_specific_clothing_items(image: UploadFile, clothing_items: str) -> dict:
     """Extract specific clothing items from photo and create professional product images"""
-    client = get_gemini_client()
-    
     # Process uploaded image
     processed_image = process_uploaded_image(image)
     
@@ -534,10 +559,7 @@ async def extract_specific_clothing_items(image: UploadFile, clothing_items: str
             contents = [prompt, processed_image]
             
             # Generate the professional product image
-            response = client.models.generate_content(
-                model=editing_model,
-                contents=contents
-            )
+            response = generate_content(editing_model, contents, operation="extract_item")
             
             # Process response - check for both generated image and text description
             generated_image_base64 = None
@@ -639,15 +661,16 @@ async def extract_specific_clothing_items_batch(image: UploadFile, clothing_item
             batch_requests.append(request)
         
         # Create and submit batch job
-        batch_job = client.batches.create(
-            model="gemini-2.5-flash-image-preview",
-            src=batch_requests,
-            config={
-                'display_name': f"clothing-extraction-{int(time.time())}"
-            }
-        )
+        with metrics.gemini_call("gemini-2.5-flash-image-preview", "batch_create"):
+            batch_job = await client.aio.batches.create(
+                model="gemini-2.5-flash-image-preview",
+                src=batch_requests,
+                config={
+                    'display_name': f"clothing-extraction-{uuid.uuid4().hex}"
+                }
+            )
         
-        print(f"Created batch job: {batch_job.name}")
+        logger.info("Created batch job: %s", batch_job.name)
         
         # Poll for completion
         max_wait_time = 1800  # 30 minutes max wait
@@ -656,18 +679,19 @@ async def extract_specific_clothing_items_batch(image: UploadFile, clothing_item
         
         completed_states = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED'}
         
+        # Poll without blocking the event loop for other requests
         while elapsed_time < max_wait_time:
-            current_job = client.batches.get(name=batch_job.name)
-            print(f"Job status: {current_job.state.name} (elapsed: {elapsed_time}s)")
+            current_job = await client.aio.batches.get(name=batch_job.name)
+            logger.debug("Job status: %s (elapsed: %ss)", current_job.state.name, elapsed_time)
             
             if current_job.state.name in completed_states:
                 break
                 
-            time.sleep(poll_interval)
+            await asyncio.sleep(poll_interval)
             elapsed_time += poll_interval
         
         # Check final job status
-        final_job = client.batches.get(name=batch_job.name)
+        final_job = await client.aio.batches.get(name=batch_job.name)
         
         if final_job.state.name != 'JOB_STATE_SUCCEEDED':
             return {
@@ -685,6 +709,8 @@ async def extract_specific_clothing_items_batch(image: UploadFile, clothing_item
                 item = items_list[i] if i < len(items_list) else f"item_{i}"
                 
                 if inline_response.response:
+                    usage_accounting.record_call("gemini-2.5-flash-image-preview", "batch_generate", inline_response.response,
+                                                 batch_results.job_seconds(final_job) or elapsed_time, batch=True)
                     try:
                         # Extract generated image and description
                         generated_image_base64 = None
@@ -748,45 +774,18 @@ async def extract_specific_clothing_items_batch(image: UploadFile, clothing_item
             "error": f"Batch processing failed: {str(e)}"
         }
 
-async def extract_specific_clothing_items_batch_file(image: UploadFile, clothing_items: str) -> dict:
-    """Extract specific clothing items using file-based batch mode for large requests"""
-    client = get_gemini_client()
-    
-    # Process uploaded image and upload to File API
-    processed_image = process_uploaded_image(image)
+async def extract_specific_clothing_items_batch_file(image: UploadFile, clothing_items: str, user_id: str) -> dict:
+    """
+    Extract specific clothing items using file-based batch mode for large requests
     
-    # Upload image to File API for reuse across batch requests
-    if hasattr(processed_image, 'data'):
-        # Create temporary file from inline data
-        temp_filename = f"temp_image_{int(time.time())}.png"
-        with open(temp_filename, 'wb') as f:
-            f.write(processed_image.data)
-        
-        uploaded_image = client.files.upload(
-            file=temp_filename,
-            config=types.UploadFileConfig(
-                display_name=f'clothing_image_{int(time.time())}',
-                mime_type=processed_image.mime_type
-            )
-        )
-        
-        # Clean up temp file
-        os.remove(temp_filename)
-    else:
-        # Save PIL Image and upload
-        temp_filename = f"temp_image_{int(time.time())}.png"
-        processed_image.save(temp_filename)
-        
-        uploaded_image = client.files.upload(
-            file=temp_filename,
-            config=types.UploadFileConfig(
-                display_name=f'clothing_image_{int(time.time())}',
-                mime_type='image/png'
-            )
-        )
-        
-        # Clean up temp file
-        os.remove(temp_filename)
+    The image and the JSONL requests are uploaded to the File API straight
+    from memory. Uploaded files are recorded on the batch_jobs row and
+    deleted once the results are processed (or right away if the job can't
+    be created), so concurrent submissions never share local files.
+    """
+    from google.genai import types
+
+    client = get_gemini_client()
     
     # Parse clothing items
     try:
@@ -799,14 +798,31 @@ async def extract_specific_clothing_items_batch_file(image: UploadFile, clothing
     if not items_list:
         return {"success": False, "error": "No clothing items specified"}
     
-    # Create JSONL file with batch requests
-    jsonl_filename = f"clothing_batch_{int(time.time())}.jsonl"
+    # Process uploaded image
+    processed_image = process_uploaded_image(image)
+    job_token = uuid.uuid4().hex
+    artifacts = []
     
-    with open(jsonl_filename, "w") as f:
+    try:
+        # Upload image to File API for reuse across batch requests
+        image_buffer = io.BytesIO()
+        processed_image.save(image_buffer, format='PNG')
+        image_buffer.seek(0)
+        uploaded_image = await client.aio.files.upload(
+            file=image_buffer,
+            config=types.UploadFileConfig(
+                display_name=f'clothing_image_{job_token}',
+                mime_type='image/png'
+            )
+        )
+        artifacts.append(uploaded_image.name)
+        
+        # Build the JSONL batch requests in memory
+        lines = []
         for i, item in enumerate(items_list):
             prompt = f"Take the {item} in this photo and make a full view image of just that item with a white background as a professionally shot image for a clothing item on an online store. Focus only on the {item} and exclude all other clothing items or objects."
             
-            request_data = {
+            lines.append(json.dumps({
                 "key": f"item_{i}_{item}",
                 "request": {
                     "contents": [{
@@ -816,30 +832,44 @@ async def extract_specific_clothing_items_batch_file(image: UploadFile, clothing
                         ]
                     }]
                 }
-            }
-            
-            f.write(json.dumps(request_data) + "\n")
-    
-    # Upload JSONL file
-    batch_input_file = client.files.upload(
-        file=jsonl_filename,
-        config=types.UploadFileConfig(
-            display_name=f'clothing_batch_input_{int(time.time())}',
-            mime_type='application/jsonl'
+            }))
+        
+        # Upload JSONL requests
+        batch_input_file = await client.aio.files.upload(
+            file=io.BytesIO(("\n".join(lines) + "\n").encode("utf-8")),
+            config=types.UploadFileConfig(
+                display_name=f'clothing_batch_input_{job_token}',
+                mime_type='application/jsonl'
+            )
         )
-    )
-    
-    # Clean up local JSONL file
-    os.remove(jsonl_filename)
+        artifacts.append(batch_input_file.name)
+        
+        # Create batch job
+        with metrics.gemini_call("gemini-2.5-flash-image-preview", "batch_create"):
+            batch_job = await client.aio.batches.create(
+                model="gemini-2.5-flash-image-preview",
+                src=batch_input_file.name,
+                config={
+                    'display_name': f"clothing-extraction-file-{job_token}"
+                }
+            )
+    except Exception:
+        await batch_results.delete_artifacts(artifacts)
+        raise
     
-    # Create batch job
-    batch_job = client.batches.create(
-        model="gemini-2.5-flash-image-preview",
-        src=batch_input_file.name,
-        config={
-            'display_name': f"clothing-extraction-file-{int(time.time())}"
-        }
-    )
+    # Track the job (and its owner) so its results can be processed and paged through later;
+    # an untracked job could never be checked, so cancel it instead
+    try:
+        batch_results.save_job(batch_job.name, profile_id=user_id, status="submitted", items=items_list,
+                               total_items=len(items_list), artifacts=artifacts)
+    except Exception as e:
+        logger.error("Could not record batch job %s, cancelling it: %s", batch_job.name, e)
+        try:
+            await client.aio.batches.cancel(name=batch_job.name)
+        except Exception as cancel_error:
+            logger.warning("Could not cancel batch job %s: %s", batch_job.name, cancel_error)
+        await batch_results.delete_artifacts(artifacts)
+        return {"success": False, "error": f"Could not record batch job: {str(e)}"}
     
     # Return job information for async processing
     return {
@@ -851,94 +881,74 @@ async def extract_specific_clothing_items_batch_file(image: UploadFile, clothing
         "filename": image.filename
     }
 
-def check_batch_status(batch_job_id: str) -> dict:
-    """Check the status of a batch job and retrieve results if completed"""
+async def check_batch_status(batch_job_id: str, user_id: str, offset: int = 0, limit: int = 20) -> Optional[dict]:
+    """
+    Check the status of a batch job and return a page of its results if completed
+    
+    The first check after the job succeeds streams the result file into
+    storage and batch_job_items (see batch_results); later checks only read
+    the stored item results. Returns None if the job doesn't exist or
+    belongs to another user.
+    """
     client = get_gemini_client()
+    limit = max(1, min(limit, batch_results.MAX_PAGE_SIZE))
+    offset = max(0, offset)
     
     try:
-        batch_job = client.batches.get(name=batch_job_id)
+        job = batch_results.get_job(batch_job_id)
+        if not job or job.get("profile_id") != user_id:
+            return None
         
-        if batch_job.state.name == 'JOB_STATE_SUCCEEDED':
-            # Download and process results
-            if batch_job.dest and batch_job.dest.file_name:
-                result_file_name = batch_job.dest.file_name
-                file_content = client.files.download(file=result_file_name)
-                
-                extracted_images = []
-                
-                for line in file_content.decode('utf-8').splitlines():
-                    if line.strip():
-                        result = json.loads(line)
-                        
-                        # Extract item name from key
-                        item_key = result.get('key', 'unknown')
-                        item_name = item_key.split('_', 2)[-1] if '_' in item_key else item_key
-                        
-                        if 'response' in result:
-                            response = result['response']
-                            generated_image_base64 = None
-                            description_text = None
-                            
-                            # Process response parts
-                            candidates = response.get('candidates', [])
-                            if candidates and 'content' in candidates[0]:
-                                parts = candidates[0]['content'].get('parts', [])
-                                
-                                for part in parts:
-                                    if 'text' in part and part['text']:
-                                        description_text = part['text']
-                                    elif 'inlineData' in part and part['inlineData']:
-                                        # Convert to base64
-                                        image_data = base64.b64decode(part['inlineData']['data'])
-                                        image = Image.open(io.BytesIO(image_data))
-                                        generated_image_base64 = image_to_base64(image)
-                            
-                            extracted_images.append({
-                                "item": item_name,
-                                "success": True,
-                                "generated_image_base64": generated_image_base64,
-                                "description": description_text or f"Professional {item_name} product image generated"
-                            })
-                        
-                        elif 'error' in result:
-                            extracted_images.append({
-                                "item": item_name,
-                                "success": False,
-                                "error": str(result['error']),
-                                "generated_image_base64": None,
-                                "description": None
-                            })
-                
-                successful_extractions = sum(1 for result in extracted_images if result["success"])
-                
+        if job.get("status") != "completed":
+            batch_job = await client.aio.batches.get(name=batch_job_id)
+            
+            if batch_job.state.name == 'JOB_STATE_SUCCEEDED':
+                if not (batch_job.dest and batch_job.dest.file_name):
+                    return {
+                        "success": False,
+                        "status": "error",
+                        "error": "No result file found for batch job"
+                    }
+                job = await batch_results.ensure_processed(batch_job_id, batch_job.dest.file_name, job,
+                                                           batch_results.job_seconds(batch_job))
+            
+            elif batch_job.state.name == 'JOB_STATE_FAILED':
+                error = str(batch_job.error) if hasattr(batch_job, 'error') else "Unknown error"
+                await batch_results.close_failed_job(batch_job_id, job, "failed", error)
                 return {
-                    "success": True,
-                    "status": "completed",
-                    "extracted_images": extracted_images,
-                    "total_items": len(extracted_images),
-                    "successful_extractions": successful_extractions
+                    "success": False,
+                    "status": "failed",
+                    "error": error
                 }
             
-        elif batch_job.state.name == 'JOB_STATE_FAILED':
-            return {
-                "success": False,
-                "status": "failed",
-                "error": str(batch_job.error) if hasattr(batch_job, 'error') else "Unknown error"
-            }
+            elif batch_job.state.name == 'JOB_STATE_CANCELLED':
+                await batch_results.close_failed_job(batch_job_id, job, "cancelled")
+                return {
+                    "success": False,
+                    "status": "cancelled"
+                }
+            
+            else:
+                return {
+                    "success": True,
+                    "status": "pending",
+                    "current_state": batch_job.state.name,
+                    "message": "Job is still processing..."
+                }
         
-        elif batch_job.state.name == 'JOB_STATE_CANCELLED':
-            return {
-                "success": False,
-                "status": "cancelled"
-            }
+        extracted_images = batch_results.get_item_page(batch_job_id, offset, limit)
+        total_items = job.get("total_items", 0)
         
-        else:
-            return {
-                "success": True,
-                "status": "pending",
-                "current_state": batch_job.state.name,
-                "message": "Job is still processing..."
-            }
+        return {
+            "success": True,
+            "status": "completed",
+            "extracted_images": extracted_images,
+            "total_items": total_items,
+            "successful_extractions": job.get("successful_items", 0),
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(extracted_images) < total_items
+        }
             
     except Exception as e:
         return {
@@ -949,8 +959,6 @@ def check_batch_status(batch_job_id: str) -> dict:
 
 async def extract_specific_clothing_items_concurrent(image: UploadFile, clothing_items: str) -> dict:
     """Extract specific clothing items from photo using concurrent async requests for better performance"""
-    client = get_gemini_client()
-    
     # Process uploaded image
     processed_image = process_uploaded_image(image)
     
@@ -965,15 +973,66 @@ async def extract_specific_clothing_items_concurrent(image: UploadFile, clothing
             "error": "Invalid JSON format for clothing_items"
         }
     
+    return await extract_clothing_items_from_image(processed_image, items_list, filename=image.filename)
+
+async def extract_clothing_items(image: UploadFile, clothing_items: str, user_id: str,
+                                 deadline_ms: Optional[int] = None) -> dict:
+    """
+    Extract specific clothing items, running them concurrently or as a batch job
+    
+    extraction_planner chooses the mode from the item count, Gemini calls in
+    flight and deadline_ms. The response carries the plan and the total time
+    taken; batch runs return a batch_job_id to poll with check_batch_status().
+    """
+    start_time = time.perf_counter()
+    
+    try:
+        items_list = json.loads(clothing_items)
+        if not isinstance(items_list, list):
+            raise ValueError("clothing_items must be a JSON array")
+    except json.JSONDecodeError:
+        return {"success": False, "error": "Invalid JSON format for clothing_items"}
+    
+    if not items_list:
+        return {"success": False, "error": "No clothing items specified"}
+    
+    if deadline_ms is not None and deadline_ms <= 0:
+        return {"success": False, "error": "deadline_ms must be positive"}
+    
+    plan = extraction_planner.plan_extraction(len(items_list), deadline_ms)
+    logger.info("Extracting %s items in %s mode (%s, queue depth %s)",
+                len(items_list), plan["mode"], plan["reason"], plan["queue_depth"])
+    
+    if plan["mode"] == extraction_planner.BATCH:
+        result = await extract_specific_clothing_items_batch_file(image, clothing_items, user_id)
+    else:
+        processed_image = process_uploaded_image(image)
+        result = await extract_clothing_items_from_image(processed_image, items_list, filename=image.filename)
+    
+    plan["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+    return {**result, "plan": plan}
+
+async def extract_clothing_items_from_image(processed_image: Image.Image, items_list: List[str],
+                                            image_part: Optional["types.Part"] = None,
+                                            filename: Optional[str] = None) -> dict:
+    """
+    Extract each named item from an already processed photo with concurrent async requests
+    
+    The photo is uploaded (or encoded) once and every request references the
+    same part; pass image_part to reuse one from an earlier call in the flow.
+    """
     if not items_list:
         return {
             "success": False,
             "error": "No clothing items specified"
         }
     
+    if image_part is None:
+        image_part = await get_image_part_async(processed_image)
+    
     # Send all requests concurrently using async Gemini client
     start_time = time.time()
-    print(f"Sending {len(items_list)} concurrent async requests...")
+    logger.info("Sending %s concurrent async requests...", len(items_list))
     
     # Create async tasks for all items - these will all be sent simultaneously
     tasks = []
@@ -981,24 +1040,22 @@ async def extract_specific_clothing_items_concurrent(image: UploadFile, clothing
         # Create the extraction prompt for specific item
         prompt = f"Take the {item} in this photo and make a full view image of just that item with a white background as a professionally shot image for a clothing item on an online store. Focus only on the {item} and exclude all other clothing items or objects. Do not change any details from the clothes. Be as accurate as possible."
         
-        # Prepare content for Gemini
-        contents = [prompt, processed_image]
+        # Prepare content for Gemini (the same photo part for every item)
+        contents = [prompt, image_part]
         
         # Create async task using aio client - this doesn't execute yet
-        task = client.aio.models.generate_content(
-            model=editing_model,
-            contents=contents
-        )
+        task = generate_content_async(editing_model, contents, operation="extract_item")
         tasks.append((item, task))
     
     # Execute all requests concurrently and wait for all to complete
     try:
         # Extract just the tasks for asyncio.gather
         async_tasks = [task for _, task in tasks]
-        responses = await asyncio.gather(*async_tasks, return_exceptions=True)
+        with metrics.stage("extraction_fanout"):
+            responses = await asyncio.gather(*async_tasks, return_exceptions=True)
         
         requests_completed_time = time.time() - start_time
-        print(f"All {len(items_list)} async requests completed in {requests_completed_time:.2f}s")
+        logger.info("All %s async requests completed in %.2fs", len(items_list), requests_completed_time)
         
         # Process all responses
         extracted_images = []
@@ -1045,7 +1102,7 @@ async def extract_specific_clothing_items_concurrent(image: UploadFile, clothing
                 })
         
     except Exception as e:
-        print(f"Error in concurrent processing: {str(e)}")
+        logger.error("Error in concurrent processing: %s", str(e))
         # Fallback to error responses for all items
         extracted_images = []
         for item in items_list:
@@ -1067,7 +1124,7 @@ async def extract_specific_clothing_items_concurrent(image: UploadFile, clothing
         "extracted_images": extracted_images,
         "total_items": len(items_list),
         "successful_extractions": successful_extractions,
-        "filename": image.filename,
+        "filename": filename,
         "processing_time": round(processing_time, 2),
         "processing_method": "concurrent_async"
     }
\ No newline at end of file
@@ -0,0 +1,366 @@
+"""
+Color normalization and perceptual color matching.
+
+Gemini describes colors as free text ("Dark Blue", "navy", "Navy Blue"), so
+names are normalized to a canonical color family and converted to CIELAB,
+where Euclidean distance (Delta E 1976) roughly tracks perceived difference.
+When an item's product image is available, its dominant color is found with
+k-means over the image pixels and stored as the item's Lab color instead.
+
+Nearest-color queries ("items close to this swatch") are served from a
+KD-tree over each user's item colors, built on first use and kept in memory
+until the user's wardrobe changes or COLOR_INDEX_TTL_SECONDS pass.
+"""
+
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .authService import get_supabase_client
+from .kdtree import KDTree
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+COLOR_INDEX_TTL_SECONDS = float(os.getenv("COLOR_INDEX_TTL_SECONDS", "300"))
+MAX_NEAREST_RESULTS = 100
+
+# Canonical color families and their sRGB values
+COLOR_RGB = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "gray": (128, 128, 128),
+    "charcoal": (54, 69, 79), "silver": (192, 192, 192), "beige": (225, 198, 153),
+    "cream": (255, 253, 208), "ivory": (255, 255, 240), "khaki": (195, 176, 145), "tan": (210, 180, 140),
+    "camel": (193, 154, 107), "taupe": (72, 60, 50), "brown": (120, 72, 40), "nude": (227, 188, 154),
+    "navy": (0, 0, 128), "denim": (21, 96, 189), "red": (220, 20, 60), "burgundy": (128, 0, 32),
+    "maroon": (128, 0, 0), "pink": (255, 105, 180), "rose": (255, 0, 127), "orange": (255, 140, 0),
+    "rust": (183, 65, 14), "coral": (255, 127, 80), "yellow": (255, 215, 0), "mustard": (225, 173, 1),
+    "gold": (212, 175, 55), "green": (34, 139, 34), "olive": (128, 128, 0), "sage": (178, 172, 136),
+    "mint": (152, 255, 152), "teal": (0, 128, 128), "turquoise": (64, 224, 208), "blue": (30, 90, 200),
+    "purple": (128, 0, 128), "lavender": (181, 126, 220), "lilac": (200, 162, 200), "violet": (143, 0, 255)
+}
+
+# Other spellings and multi-word names, mapped to a family
+COLOR_ALIASES = {
+    "grey": "gray", "heather": "gray", "off white": "ivory", "offwhite": "ivory", "ecru": "cream",
+    "navy blue": "navy", "sky blue": "blue", "royal blue": "blue", "baby blue": "blue",
+    "cobalt": "blue", "indigo": "navy", "wine": "burgundy", "crimson": "red", "scarlet": "red",
+    "fuchsia": "pink", "magenta": "pink", "blush": "pink", "peach": "coral", "forest green": "green",
+    "emerald": "green", "khaki green": "olive", "army green": "olive", "chocolate": "brown",
+    "cognac": "brown", "mauve": "lilac", "plum": "purple", "aqua": "turquoise", "cyan": "turquoise"
+}
+
+# Colors that read as neutral regardless of their hue
+NEUTRAL_COLORS = {
+    "black", "white", "gray", "charcoal", "silver", "beige", "cream", "ivory", "khaki",
+    "tan", "camel", "taupe", "brown", "nude", "navy", "denim"
+}
+
+# Shift in L* for modifiers like "Dark Blue" / "Light Pink"
+LIGHTNESS_MODIFIERS = {"dark": -20.0, "deep": -15.0, "light": 20.0, "pale": 25.0, "bright": 5.0}
+
+_HEX_COLOR = re.compile(r"^#?([0-9a-f]{6})$")
+
+# Per-user nearest-color indexes: user_id -> (built_at, index)
+_color_indexes: Dict[str, Tuple[float, "ColorIndex"]] = {}
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert sRGB values (0-255, shape (..., 3)) to CIELAB under D65"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+
+    xyz = linear @ np.array([
+        [0.4124564, 0.2126729, 0.0193339],
+        [0.3575761, 0.7151522, 0.1191920],
+        [0.1804375, 0.0721750, 0.9503041]
+    ])
+    xyz = xyz / np.array([0.95047, 1.0, 1.08883])
+
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2])
+    ], axis=-1)
+
+
+_FAMILIES = list(COLOR_RGB)
+_FAMILY_LABS = rgb_to_lab(np.array([COLOR_RGB[name] for name in _FAMILIES]))
+
+
+def nearest_color_family(lab) -> str:
+    """Name of the color family closest to a Lab color"""
+    distances = ((_FAMILY_LABS - np.asarray(lab, dtype=np.float64)) ** 2).sum(axis=1)
+    return _FAMILIES[int(np.argmin(distances))]
+
+
+@lru_cache(maxsize=4096)
+def parse_color(color: Optional[str]) -> Optional[Tuple[str, Tuple[float, float, float]]]:
+    """
+    (family, Lab) for a color name or hex code, or None if it isn't recognized.
+
+    The first color named wins ("Navy Blue" -> navy, "Blue and White" ->
+    blue), and lightness modifiers shift L* ("Dark Blue" is darker than "Blue").
+    """
+    text = (color or "").strip().lower()
+    hex_match = _HEX_COLOR.match(text)
+    if hex_match:
+        value = hex_match.group(1)
+        lab = rgb_to_lab(np.array([int(value[i:i + 2], 16) for i in (0, 2, 4)]))
+        return nearest_color_family(lab), tuple(float(v) for v in lab)
+
+    words = re.findall(r"[a-z]+", text)
+    family = None
+    for start in range(len(words)):
+        # Prefer a two-word name starting here ("navy blue") over its first word
+        for phrase in (" ".join(words[start:start + 2]) if start + 1 < len(words) else None, words[start]):
+            if phrase and (phrase in COLOR_RGB or phrase in COLOR_ALIASES):
+                family = COLOR_ALIASES.get(phrase, phrase)
+                break
+        if family:
+            break
+    if family is None:
+        return None
+
+    lightness, a, b = _FAMILY_LABS[_FAMILIES.index(family)]
+    for word in words:
+        lightness += LIGHTNESS_MODIFIERS.get(word, 0.0)
+    return family, (float(min(max(lightness, 0.0), 100.0)), float(a), float(b))
+
+
+def normalize_color_name(color: Optional[str]) -> Optional[str]:
+    """Canonical display name for a free-text color ("navy blue" -> "Navy"), or None"""
+    parsed = parse_color(color)
+    return parsed[0].title() if parsed else None
+
+
+def count_color_families(items: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count item rows by normalized primary color, most common first"""
+    counts: Dict[str, int] = {}
+    for item in items:
+        family = item.get("color_family")
+        if not family:
+            # Rows saved before color_family existed
+            parsed = parse_color(item.get("primary_color"))
+            family = parsed[0] if parsed else None
+        name = family.title() if family else "Unknown"
+        counts[name] = counts.get(name, 0) + 1
+    return dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def color_name_to_lab(color: Optional[str]) -> Optional[Tuple[float, float, float]]:
+    """Lab value for a color name, or None if it isn't recognized"""
+    parsed = parse_color(color)
+    return parsed[1] if parsed else None
+
+
+def foreground_mask(rgba: np.ndarray) -> np.ndarray:
+    """Mask of garment pixels in an (h, w, 4) RGBA array, dropping transparent and studio-background pixels"""
+    opaque = rgba[..., 3] >= 128
+    rgb = rgba[..., :3].astype(np.float64)
+
+    # Product images sit on a plain background; estimate it from the border
+    border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+    background = rgb_to_lab(np.median(border, axis=0))
+    distance = np.sqrt(((rgb_to_lab(rgb) - background) ** 2).sum(axis=-1))
+    foreground = opaque & (distance > 10)
+
+    # Keep everything when the "background" covers the item itself
+    return foreground if foreground.sum() >= 0.05 * opaque.sum() else opaque
+
+
+def _foreground_pixels(image: Image.Image, max_side: int = 128) -> np.ndarray:
+    image = image.copy()
+    image.thumbnail((max_side, max_side))
+    rgba = np.asarray(image.convert("RGBA"))
+    return rgba[foreground_mask(rgba)][:, :3].astype(np.float64)
+
+
+@metrics.stage("dominant_color")
+def dominant_colors(image: Image.Image, k: int = 3, sample_size: int = 4096,
+                    iterations: int = 15, seed: int = 0) -> List[Tuple[Tuple[float, float, float], float]]:
+    """
+    Dominant colors of an image as [(Lab, share of pixels)], largest first.
+
+    Runs k-means (k-means++ seeding) in Lab space over a sample of the
+    foreground pixels.
+    """
+    pixels = _foreground_pixels(image)
+    if not len(pixels):
+        return []
+
+    rng = np.random.default_rng(seed)
+    if len(pixels) > sample_size:
+        pixels = pixels[rng.choice(len(pixels), sample_size, replace=False)]
+    points = rgb_to_lab(pixels)
+    k = min(k, len(points))
+
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        distances = ((points[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        if distances.sum() == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=distances / distances.sum())])
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        for cluster in range(len(centers)):
+            members = points[labels == cluster]
+            if len(members):
+                centers[cluster] = members.mean(axis=0)
+
+    counts = np.bincount(labels, minlength=len(centers))
+    ranked = np.argsort(-counts)
+    return [
+        (tuple(float(v) for v in centers[cluster]), float(counts[cluster] / len(points)))
+        for cluster in ranked if counts[cluster]
+    ]
+
+
+def _rounded(lab) -> Optional[List[float]]:
+    return [round(float(v), 2) for v in lab] if lab is not None else None
+
+
+def color_fields(primary_color: Optional[str] = None, secondary_color: Optional[str] = None,
+                 image: Optional[Image.Image] = None) -> Dict[str, Any]:
+    """
+    Columns to store with an item: primary_lab, secondary_lab and color_family.
+
+    primary_lab comes from the image's dominant color when an image is
+    given, otherwise from the primary color name. color_family is the
+    normalized primary color name (or the nearest family to the image color).
+    """
+    primary_lab = color_name_to_lab(primary_color)
+    family = parse_color(primary_color)[0] if primary_lab is not None else None
+
+    if image is not None:
+        try:
+            colors = dominant_colors(image)
+            if colors:
+                primary_lab = colors[0][0]
+                family = family or nearest_color_family(primary_lab)
+        except Exception as e:
+            logger.warning("Could not compute dominant color, using color name: %s", e)
+
+    return {
+        "primary_lab": _rounded(primary_lab),
+        "secondary_lab": _rounded(color_name_to_lab(secondary_color)),
+        "color_family": family
+    }
+
+
+def color_updates(update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Lab / family columns to change alongside a primary or secondary color update"""
+    fields = color_fields(update_data.get("primary_color"), update_data.get("secondary_color"))
+    updates = {}
+    if "primary_color" in update_data:
+        updates["primary_lab"] = fields["primary_lab"]
+        updates["color_family"] = fields["color_family"]
+    if "secondary_color" in update_data:
+        updates["secondary_lab"] = fields["secondary_lab"]
+    return updates
+
+
+class ColorIndex:
+    """KD-trees over one user's clothing and accessory colors"""
+
+    def __init__(self, items: Dict[str, List[Dict[str, Any]]]):
+        self.items: Dict[str, List[Dict[str, Any]]] = {}
+        self.trees: Dict[str, KDTree] = {}
+
+        for item_type, rows in items.items():
+            indexed, labs = [], []
+            for row in rows:
+                # Rows saved before Lab colors were stored fall back to their color name
+                lab = row.get("primary_lab") or color_name_to_lab(row.get("primary_color"))
+                if lab is not None:
+                    indexed.append(row)
+                    labs.append(lab)
+            self.items[item_type] = indexed
+            self.trees[item_type] = KDTree(np.array(labs).reshape(-1, 3))
+
+    def nearest(self, lab, k: int = 10, max_distance: Optional[float] = None,
+                item_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Up to k items closest to a Lab color, nearest first, each with its color_distance"""
+        results = []
+        for item_type, tree in self.trees.items():
+            if item_types and item_type not in item_types:
+                continue
+            distances, indices = tree.query(lab, k, max_distance)
+            for distance, index in zip(distances, indices):
+                results.append({
+                    **self.items[item_type][index],
+                    "item_type": item_type,
+                    "color_distance": round(distance, 2)
+                })
+
+        results.sort(key=lambda item: item["color_distance"])
+        return results[:k]
+
+
+def invalidate_color_index(user_id: str) -> None:
+    """Drop a user's cached color index after their wardrobe changes"""
+    _color_indexes.pop(user_id, None)
+
+
+async def _load_color_index(user_id: str) -> ColorIndex:
+    supabase = get_supabase_client()
+    items = {}
+    for item_type, table in (("clothing", "clothes"), ("accessory", "accessories")):
+        with metrics.supabase_call(f"{table}.select"):
+            result = supabase.table(table).select("*").eq("profile_id", user_id).execute()
+        items[item_type] = result.data or []
+    return ColorIndex(items)
+
+
+async def get_color_index(user_id: str) -> ColorIndex:
+    """A user's color index, built on first use and cached"""
+    cached = _color_indexes.get(user_id)
+    if cached and time.monotonic() - cached[0] < COLOR_INDEX_TTL_SECONDS:
+        return cached[1]
+
+    index = await _load_color_index(user_id)
+    _color_indexes[user_id] = (time.monotonic(), index)
+    return index
+
+
+async def find_items_near_color(user_id: str, color: str, k: int = 10, max_distance: Optional[float] = None,
+                                item_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Items whose primary color is closest to a color name or hex swatch.
+
+    Args:
+        user_id: Wardrobe owner
+        color: Color name ("navy blue") or hex code ("#1f2a44")
+        k: Maximum number of items (capped at MAX_NEAREST_RESULTS)
+        max_distance: Only include items within this Delta E (76)
+        item_types: Subset of "clothing" / "accessory" to search
+
+    Returns:
+        {"color", "lab", "results": [item rows with item_type and color_distance]}
+    """
+    parsed = parse_color(color)
+    if parsed is None:
+        raise ValueError(f"Unrecognized color: {color}")
+    family, lab = parsed
+
+    try:
+        index = await get_color_index(user_id)
+        results = index.nearest(lab, max(1, min(k, MAX_NEAREST_RESULTS)), max_distance, item_types)
+    except Exception as e:
+        logger.error("Error finding items near color: %s", e)
+        raise e
+
+    return {"color": family, "lab": _rounded(lab), "results": results}
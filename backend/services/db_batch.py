@@ -0,0 +1,59 @@
+"""
+Batch helpers for writing many rows in one Supabase request.
+
+A multi-row insert is a single statement, so one bad row rejects the whole
+batch. When that happens the rows are retried one at a time so every row
+still gets its own result and error message.
+"""
+
+from typing import Any, Dict, List
+
+from .authService import get_supabase_client
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def insert_rows(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert rows into a table in one request and return them.
+
+    Returns one result per input row, in input order:
+    {"success": True, "data": row} or {"success": False, "error": message}.
+    """
+    if not rows:
+        return []
+
+    supabase = get_supabase_client()
+
+    try:
+        with metrics.supabase_call(f"{table}.bulk_insert"):
+            result = supabase.table(table).insert(rows).execute()
+
+        if result.data and len(result.data) == len(rows):
+            return [{"success": True, "data": row} for row in result.data]
+        raise Exception(f"Database insert failed: {result}")
+
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error("Error inserting into %s: %s", table, e)
+            return [{"success": False, "error": str(e)}]
+        logger.warning("Bulk insert of %s rows into %s failed, retrying row by row: %s", len(rows), table, e)
+
+    results = []
+    for row in rows:
+        try:
+            with metrics.supabase_call(f"{table}.insert"):
+                result = supabase.table(table).insert(row).execute()
+
+            if result.data:
+                results.append({"success": True, "data": result.data[0]})
+            else:
+                raise Exception(f"Database insert failed: {result}")
+
+        except Exception as e:
+            logger.error("Error inserting into %s: %s", table, e)
+            results.append({"success": False, "error": str(e)})
+
+    return results
@@ -0,0 +1,88 @@
+"""
+Choosing how to run a multi-item extraction.
+
+One extraction request can run as concurrent image edits (results in the
+response, full price) or as a file-based Gemini batch job (about half the
+price, results fetched later from /api/batch-status). plan_extraction picks
+between them from the number of items, the Gemini editing calls already in
+flight in this process and the caller's latency budget:
+
+- a deadline shorter than BATCH_MIN_DEADLINE_MS always runs concurrently
+- without an urgent deadline, requests of BATCH_MIN_ITEMS or more go to batch
+- smaller non-urgent requests also go to batch when the extra calls would
+  queue behind GEMINI_MAX_CONCURRENT_EDITS already in flight
+
+The concurrent latency estimate uses the observed mean extraction call
+latency once there are enough samples, EXTRACTION_CALL_SECONDS before that.
+"""
+
+import os
+import math
+import time
+from typing import Any, Dict, Optional
+
+from .gemini_client import editing_model
+from . import metrics
+
+CONCURRENT = "concurrent"
+BATCH = "batch"
+
+BATCH_MIN_ITEMS = int(os.getenv("BATCH_MIN_ITEMS", "8"))
+# Batch jobs usually finish in minutes but may take hours; shorter budgets are urgent
+BATCH_MIN_DEADLINE_MS = int(os.getenv("BATCH_MIN_DEADLINE_MS", str(15 * 60 * 1000)))
+GEMINI_MAX_CONCURRENT_EDITS = int(os.getenv("GEMINI_MAX_CONCURRENT_EDITS", "16"))
+EXTRACTION_CALL_SECONDS = float(os.getenv("EXTRACTION_CALL_SECONDS", "12"))
+# Observed calls needed before their mean replaces EXTRACTION_CALL_SECONDS
+MIN_LATENCY_SAMPLES = 20
+
+
+def queue_depth() -> int:
+    """Gemini image edit calls currently awaiting a response in this process"""
+    return int(metrics.gemini_calls_in_flight.total(model=editing_model))
+
+
+def extraction_call_seconds() -> float:
+    """Expected latency of one extraction call"""
+    observed = metrics.gemini_call_duration.mean(model=editing_model, operation="extract_item", outcome="ok")
+    if observed and observed[1] >= MIN_LATENCY_SAMPLES:
+        return observed[0]
+    return EXTRACTION_CALL_SECONDS
+
+
+def plan_extraction(item_count: int, deadline_ms: Optional[int] = None,
+                    depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Decide how to extract item_count items.
+
+    Returns the chosen mode ("concurrent" or "batch"), the reason, the
+    inputs it was based on, the concurrent latency estimate and whether a
+    concurrent run is expected to miss the deadline.
+    """
+    start = time.perf_counter()
+    depth = queue_depth() if depth is None else depth
+    call_seconds = extraction_call_seconds()
+
+    # Calls beyond the concurrency limit wait for earlier ones to finish
+    waves = math.ceil((depth + item_count) / GEMINI_MAX_CONCURRENT_EDITS)
+    estimated_ms = int(max(waves, 1) * call_seconds * 1000)
+    urgent = deadline_ms is not None and deadline_ms < BATCH_MIN_DEADLINE_MS
+
+    if urgent:
+        mode, reason = CONCURRENT, "deadline"
+    elif item_count >= BATCH_MIN_ITEMS:
+        mode, reason = BATCH, "item_count"
+    elif depth + item_count > GEMINI_MAX_CONCURRENT_EDITS:
+        mode, reason = BATCH, "queue_depth"
+    else:
+        mode, reason = CONCURRENT, "small_request"
+
+    return {
+        "mode": mode,
+        "reason": reason,
+        "item_count": item_count,
+        "queue_depth": depth,
+        "deadline_ms": deadline_ms,
+        "estimated_concurrent_ms": estimated_ms,
+        "deadline_at_risk": mode == CONCURRENT and deadline_ms is not None and estimated_ms > deadline_ms,
+        "planning_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
@@ -1,19 +1,36 @@
 import os
-from google import genai
+import time
 from dotenv import load_dotenv
 
+from . import clients
+from . import metrics
+from . import usage_accounting
+
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
+# Configure Gemini API (the client is created on first use, see clients)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is required")
 
-client = genai.Client(api_key=GEMINI_API_KEY)
 editing_model = "gemini-2.5-flash-image-preview"
 analysis_model = "gemini-1.5-flash"
 
 def get_gemini_client():
     """Get the configured Gemini client"""
-    return client
\ No newline at end of file
+    return clients.get(clients.GEMINI)
+
+def generate_content(model: str, contents, operation: str = "generate_content", **kwargs):
+    """Call Gemini generate_content, recording latency and token usage under the given operation name"""
+    start = time.perf_counter()
+    with metrics.gemini_call(model, operation):
+        response = get_gemini_client().models.generate_content(model=model, contents=contents, **kwargs)
+    usage_accounting.record_call(model, operation, response, time.perf_counter() - start)
+    return response
+
+async def generate_content_async(model: str, contents, operation: str = "generate_content", **kwargs):
+    """Async variant of generate_content using the aio client"""
+    start = time.perf_counter()
+    with metrics.gemini_call(model, operation):
+        response = await get_gemini_client().aio.models.generate_content(model=model, contents=contents, **kwargs)
+    usage_accounting.record_call(model, operation, response, time.perf_counter() - start)
+    return response
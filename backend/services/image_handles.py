@@ -0,0 +1,131 @@
+"""
+Reusable Gemini image parts for images sent in several calls.
+
+A photo analyzed and then extracted item by item used to be serialized and
+sent inline with every call. get_image_part encodes an image once, uploads
+it to the Gemini File API when it is at least FILE_UPLOAD_MIN_BYTES, and
+caches the resulting file URI by image content hash for FILE_HANDLE_TTL_SECONDS,
+so every later call in the flow only references it. Small images are sent
+as a single inline part that is cached and reused as is; a large image whose
+upload failed is sent inline without being cached, so the cache never holds
+more than MAX_CACHED_HANDLES small images.
+"""
+
+import io
+import os
+import time
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from PIL import Image
+
+from .gemini_client import get_gemini_client
+from .tryon_cache import image_hash
+from . import metrics
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = get_logger(__name__)
+
+FILE_API_ENABLED = os.getenv("FILE_API_ENABLED", "true").lower() == "true"
+FILE_UPLOAD_MIN_BYTES = int(os.getenv("FILE_UPLOAD_MIN_BYTES", str(256 * 1024)))
+# Uploaded files live 48 hours; handles are reused for much less than that
+FILE_HANDLE_TTL_SECONDS = int(os.getenv("FILE_HANDLE_TTL_SECONDS", "3600"))
+MAX_CACHED_HANDLES = 256
+IMAGE_MIME_TYPE = "image/png"
+
+# image hash -> (part, expiry timestamp)
+_handles: Dict[str, Tuple["types.Part", float]] = {}
+_handles_lock = threading.Lock()
+
+
+def _encode(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _cached(key: str):
+    with _handles_lock:
+        now = time.time()
+        for expired in [k for k, (_, expires_at) in _handles.items() if expires_at <= now]:
+            del _handles[expired]
+        entry = _handles.get(key)
+        return entry[0] if entry else None
+
+
+def _store(key: str, part: "types.Part") -> "types.Part":
+    with _handles_lock:
+        if len(_handles) >= MAX_CACHED_HANDLES:
+            del _handles[min(_handles, key=lambda k: _handles[k][1])]
+        _handles[key] = (part, time.time() + FILE_HANDLE_TTL_SECONDS)
+    return part
+
+
+def _inline_part(key: str, data: bytes) -> "types.Part":
+    from google.genai import types
+
+    metrics.observe_payload("gemini_inline_image", len(data))
+    part = types.Part.from_bytes(data=data, mime_type=IMAGE_MIME_TYPE)
+    # Only small images are kept; large ones are retried as uploads next time
+    return _store(key, part) if len(data) < FILE_UPLOAD_MIN_BYTES else part
+
+
+def _should_upload(data: bytes) -> bool:
+    return FILE_API_ENABLED and len(data) >= FILE_UPLOAD_MIN_BYTES
+
+
+def _uploaded_part(uploaded) -> "types.Part":
+    from google.genai import types
+
+    return types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type or IMAGE_MIME_TYPE)
+
+
+def get_image_part(image: Image.Image) -> "types.Part":
+    """A content part for the image: a File API reference when large, otherwise inline bytes"""
+    from google.genai import types
+
+    key = image_hash(image)
+    part = _cached(key)
+    if part is not None:
+        return part
+
+    data = _encode(image)
+    if _should_upload(data):
+        try:
+            with metrics.gemini_call("files", "file_upload"):
+                uploaded = get_gemini_client().files.upload(
+                    file=io.BytesIO(data),
+                    config=types.UploadFileConfig(mime_type=IMAGE_MIME_TYPE)
+                )
+            metrics.observe_payload("gemini_file_upload", len(data))
+            return _store(key, _uploaded_part(uploaded))
+        except Exception as e:
+            logger.warning("File API upload failed, sending image inline: %s", e)
+    return _inline_part(key, data)
+
+
+async def get_image_part_async(image: Image.Image) -> "types.Part":
+    """Async variant of get_image_part using the aio client"""
+    from google.genai import types
+
+    key = image_hash(image)
+    part = _cached(key)
+    if part is not None:
+        return part
+
+    data = _encode(image)
+    if _should_upload(data):
+        try:
+            with metrics.gemini_call("files", "file_upload"):
+                uploaded = await get_gemini_client().aio.files.upload(
+                    file=io.BytesIO(data),
+                    config=types.UploadFileConfig(mime_type=IMAGE_MIME_TYPE)
+                )
+            metrics.observe_payload("gemini_file_upload", len(data))
+            return _store(key, _uploaded_part(uploaded))
+        except Exception as e:
+            logger.warning("File API upload failed, sending image inline: %s", e)
+    return _inline_part(key, data)
@@ -4,10 +4,17 @@ from typing import Optional
 from fastapi import UploadFile, HTTPException
 from PIL import Image
 
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+@metrics.stage("decode")
 def process_uploaded_image(uploaded_file: UploadFile) -> Image.Image:
     """Process uploaded image file and return PIL Image object"""
     try:
         image_data = uploaded_file.file.read()
+        metrics.observe_payload("uploaded_image", len(image_data))
         image = Image.open(io.BytesIO(image_data))
         
         # Convert to RGB if necessary
@@ -23,9 +30,27 @@ def process_uploaded_image(uploaded_file: UploadFile) -> Image.Image:
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
 
+@metrics.stage("encode")
 def image_to_base64(image: Image.Image) -> str:
     """Convert PIL Image to base64 string"""
     buffer = io.BytesIO()
     image.save(buffer, format='PNG')
     img_str = base64.b64encode(buffer.getvalue()).decode()
-    return img_str
\ No newline at end of file
+    return img_str
+
+@metrics.stage("decode")
+def base64_to_image(image_base64: str) -> Image.Image:
+    """Convert a base64 string to a PIL Image"""
+    image = Image.open(io.BytesIO(base64.b64decode(image_base64)))
+    image.load()
+    return image
+
+def decode_item_image(image_base64: Optional[str]) -> Optional[Image.Image]:
+    """Decode an item's base64 image for color and similarity indexing (None if missing or unreadable)"""
+    if not image_base64:
+        return None
+    try:
+        return base64_to_image(image_base64)
+    except Exception as e:
+        logger.warning("Could not decode item image: %s", e)
+        return None
@@ -3,7 +3,7 @@ from typing import Optional, List
 from fastapi import UploadFile
 from PIL import Image
 
-from .gemini_client import get_gemini_client, editing_model
+from .gemini_client import editing_model, generate_content
 from .image_processing import process_uploaded_image, image_to_base64
 
 async def generate_image_with_context(
@@ -15,8 +15,6 @@ async def generate_image_with_context(
     """
     Generate an image using Gemini AI with optional context images
     """
-    client = get_gemini_client()
-    
     # Prepare the generation prompt
     generation_prompt = f"""
     Create a detailed image based on the following description: {prompt}
@@ -43,10 +41,7 @@ async def generate_image_with_context(
     contents.extend(processed_images)
     
     # Generate content with Gemini
-    response = client.models.generate_content(
-        model=editing_model,
-        contents=contents
-    )
+    response = generate_content(editing_model, contents, operation="generate_image")
     
     # Process response
     generated_image_base64 = None
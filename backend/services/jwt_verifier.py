@@ -0,0 +1,200 @@
+"""
+Supabase access token verification with a cache of verified tokens.
+
+Most authenticated traffic is a few users polling with the same token, so
+a verified token's SHA-256 digest is kept in a bounded LRU with its user id
+and expiry; repeat requests skip signature verification until the token
+expires (AUTH_TOKEN_CACHE_SIZE entries, 0 disables the cache).
+
+HS256 tokens are verified with SUPABASE_JWT_SECRET. Tokens signed with an
+asymmetric Supabase signing key (RS256/ES256) are verified against the
+project's JWKS, fetched on first use and refreshed by a background thread
+every JWKS_REFRESH_SECONDS; a token whose key id isn't known yet triggers
+an immediate refresh, at most once every JWKS_MIN_REFRESH_SECONDS. Async
+callers use verify_access_token_async, which runs that refresh in a worker
+thread instead of on the event loop.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from jose import JWTError, jwt
+
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL") or f"{(SUPABASE_URL or '').rstrip('/')}/auth/v1/.well-known/jwks.json"
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "600"))
+JWKS_MIN_REFRESH_SECONDS = 30
+JWT_AUDIENCE = "authenticated"
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+
+class TokenCache:
+    """LRU of token digest -> (user_id, exp) for tokens that passed verification"""
+
+    def __init__(self, max_size: int = AUTH_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, digest: bytes) -> Optional[str]:
+        """The user id of a cached, unexpired token"""
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self.entries[digest]
+                return None
+            self.entries.move_to_end(digest)
+            return entry[0]
+
+    def put(self, digest: bytes, user_id: str, exp: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[digest] = (user_id, exp)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class JWKSCache:
+    """The project's public signing keys by key id, refreshed in the background"""
+
+    def __init__(self, url: str = SUPABASE_JWKS_URL, refresh_seconds: float = JWKS_REFRESH_SECONDS):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.fetched_at = 0.0
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def refresh(self) -> bool:
+        """Fetch the key set, keeping the previous keys if the fetch fails"""
+        import httpx
+
+        try:
+            with metrics.supabase_call("auth.jwks"):
+                response = httpx.get(self.url, timeout=10)
+                response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", []) if key.get("kid")}
+        except Exception as e:
+            logger.warning("Could not refresh JWKS from %s: %s", self.url, e)
+            with self.lock:
+                self.fetched_at = time.time()
+            return False
+        with self.lock:
+            self.keys = keys
+            self.fetched_at = time.time()
+        return True
+
+    def needs_refresh(self, kid: Optional[str]) -> bool:
+        """Whether get_key(kid) would fetch the key set (unknown key id, not fetched recently)"""
+        with self.lock:
+            return kid not in self.keys and time.time() - self.fetched_at >= JWKS_MIN_REFRESH_SECONDS
+
+    def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The JWK for a key id, fetching the key set if the id is unknown"""
+        self._ensure_refresher()
+        with self.lock:
+            key = self.keys.get(kid)
+        if key is None and self.needs_refresh(kid):
+            self.refresh()
+            with self.lock:
+                key = self.keys.get(kid)
+        return key
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.wait(self.refresh_seconds):
+            self.refresh()
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self.lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="jwks-refresher", daemon=True)
+            self._refresher.start()
+
+    def shutdown(self) -> None:
+        self._stop_event.set()
+
+
+token_cache = TokenCache()
+jwks_cache = JWKSCache()
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise JWTError("HS256 tokens can't be verified without SUPABASE_JWT_SECRET")
+        key = SUPABASE_JWT_SECRET
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        key = jwks_cache.get_key(header.get("kid"))
+        if key is None:
+            raise JWTError(f"Unknown signing key: {header.get('kid')}")
+    else:
+        raise JWTError(f"Unsupported token algorithm: {algorithm}")
+    return jwt.decode(token, key, algorithms=[algorithm], audience=JWT_AUDIENCE)
+
+
+def verify_access_token(token: str) -> Optional[str]:
+    """
+    The user id (sub) of a valid access token, or None if it has no subject.
+
+    Raises JWTError for invalid or expired tokens.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(digest)
+    if user_id is not None:
+        return user_id
+
+    payload = _decode(token)
+    user_id = payload.get("sub")
+    # Tokens without an expiry are verified every time
+    if user_id is not None and isinstance(payload.get("exp"), (int, float)):
+        token_cache.put(digest, user_id, float(payload["exp"]))
+    return user_id
+
+
+async def verify_access_token_async(token: str) -> Optional[str]:
+    """
+    verify_access_token for the event loop.
+
+    A token signed with a key id that isn't known yet needs the JWKS fetched,
+    so it is verified in a worker thread; everything else is verified inline.
+    """
+    user_id = token_cache.get(hashlib.sha256(token.encode()).digest())
+    if user_id is not None:
+        return user_id
+
+    header = jwt.get_unverified_header(token)
+    if header.get("alg") in ASYMMETRIC_ALGORITHMS and jwks_cache.needs_refresh(header.get("kid")):
+        return await asyncio.to_thread(verify_access_token, token)
+    return verify_access_token(token)
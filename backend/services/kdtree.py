@@ -0,0 +1,113 @@
+"""
+Static KD-tree for nearest-neighbour queries on small point sets.
+
+Points are split on the axis of largest spread at the median until a node
+holds at most LEAF_SIZE points; leaves are scanned with NumPy. Built once
+and queried many times (e.g. a user's item colors in CIELAB).
+"""
+
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+LEAF_SIZE = 16
+
+
+class KDTree:
+    """
+    KD-tree over an (n, d) array of points.
+
+    Example:
+        >>> tree = KDTree(np.array([[0, 0], [5, 5], [1, 1]]))
+        >>> tree.query(np.array([0.9, 0.8]), k=1)
+        ([0.223...], [2])
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        # Point indices, reordered so every node covers a contiguous range
+        self.order = np.arange(len(self.points))
+
+        # Node arrays: split axis (-1 for leaves), split value, children and range
+        self._axis: List[int] = []
+        self._split: List[float] = []
+        self._children: List[Tuple[int, int]] = []
+        self._range: List[Tuple[int, int]] = []
+
+        if len(self.points):
+            self._build(0, len(self.points))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._axis)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._children.append((-1, -1))
+        self._range.append((start, end))
+
+        if end - start <= self.leaf_size:
+            return node
+
+        indices = self.order[start:end]
+        subset = self.points[indices]
+        axis = int(np.argmax(subset.max(axis=0) - subset.min(axis=0)))
+        middle = (end - start) // 2
+        partitioned = indices[np.argpartition(subset[:, axis], middle)]
+        self.order[start:end] = partitioned
+
+        self._axis[node] = axis
+        self._split[node] = float(self.points[partitioned[middle], axis])
+        left = self._build(start, start + middle)
+        right = self._build(start + middle, end)
+        self._children[node] = (left, right)
+        return node
+
+    def query(self, point: np.ndarray, k: int = 1,
+              max_distance: Optional[float] = None) -> Tuple[List[float], List[int]]:
+        """
+        The k points nearest to `point` (optionally within max_distance).
+
+        Returns (distances, indices into the original points), nearest first.
+        """
+        if not len(self.points) or k < 1:
+            return [], []
+
+        point = np.asarray(point, dtype=np.float64)
+        bound = np.inf if max_distance is None else float(max_distance) ** 2
+        # Max-heap of (-squared distance, index) for the best k so far
+        best: List[Tuple[float, int]] = []
+
+        def radius() -> float:
+            return -best[0][0] if len(best) == k else bound
+
+        stack = [(0, 0.0)]
+        while stack:
+            node, node_distance = stack.pop()
+            if node_distance > radius():
+                continue
+
+            axis = self._axis[node]
+            if axis < 0:
+                start, end = self._range[node]
+                indices = self.order[start:end]
+                distances = ((self.points[indices] - point) ** 2).sum(axis=1)
+                for distance, index in zip(distances, indices):
+                    if distance <= radius():
+                        heapq.heappush(best, (-distance, int(index)))
+                        if len(best) > k:
+                            heapq.heappop(best)
+                continue
+
+            left, right = self._children[node]
+            offset = point[axis] - self._split[node]
+            near, far = (left, right) if offset < 0 else (right, left)
+            # Visit the near side first (pushed last); the far side is at least offset away
+            stack.append((far, max(node_distance, offset * offset)))
+            stack.append((near, node_distance))
+
+        ranked = sorted((-distance, index) for distance, index in best)
+        return [float(np.sqrt(distance)) for distance, _ in ranked], [index for _, index in ranked]
@@ -0,0 +1,45 @@
+"""
+Deferred imports for modules that aren't needed to start the app.
+
+LazyModules maps names to module paths and imports them the first time
+the mapping is read, so the clothing model registry (the *_config
+modules) loads on the first identification or category lookup instead of
+when the server starts.
+
+Example:
+    >>> CONFIGS = LazyModules({"tops": "models.tops_config"})
+    >>> CONFIGS["tops"].CLOTHING_TYPES  # models.tops_config is imported here
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, Iterator, Mapping, Optional
+
+
+class LazyModules(Mapping):
+    """Read-only name -> module mapping, importing every module on first access (in order)"""
+
+    def __init__(self, module_paths: Dict[str, str]):
+        self.module_paths = dict(module_paths)
+        self._modules: Optional[Dict[str, ModuleType]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, ModuleType]:
+        if self._modules is None:
+            with self._lock:
+                if self._modules is None:
+                    self._modules = {name: importlib.import_module(path) for name, path in self.module_paths.items()}
+        return self._modules
+
+    def __getitem__(self, name: str) -> ModuleType:
+        return self._load()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.module_paths)
+
+    def __len__(self) -> int:
+        return len(self.module_paths)
+
+    def __contains__(self, name) -> bool:
+        return name in self.module_paths
@@ -0,0 +1,158 @@
+"""
+Structured, non-blocking logging.
+
+Log calls only enqueue the record; a background QueueListener thread does
+the message formatting, JSON encoding and stdout writes, so request
+handlers never block on I/O. Every record carries the request/correlation
+ID and endpoint of the request that produced it.
+
+Environment:
+    LOG_LEVEL        Minimum level (default INFO)
+    LOG_SAMPLE_RATE  Fraction of per-item debug records kept (default 0.1)
+    LOG_FORMAT       "json" (default) or "text"
+
+Example:
+    >>> logger = get_logger(__name__)
+    >>> logger.info("Uploading image %s", filename, extra={"size_bytes": size})
+    >>> logger.debug("Extracted %s", item, extra=SAMPLED)
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+
+from .request_context import current_endpoint, current_request_id
+
+ROOT_LOGGER_NAME = "dripdrop"
+
+# Pass as extra= on high-volume per-item debug logs to have them sampled
+SAMPLED = {"sampled": True}
+
+# Attributes present on every LogRecord; anything else came in via extra=
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName", "sampled", "request_id", "endpoint"
+}
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current request ID and endpoint (read in the caller's context)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id.get()
+        record.endpoint = current_endpoint.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records logged with extra=SAMPLED"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False):
+            return random.random() < self.rate
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that defers message formatting to the listener thread.
+
+    The stock handler formats in the caller's thread; here the record is
+    enqueued as-is (the queue is in-process so nothing needs pickling).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "endpoint": getattr(record, "endpoint", None),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+
+def configure_logging() -> None:
+    """Install the queue handler and start the background writer (idempotent)"""
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+        sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+        formatter = TextFormatter() if os.getenv("LOG_FORMAT", "json") == "text" else JsonFormatter()
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        queue_handler.addFilter(ContextFilter())
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer"""
+    global _listener
+
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+def set_level(level: str) -> None:
+    """Change the minimum log level at runtime"""
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(level.upper())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger under the application namespace"""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
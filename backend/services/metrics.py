@@ -0,0 +1,329 @@
+"""
+Lightweight in-process instrumentation.
+
+Provides counters, gauges and histograms plus a `span` helper that times a
+block (or a sync/async function when used as a decorator) into a histogram.
+Everything is rendered in the Prometheus text exposition format by
+`render_latest()`, which backs the /metrics endpoint.
+
+Example:
+    >>> with metrics.stage("decode"):
+    ...     image = Image.open(buffer)
+    >>> with metrics.supabase_call("clothes.insert"):
+    ...     result = supabase.table("clothes").insert(row).execute()
+
+Supabase spans wrap the `.execute()` call itself rather than the service
+function around it, since those functions often catch errors and call each
+other (which would hide failures and count nested calls twice).
+"""
+
+import time
+import inspect
+import functools
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .request_context import current_endpoint
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) - Gemini image edits routinely take 5-30s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# Payload size buckets (bytes) from 1KB up to 16MB
+SIZE_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(8))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding label bookkeeping shared by all metric types"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        # Labels the metric doesn't declare are ignored so callers can pass a shared label set
+        if "endpoint" in self.label_names and not labels.get("endpoint"):
+            labels = dict(labels, endpoint=current_endpoint.get())
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _matching(self, labels: Dict[str, str]) -> List[object]:
+        """Values of every label set agreeing with the given labels (others unconstrained)"""
+        positions = [(self.label_names.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return [value for key, value in self._values.items()
+                    if all(key[i] == expected for i, expected in positions)]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels) -> float:
+        """Current value for a label set, or the sum across all label sets if none given"""
+        with self._lock:
+            if labels:
+                return self._values.get(self._key(labels), 0.0)
+            return sum(self._values.values())
+
+    def total(self, **labels) -> float:
+        """Sum across all label sets matching the given labels, e.g. every endpoint for one model"""
+        return sum(self._matching(labels))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, label_names)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def mean(self, **labels) -> Optional[Tuple[float, int]]:
+        """(mean, count) of observations across label sets matching the given labels, None if empty"""
+        states = self._matching(labels)
+        with self._lock:
+            total = sum(state[1] for state in states)
+            count = sum(state[2] for state in states)
+        return (total / count, count) if count else None
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP requests
+http_request_duration = Histogram(
+    "dripdrop_http_request_duration_seconds", "HTTP request latency",
+    ("method", "endpoint", "status")
+)
+http_requests_in_flight = Gauge(
+    "dripdrop_http_requests_in_flight", "HTTP requests currently being served",
+    ("endpoint",)
+)
+
+# Gemini API calls
+gemini_call_duration = Histogram(
+    "dripdrop_gemini_call_duration_seconds", "Gemini API call latency",
+    ("endpoint", "model", "operation", "outcome")
+)
+gemini_calls_in_flight = Gauge(
+    "dripdrop_gemini_calls_in_flight", "Gemini API calls currently awaiting a response",
+    ("endpoint", "model")
+)
+
+# Supabase calls (database and storage)
+supabase_call_duration = Histogram(
+    "dripdrop_supabase_call_duration_seconds", "Supabase database/storage call latency",
+    ("endpoint", "operation", "outcome")
+)
+supabase_calls_in_flight = Gauge(
+    "dripdrop_supabase_calls_in_flight", "Supabase calls currently awaiting a response",
+    ("endpoint",)
+)
+
+# Service pipeline stages (decode, quality check, itemize, extraction fan-out, ...)
+stage_duration = Histogram(
+    "dripdrop_stage_duration_seconds", "Latency of individual service pipeline stages",
+    ("endpoint", "stage", "outcome")
+)
+
+# Payload sizes (request bodies, decoded images, storage uploads)
+payload_size = Histogram(
+    "dripdrop_payload_bytes", "Size of request bodies and image payloads",
+    ("endpoint", "kind"), buckets=SIZE_BUCKETS
+)
+
+
+class span:
+    """
+    Time a block into a histogram, optionally tracking it in an in-flight gauge.
+
+    Works as a context manager or as a decorator for sync and async functions.
+    The "outcome" label is set to "ok" or "error" depending on whether the
+    block raised.
+    """
+
+    def __init__(self, histogram: Histogram, in_flight: Optional[Gauge] = None, **labels):
+        self.histogram = histogram
+        self.in_flight = in_flight
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        # Resolve the endpoint once so the gauge is decremented under the same labels
+        self.labels.setdefault("endpoint", current_endpoint.get())
+        if self.in_flight is not None:
+            self.in_flight.inc(**self.labels)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        if self.in_flight is not None:
+            self.in_flight.dec(**self.labels)
+        self.histogram.observe(elapsed, outcome="error" if exc_type else "ok", **self.labels)
+        return False
+
+    def __call__(self, func):
+        histogram, in_flight, labels = self.histogram, self.in_flight, self.labels
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(histogram, in_flight, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(histogram, in_flight, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def stage(name: str) -> span:
+    """Time a service pipeline stage"""
+    return span(stage_duration, stage=name)
+
+
+def gemini_call(model: str, operation: str) -> span:
+    """Time a Gemini API call"""
+    return span(gemini_call_duration, gemini_calls_in_flight, model=model, operation=operation)
+
+
+def supabase_call(operation: str) -> span:
+    """Time a Supabase database or storage call (operation like "clothes.insert")"""
+    return span(supabase_call_duration, supabase_calls_in_flight, operation=operation)
+
+
+def observe_payload(kind: str, size_bytes: int) -> None:
+    """Record the size of a request body or image payload"""
+    payload_size.observe(float(size_bytes), kind=kind)
+
+
+def resolve_endpoint(app, scope) -> str:
+    """
+    Resolve the route template for a request scope so metric labels stay
+    bounded (IDs in paths would otherwise create a series per item).
+    """
+    from starlette.routing import Match
+
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def render_latest() -> str:
+    """Render all metrics in the Prometheus text format"""
+    return REGISTRY.render()
@@ -1,6 +1,29 @@
 import json
 from typing import List, Dict, Any, Optional
 from .authService import get_supabase_client
+from .db_batch import insert_rows
+from .search_service import search_wardrobe
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Max IDs per in_() filter so batched lookups stay within URL length limits
+IN_FILTER_CHUNK_SIZE = 200
+
+# Postgres error code raised by the outfit_items (outfit_id, item_type, item_id) unique index
+UNIQUE_VIOLATION = "23505"
+
+def _chunks(values: List[str], size: int = IN_FILTER_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+async def _outfit_belongs_to_user(outfit_id: str, user_id: str) -> bool:
+    """Check outfit ownership with a single ID-only lookup"""
+    supabase = get_supabase_client()
+    with metrics.supabase_call("outfits.ownership"):
+        result = supabase.table("outfits").select("id").eq("id", outfit_id).eq("profile_id", user_id).limit(1).execute()
+    return bool(result.data)
 
 async def create_outfit(user_id: str, name: str, description: str = None) -> Dict[str, Any]:
     """Create a new outfit for a user"""
@@ -13,7 +36,8 @@ async def create_outfit(user_id: str, name: str, description: str = None) -> Dic
             "description": description
         }
 
-        result = supabase.table("outfits").insert(outfit_data).execute()
+        with metrics.supabase_call("outfits.insert"):
+            result = supabase.table("outfits").insert(outfit_data).execute()
 
         if result.data:
             return result.data[0]
@@ -21,31 +45,49 @@ async def create_outfit(user_id: str, name: str, description: str = None) -> Dic
             raise Exception(f"Database insert failed: {result}")
 
     except Exception as e:
-        print(f"Error creating outfit: {e}")
+        logger.error("Error creating outfit: %s", e)
         raise e
 
+async def create_outfits(user_id: str, outfits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create many outfits in a single insert.
+
+    Each outfit is a dict with "name" and optional "description". Returns one
+    result per outfit, in order: {"success": True, "data": row} or
+    {"success": False, "error": message}.
+    """
+    rows = [
+        {
+            "profile_id": user_id,
+            "name": outfit["name"],
+            "description": outfit.get("description")
+        }
+        for outfit in outfits
+    ]
+    return await insert_rows("outfits", rows)
+
 async def get_user_outfits(user_id: str) -> List[Dict[str, Any]]:
     """Get all outfits for a user with their items"""
     try:
         supabase = get_supabase_client()
 
         # Get outfits
-        outfits_result = supabase.table("outfits").select("*").eq("profile_id", user_id).order("created_at", desc=True).execute()
+        with metrics.supabase_call("outfits.select"):
+            outfits_result = supabase.table("outfits").select("*").eq("profile_id", user_id).order("created_at", desc=True).execute()
 
         if not outfits_result.data:
             return []
 
-        outfits = []
-        for outfit in outfits_result.data:
-            # Get outfit items for each outfit
-            outfit_items = await get_outfit_items_with_details(outfit['id'])
-            outfit['items'] = outfit_items
-            outfits.append(outfit)
+        # Load the items of all outfits at once
+        outfits = outfits_result.data
+        items_by_outfit = await get_items_with_details_for_outfits([outfit['id'] for outfit in outfits])
+        for outfit in outfits:
+            outfit['items'] = items_by_outfit.get(outfit['id'], [])
 
         return outfits
 
     except Exception as e:
-        print(f"Error getting user outfits: {e}")
+        logger.error("Error getting user outfits: %s", e)
         return []
 
 async def get_outfit_by_id(outfit_id: str, user_id: str = None) -> Dict[str, Any]:
@@ -58,7 +100,8 @@ async def get_outfit_by_id(outfit_id: str, user_id: str = None) -> Dict[str, Any
         if user_id:
             query = query.eq("profile_id", user_id)
 
-        result = query.limit(1).execute()
+        with metrics.supabase_call("outfits.select"):
+            result = query.limit(1).execute()
 
         if result.data and len(result.data) > 0:
             outfit = result.data[0]
@@ -69,7 +112,7 @@ async def get_outfit_by_id(outfit_id: str, user_id: str = None) -> Dict[str, Any
             return None
 
     except Exception as e:
-        print(f"Error getting outfit by ID: {e}")
+        logger.error("Error getting outfit by ID: %s", e)
         return None
 
 async def update_outfit(outfit_id: str, user_id: str, **updates) -> Dict[str, Any]:
@@ -84,7 +127,8 @@ async def update_outfit(outfit_id: str, user_id: str, **updates) -> Dict[str, An
         if not update_data:
             raise ValueError("No valid update data provided")
 
-        result = supabase.table("outfits").update(update_data).eq("id", outfit_id).eq("profile_id", user_id).execute()
+        with metrics.supabase_call("outfits.update"):
+            result = supabase.table("outfits").update(update_data).eq("id", outfit_id).eq("profile_id", user_id).execute()
 
         if result.data:
             return result.data[0]
@@ -92,7 +136,7 @@ async def update_outfit(outfit_id: str, user_id: str, **updates) -> Dict[str, An
             raise Exception(f"Database update failed: {result}")
 
     except Exception as e:
-        print(f"Error updating outfit: {e}")
+        logger.error("Error updating outfit: %s", e)
         raise e
 
 async def delete_outfit(outfit_id: str, user_id: str) -> bool:
@@ -101,12 +145,13 @@ async def delete_outfit(outfit_id: str, user_id: str) -> bool:
         supabase = get_supabase_client()
 
         # Delete the outfit (outfit_items will be deleted automatically due to CASCADE)
-        result = supabase.table("outfits").delete().eq("id", outfit_id).eq("profile_id", user_id).execute()
+        with metrics.supabase_call("outfits.delete"):
+            result = supabase.table("outfits").delete().eq("id", outfit_id).eq("profile_id", user_id).execute()
 
         return len(result.data) > 0 if result.data else False
 
     except Exception as e:
-        print(f"Error deleting outfit: {e}")
+        logger.error("Error deleting outfit: %s", e)
         return False
 
 async def add_item_to_outfit(outfit_id: str, item_id: str, item_type: str, user_id: str = None) -> Dict[str, Any]:
@@ -118,25 +163,23 @@ async def add_item_to_outfit(outfit_id: str, item_id: str, item_type: str, user_
         supabase = get_supabase_client()
 
         # If user_id is provided, verify the outfit belongs to the user
-        if user_id:
-            outfit = await get_outfit_by_id(outfit_id, user_id)
-            if not outfit:
-                raise Exception("Outfit not found or access denied")
-
-        # Check if item is already in the outfit
-        existing_result = supabase.table("outfit_items").select("*").eq("outfit_id", outfit_id).eq("item_id", item_id).eq("item_type", item_type).execute()
-
-        if existing_result.data:
-            raise Exception("Item already in outfit")
+        if user_id and not await _outfit_belongs_to_user(outfit_id, user_id):
+            raise Exception("Outfit not found or access denied")
 
-        # Add item to outfit
+        # Add item to outfit (the unique index rejects duplicates)
         outfit_item_data = {
             "outfit_id": outfit_id,
             "item_id": item_id,
             "item_type": item_type
         }
 
-        result = supabase.table("outfit_items").insert(outfit_item_data).execute()
+        try:
+            with metrics.supabase_call("outfit_items.insert"):
+                result = supabase.table("outfit_items").insert(outfit_item_data).execute()
+        except Exception as insert_error:
+            if getattr(insert_error, "code", None) == UNIQUE_VIOLATION:
+                raise Exception("Item already in outfit")
+            raise
 
         if result.data:
             return result.data[0]
@@ -144,64 +187,190 @@ async def add_item_to_outfit(outfit_id: str, item_id: str, item_type: str, user_
             raise Exception(f"Database insert failed: {result}")
 
     except Exception as e:
-        print(f"Error adding item to outfit: {e}")
+        logger.error("Error adding item to outfit: %s", e)
         raise e
 
+async def insert_outfit_items(outfit_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert many outfit_items rows (possibly across outfits) in a single request.
+
+    Each entry is a dict with "outfit_id", "item_id" and "item_type"; callers
+    are responsible for checking outfit ownership. Returns one result per
+    entry, in order: {"success": True, "data": row} or {"success": False, "error": message}.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(outfit_items)
+    rows, row_positions = [], []
+
+    for position, outfit_item in enumerate(outfit_items):
+        if outfit_item.get("item_type") not in ['clothing', 'accessory']:
+            results[position] = {"success": False, "error": "item_type must be 'clothing' or 'accessory'"}
+            continue
+        rows.append({
+            "outfit_id": outfit_item["outfit_id"],
+            "item_id": outfit_item["item_id"],
+            "item_type": outfit_item["item_type"]
+        })
+        row_positions.append(position)
+
+    for position, result in zip(row_positions, await insert_rows("outfit_items", rows)):
+        results[position] = result
+
+    return results
+
 async def remove_item_from_outfit(outfit_id: str, item_id: str, item_type: str, user_id: str = None) -> bool:
     """Remove an item from an outfit"""
     try:
         supabase = get_supabase_client()
 
         # If user_id is provided, verify the outfit belongs to the user
-        if user_id:
-            outfit = await get_outfit_by_id(outfit_id, user_id)
-            if not outfit:
-                return False
+        if user_id and not await _outfit_belongs_to_user(outfit_id, user_id):
+            return False
 
-        result = supabase.table("outfit_items").delete().eq("outfit_id", outfit_id).eq("item_id", item_id).eq("item_type", item_type).execute()
+        with metrics.supabase_call("outfit_items.delete"):
+            result = supabase.table("outfit_items").delete().eq("outfit_id", outfit_id).eq("item_id", item_id).eq("item_type", item_type).execute()
 
         return len(result.data) > 0 if result.data else False
 
     except Exception as e:
-        print(f"Error removing item from outfit: {e}")
+        logger.error("Error removing item from outfit: %s", e)
         return False
 
-async def get_outfit_items_with_details(outfit_id: str) -> List[Dict[str, Any]]:
-    """Get all items in an outfit with their full details"""
+def _split_outfit_items(items: List[Dict[str, Any]]):
+    """Dedupe requested items and separate out ones with an invalid item_type"""
+    valid, invalid = [], []
+    for item in dict.fromkeys((item.get("item_id"), item.get("item_type")) for item in items):
+        if item[0] and item[1] in ['clothing', 'accessory']:
+            valid.append(item)
+        else:
+            invalid.append({"item_id": item[0], "item_type": item[1], "error": "item_type must be 'clothing' or 'accessory'"})
+    return valid, invalid
+
+async def add_items_to_outfit(outfit_id: str, items: List[Dict[str, Any]], user_id: str = None) -> Dict[str, Any]:
+    """
+    Add many items to an outfit in one request.
+
+    Each item is a dict with "item_id" and "item_type". Items already in the
+    outfit are skipped by the unique index rather than checked up front.
+    Returns {"added": [...rows], "already_in_outfit": [...], "errors": [...]}.
+    """
     try:
+        valid, invalid = _split_outfit_items(items)
+
+        if user_id and not await _outfit_belongs_to_user(outfit_id, user_id):
+            raise Exception("Outfit not found or access denied")
+
+        added = []
+        if valid:
+            supabase = get_supabase_client()
+            rows = [{"outfit_id": outfit_id, "item_id": item_id, "item_type": item_type} for item_id, item_type in valid]
+            with metrics.supabase_call("outfit_items.upsert"):
+                result = supabase.table("outfit_items").upsert(
+                    rows, on_conflict="outfit_id,item_type,item_id", ignore_duplicates=True
+                ).execute()
+            added = result.data or []
+
+        added_keys = {(row["item_id"], row["item_type"]) for row in added}
+        already_in_outfit = [
+            {"item_id": item_id, "item_type": item_type}
+            for item_id, item_type in valid if (item_id, item_type) not in added_keys
+        ]
+
+        return {"added": added, "already_in_outfit": already_in_outfit, "errors": invalid}
+
+    except Exception as e:
+        logger.error("Error adding items to outfit: %s", e)
+        raise e
+
+async def remove_items_from_outfit(outfit_id: str, items: List[Dict[str, Any]], user_id: str = None) -> Dict[str, Any]:
+    """
+    Remove many items from an outfit with one delete per item type.
+
+    Each item is a dict with "item_id" and "item_type".
+    Returns {"removed": [...rows], "not_in_outfit": [...], "errors": [...]}.
+    """
+    try:
+        valid, invalid = _split_outfit_items(items)
+
+        if user_id and not await _outfit_belongs_to_user(outfit_id, user_id):
+            raise Exception("Outfit not found or access denied")
+
         supabase = get_supabase_client()
+        removed = []
+        for item_type in ['clothing', 'accessory']:
+            item_ids = [item_id for item_id, requested_type in valid if requested_type == item_type]
+            for chunk in _chunks(item_ids):
+                with metrics.supabase_call("outfit_items.delete"):
+                    result = supabase.table("outfit_items").delete().eq("outfit_id", outfit_id).eq("item_type", item_type).in_("item_id", chunk).execute()
+                removed.extend(result.data or [])
+
+        removed_keys = {(row["item_id"], row["item_type"]) for row in removed}
+        not_in_outfit = [
+            {"item_id": item_id, "item_type": item_type}
+            for item_id, item_type in valid if (item_id, item_type) not in removed_keys
+        ]
+
+        return {"removed": removed, "not_in_outfit": not_in_outfit, "errors": invalid}
 
-        # Get outfit items
-        outfit_items_result = supabase.table("outfit_items").select("*").eq("outfit_id", outfit_id).execute()
+    except Exception as e:
+        logger.error("Error removing items from outfit: %s", e)
+        raise e
 
-        if not outfit_items_result.data:
-            return []
+async def get_outfit_items_with_details(outfit_id: str) -> List[Dict[str, Any]]:
+    """Get all items in an outfit with their full details"""
+    items_by_outfit = await get_items_with_details_for_outfits([outfit_id])
+    return items_by_outfit.get(outfit_id, [])
 
-        items_with_details = []
+async def get_items_with_details_for_outfits(outfit_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the items of several outfits with their full details.
 
-        for outfit_item in outfit_items_result.data:
-            item_id = outfit_item['item_id']
-            item_type = outfit_item['item_type']
+    Uses one outfit_items query plus one query per item table (chunked for
+    large ID lists) instead of a lookup per item. Returns a dict of
+    outfit_id -> items.
+    """
+    items_by_outfit: Dict[str, List[Dict[str, Any]]] = {outfit_id: [] for outfit_id in outfit_ids}
+    if not outfit_ids:
+        return items_by_outfit
 
-            # Fetch full item details from appropriate table
-            if item_type == 'clothing':
-                item_result = supabase.table("clothes").select("*").eq("id", item_id).execute()
-            elif item_type == 'accessory':
-                item_result = supabase.table("accessories").select("*").eq("id", item_id).execute()
-            else:
+    try:
+        supabase = get_supabase_client()
+
+        # Get outfit items for all outfits
+        outfit_items = []
+        for chunk in _chunks(list(dict.fromkeys(outfit_ids))):
+            with metrics.supabase_call("outfit_items.select"):
+                result = supabase.table("outfit_items").select("*").in_("outfit_id", chunk).execute()
+            outfit_items.extend(result.data or [])
+
+        if not outfit_items:
+            return items_by_outfit
+
+        # Fetch full item details from each table in bulk
+        details = {}
+        for item_type, table in (('clothing', 'clothes'), ('accessory', 'accessories')):
+            item_ids = list(dict.fromkeys(oi['item_id'] for oi in outfit_items if oi['item_type'] == item_type))
+            for chunk in _chunks(item_ids):
+                with metrics.supabase_call(f"{table}.select"):
+                    result = supabase.table(table).select("*").in_("id", chunk).execute()
+                for row in result.data or []:
+                    details[(item_type, row['id'])] = row
+
+        for outfit_item in outfit_items:
+            item_details = details.get((outfit_item['item_type'], outfit_item['item_id']))
+            if item_details is None:
                 continue
 
-            if item_result.data and len(item_result.data) > 0:
-                item_details = item_result.data[0]
-                item_details['item_type'] = item_type
-                item_details['outfit_item_id'] = outfit_item['id']
-                items_with_details.append(item_details)
+            # Copy since the same item can appear in several outfits
+            item_details = dict(item_details)
+            item_details['item_type'] = outfit_item['item_type']
+            item_details['outfit_item_id'] = outfit_item['id']
+            items_by_outfit.setdefault(outfit_item['outfit_id'], []).append(item_details)
 
-        return items_with_details
+        return items_by_outfit
 
     except Exception as e:
-        print(f"Error getting outfit items with details: {e}")
-        return []
+        logger.error("Error getting outfit items with details: %s", e)
+        return {outfit_id: [] for outfit_id in outfit_ids}
 
 async def get_outfits_containing_item(user_id: str, item_id: str, item_type: str) -> List[Dict[str, Any]]:
     """Get all outfits that contain a specific item"""
@@ -209,7 +378,8 @@ async def get_outfits_containing_item(user_id: str, item_id: str, item_type: str
         supabase = get_supabase_client()
 
         # Get outfit_items that match the item
-        outfit_items_result = supabase.table("outfit_items").select("outfit_id").eq("item_id", item_id).eq("item_type", item_type).execute()
+        with metrics.supabase_call("outfit_items.select"):
+            outfit_items_result = supabase.table("outfit_items").select("outfit_id").eq("item_id", item_id).eq("item_type", item_type).execute()
 
         if not outfit_items_result.data:
             return []
@@ -217,35 +387,34 @@ async def get_outfits_containing_item(user_id: str, item_id: str, item_type: str
         outfit_ids = [item['outfit_id'] for item in outfit_items_result.data]
 
         # Get the outfits that belong to the user
-        outfits_result = supabase.table("outfits").select("*").eq("profile_id", user_id).in_("id", outfit_ids).execute()
+        with metrics.supabase_call("outfits.select"):
+            outfits_result = supabase.table("outfits").select("*").eq("profile_id", user_id).in_("id", outfit_ids).execute()
 
         return outfits_result.data if outfits_result.data else []
 
     except Exception as e:
-        print(f"Error getting outfits containing item: {e}")
+        logger.error("Error getting outfits containing item: %s", e)
         return []
 
 async def duplicate_outfit(outfit_id: str, user_id: str, new_name: str = None) -> Dict[str, Any]:
-    """Create a duplicate of an existing outfit"""
+    """Create a duplicate of an existing outfit (copied in one transaction by the duplicate_outfit SQL function)"""
     try:
-        # Get the original outfit
-        original_outfit = await get_outfit_by_id(outfit_id, user_id)
-        if not original_outfit:
-            raise Exception("Outfit not found or access denied")
+        supabase = get_supabase_client()
 
-        # Create new outfit
-        duplicate_name = new_name or f"{original_outfit['name']} (Copy)"
-        new_outfit = await create_outfit(user_id, duplicate_name, original_outfit.get('description'))
+        with metrics.supabase_call("outfits.duplicate"):
+            result = supabase.rpc('duplicate_outfit', {
+                'p_outfit_id': outfit_id,
+                'p_profile_id': user_id,
+                'p_new_name': new_name
+            }).execute()
 
-        # Copy all items to the new outfit
-        for item in original_outfit.get('items', []):
-            await add_item_to_outfit(new_outfit['id'], item['id'], item['item_type'], user_id)
+        if not result.data:
+            raise Exception("Outfit not found or access denied")
 
-        # Return the new outfit with items
-        return await get_outfit_by_id(new_outfit['id'], user_id)
+        return result.data
 
     except Exception as e:
-        print(f"Error duplicating outfit: {e}")
+        logger.error("Error duplicating outfit: %s", e)
         raise e
 
 async def get_outfit_statistics(user_id: str) -> Dict[str, Any]:
@@ -254,19 +423,23 @@ async def get_outfit_statistics(user_id: str) -> Dict[str, Any]:
         supabase = get_supabase_client()
 
         # Get total outfits count
-        outfits_result = supabase.table("outfits").select("id", count="exact").eq("profile_id", user_id).execute()
+        with metrics.supabase_call("outfits.select"):
+            outfits_result = supabase.table("outfits").select("id", count="exact").eq("profile_id", user_id).execute()
         total_outfits = outfits_result.count or 0
 
         # Get outfit items count
-        outfit_items_result = supabase.rpc('get_outfit_items_count_by_user', {'user_id': user_id}).execute()
+        with metrics.supabase_call("outfit_items.count_by_user"):
+            outfit_items_result = supabase.rpc('get_outfit_items_count_by_user', {'user_id': user_id}).execute()
 
         # If the RPC doesn't exist, calculate manually
         if not outfit_items_result.data:
             # Get all user outfits
-            user_outfits = supabase.table("outfits").select("id").eq("profile_id", user_id).execute()
+            with metrics.supabase_call("outfits.select"):
+                user_outfits = supabase.table("outfits").select("id").eq("profile_id", user_id).execute()
             if user_outfits.data:
                 outfit_ids = [outfit['id'] for outfit in user_outfits.data]
-                items_result = supabase.table("outfit_items").select("item_type", count="exact").in_("outfit_id", outfit_ids).execute()
+                with metrics.supabase_call("outfit_items.select"):
+                    items_result = supabase.table("outfit_items").select("item_type", count="exact").in_("outfit_id", outfit_ids).execute()
                 total_items = items_result.count or 0
             else:
                 total_items = 0
@@ -280,33 +453,27 @@ async def get_outfit_statistics(user_id: str) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        print(f"Error getting outfit statistics: {e}")
+        logger.error("Error getting outfit statistics: %s", e)
         return {
             "total_outfits": 0,
             "total_items_in_outfits": 0,
             "average_items_per_outfit": 0
         }
 
-async def search_outfits(user_id: str, query: str) -> List[Dict[str, Any]]:
-    """Search outfits by name or description"""
+async def search_outfits(user_id: str, query: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    """Search outfits by name or description, best matches first"""
     try:
-        supabase = get_supabase_client()
-
-        # Search in outfit names and descriptions
-        result = supabase.table("outfits").select("*").eq("profile_id", user_id).or_(f"name.ilike.%{query}%,description.ilike.%{query}%").execute()
-
-        if not result.data:
-            return []
+        # Indexed full-text/trigram search (see search_wardrobe in database_init.sql)
+        page = await search_wardrobe(user_id, query, ['outfit'], limit, offset)
+        outfits = [result["item"] for result in page["results"]]
 
-        outfits = []
-        for outfit in result.data:
-            # Get outfit items for each matching outfit
-            outfit_items = await get_outfit_items_with_details(outfit['id'])
-            outfit['items'] = outfit_items
-            outfits.append(outfit)
+        # Load the items of all matching outfits at once
+        items_by_outfit = await get_items_with_details_for_outfits([outfit['id'] for outfit in outfits])
+        for outfit in outfits:
+            outfit['items'] = items_by_outfit.get(outfit['id'], [])
 
         return outfits
 
     except Exception as e:
-        print(f"Error searching outfits: {e}")
-        return []
\ No newline at end of file
+        logger.error("Error searching outfits: %s", e)
+        return []
@@ -0,0 +1,406 @@
+"""
+Outfit suggestions from a user's wardrobe.
+
+Clothes and accessories are loaded into NumPy arrays (slot, Lab hue and
+lightness, formality, warmth) and top x bottom x footwear x outerwear
+combinations are scored with broadcasting. Outfits are built one slot at a
+time and only the BEAM_WIDTH best partial outfits are kept after each slot,
+so a 500+ item wardrobe is scored in milliseconds instead of enumerating
+every combination (which makes the top-K approximate, not exhaustive).
+
+An outfit's score is the mean of its items' fit for the requested season and
+occasion plus the mean compatibility (color harmony and matching formality)
+of every pair of items in it, so outfits with and without a layer compare fairly.
+"""
+
+import asyncio
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .clothing_service import get_user_clothes
+from .accessory_service import get_user_accessories
+from .category_resolver import resolve_display_category
+from . import color_service
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from models.keyword_matcher import KeywordMatcher
+
+logger = get_logger(__name__)
+
+# Slots filled in order; dresses fill the top slot and leave the bottom empty
+SLOTS = ("top", "bottom", "footwear", "outerwear")
+SLOT_BY_DISPLAY_CATEGORY = {
+    "tops": "top",
+    "dresses": "top",
+    "bottoms": "bottom",
+    "footwear": "footwear",
+    "outerwear": "outerwear"
+}
+
+# Target warmth / formality (0-1) for the season and occasion filters
+SEASON_WARMTH = {"summer": 0.15, "spring": 0.45, "fall": 0.6, "winter": 0.9}
+OCCASION_FORMALITY = {"casual": 0.2, "smart": 0.55, "formal": 0.9}
+
+MAX_SUGGESTIONS = 50
+BEAM_WIDTH = 512
+
+COLOR_WEIGHT = 1.0
+FORMALITY_MATCH_WEIGHT = 0.6
+SEASON_WEIGHT = 0.8
+OCCASION_WEIGHT = 0.8
+# Penalty for leaving out outerwear when the season calls for a layer
+NO_LAYER_PENALTY = 0.4
+NO_LAYER_MIN_WARMTH = 0.75
+
+# (keyword, formality, warmth) matched against the normalized category, then
+# the name. Earlier rules win, so specific types come before generic ones.
+TYPE_RULES = [
+    # Tops
+    ("dressshirt", 0.85, 0.4), ("sweatshirt", 0.15, 0.7), ("tshirt", 0.2, 0.25),
+    ("tanktop", 0.1, 0.05), ("workouttop", 0.05, 0.15), ("blouse", 0.65, 0.35),
+    ("hoodie", 0.1, 0.7), ("cardigan", 0.5, 0.65), ("sweater", 0.45, 0.75),
+    ("polo", 0.45, 0.3), ("shirt", 0.6, 0.35),
+    # Dresses
+    ("formaldress", 0.95, 0.35), ("gown", 0.95, 0.35), ("cocktail", 0.85, 0.3),
+    ("maxidress", 0.5, 0.3), ("minidress", 0.35, 0.15), ("casualdress", 0.3, 0.25),
+    ("jumpsuit", 0.45, 0.35), ("romper", 0.2, 0.15),
+    # Bottoms
+    ("dresspants", 0.85, 0.45), ("athleticshorts", 0.05, 0.05), ("sweatpants", 0.05, 0.6),
+    ("yogapants", 0.05, 0.4), ("trousers", 0.7, 0.5), ("chinos", 0.55, 0.45),
+    ("jeans", 0.3, 0.5), ("joggers", 0.1, 0.55), ("leggings", 0.15, 0.4),
+    ("shorts", 0.15, 0.05), ("skirt", 0.5, 0.25), ("pants", 0.5, 0.5),
+    # Footwear
+    ("dressshoes", 0.9, 0.5), ("athleticshoes", 0.05, 0.4), ("oxford", 0.9, 0.5),
+    ("loafer", 0.7, 0.4), ("heels", 0.85, 0.3), ("boots", 0.5, 0.85),
+    ("sneakers", 0.2, 0.4), ("sandals", 0.15, 0.05), ("flats", 0.5, 0.3),
+    # Outerwear
+    ("wintercoat", 0.4, 1.0), ("parka", 0.3, 1.0), ("puffer", 0.2, 0.95),
+    ("raincoat", 0.25, 0.5), ("rainjacket", 0.25, 0.5), ("windbreaker", 0.1, 0.4),
+    ("blazer", 0.85, 0.5), ("trench", 0.7, 0.65), ("vest", 0.4, 0.55),
+    ("coat", 0.65, 0.85), ("jacket", 0.4, 0.65),
+    # Accessories
+    ("sunglasses", 0.3, 0.1), ("gloves", 0.4, 0.95), ("beanie", 0.1, 0.9),
+    ("fedora", 0.6, 0.5), ("scarf", 0.45, 0.85), ("watch", 0.6, 0.5),
+    ("belt", 0.55, 0.5), ("cap", 0.1, 0.35), ("hat", 0.35, 0.5),
+    # Generic fallbacks
+    ("dress", 0.5, 0.3), ("shoe", 0.4, 0.4), ("top", 0.3, 0.3)
+]
+DEFAULT_FORMALITY = 0.4
+DEFAULT_WARMTH = 0.4
+
+# Feature values (from the *_config allowed values) that shift formality / warmth
+FEATURE_ADJUSTMENTS = {
+    "wool": (0.05, 0.15), "cashmere": (0.1, 0.15), "alpaca": (0.0, 0.15), "merino": (0.05, 0.1),
+    "fleece": (-0.1, 0.15), "down": (0.0, 0.15), "thinsulate": (0.0, 0.15), "synthetic": (0.0, 0.1),
+    "linen": (0.0, -0.15), "silk": (0.1, -0.05), "leather": (0.1, 0.05), "denim": (-0.1, 0.0),
+    "sleeveless": (0.0, -0.15), "short": (0.0, -0.05), "knee-high": (0.05, 0.1),
+    "stiletto": (0.1, 0.0), "athletic": (-0.15, 0.0), "double-breasted": (0.05, 0.0),
+    "unstructured": (-0.1, 0.0), "puffer": (-0.1, 0.15), "floor length": (0.1, 0.0)
+}
+
+# Colors with less chroma than this (in Lab) count as neutral
+NEUTRAL_CHROMA = 15.0
+
+_type_matcher: Optional["KeywordMatcher"] = None
+
+
+def _get_type_matcher() -> "KeywordMatcher":
+    global _type_matcher
+    if _type_matcher is None:
+        # Importing models loads every clothing model class, so wait until first use
+        from models.keyword_matcher import KeywordMatcher
+        _type_matcher = KeywordMatcher((keyword, index) for index, (keyword, _, _) in enumerate(TYPE_RULES))
+    return _type_matcher
+
+
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r"[^a-z]", "", (text or "").lower())
+
+
+def item_attributes(item: Dict[str, Any]) -> Tuple[float, float]:
+    """(formality, warmth) of a wardrobe item from its type and features"""
+    matcher = _get_type_matcher()
+    rule = matcher.best_match(_normalize(item.get("category")))
+    if rule is None:
+        rule = matcher.best_match(_normalize(item.get("name")))
+
+    if rule is None:
+        formality, warmth = DEFAULT_FORMALITY, DEFAULT_WARMTH
+    else:
+        _, formality, warmth = TYPE_RULES[rule]
+
+    for value in (item.get("features") or {}).values():
+        adjustment = FEATURE_ADJUSTMENTS.get(str(value).lower())
+        if adjustment:
+            formality += adjustment[0]
+            warmth += adjustment[1]
+
+    return min(max(formality, 0.0), 1.0), min(max(warmth, 0.0), 1.0)
+
+
+def color_vector(item: Dict[str, Any]) -> Tuple[float, float, float, bool, bool]:
+    """
+    (hue_x, hue_y, lightness, is_neutral, is_known) for an item's primary color.
+
+    Uses the stored Lab color when there is one, otherwise the color name.
+    """
+    family = item.get("color_family")
+    lab = item.get("primary_lab")
+    if lab is None:
+        parsed = color_service.parse_color(item.get("primary_color"))
+        if parsed is None:
+            return 0.0, 0.0, 0.5, True, False
+        family, lab = parsed
+
+    lightness, a, b = lab
+    chroma = float(np.hypot(a, b))
+    neutral = family in color_service.NEUTRAL_COLORS or chroma < NEUTRAL_CHROMA
+    angle = np.arctan2(b, a)
+    return float(np.cos(angle)), float(np.sin(angle)), lightness / 100.0, neutral, True
+
+
+class SlotArrays:
+    """Column arrays for the candidates of one slot (optionally with an empty "none" row last)"""
+
+    def __init__(self, items: List[Dict[str, Any]], allow_none: bool):
+        self.items = items
+        count = len(items) + (1 if allow_none else 0)
+
+        self.hue = np.zeros((count, 2), dtype=np.float32)
+        self.lightness = np.full(count, 0.5, dtype=np.float32)
+        self.neutral = np.ones(count, dtype=bool)
+        self.known = np.zeros(count, dtype=bool)
+        self.formality = np.full(count, DEFAULT_FORMALITY, dtype=np.float32)
+        self.warmth = np.full(count, DEFAULT_WARMTH, dtype=np.float32)
+        self.onepiece = np.zeros(count, dtype=bool)
+        self.real = np.zeros(count, dtype=bool)
+        self.real[:len(items)] = True
+
+        for i, item in enumerate(items):
+            hue_x, hue_y, lightness, neutral, known = color_vector(item)
+            self.hue[i] = (hue_x, hue_y)
+            self.lightness[i] = lightness
+            self.neutral[i] = neutral
+            self.known[i] = known
+            self.formality[i], self.warmth[i] = item_attributes(item)
+            self.onepiece[i] = item.get("_display_category") == "dresses"
+
+    def __len__(self):
+        return len(self.real)
+
+
+def color_harmony(a: SlotArrays, b: SlotArrays) -> np.ndarray:
+    """Pairwise color harmony (0-1) between every candidate of a and of b"""
+    # Cosine of the hue angle between the two primary colors
+    hue_cos = a.hue @ b.hue.T
+    chromatic = ~a.neutral[:, None] & ~b.neutral[None, :]
+    both_neutral = a.neutral[:, None] & b.neutral[None, :]
+
+    harmony = np.select(
+        [hue_cos >= 0.82, hue_cos <= -0.87, hue_cos <= -0.17],  # analogous, complementary, triadic
+        [0.9, 0.8, 0.55],
+        default=0.15
+    )
+    harmony = np.where(chromatic, harmony, np.where(both_neutral, 0.75, 0.85))
+
+    # Some light/dark contrast reads better than two items of the same value
+    contrast = np.abs(a.lightness[:, None] - b.lightness[None, :])
+    harmony = harmony + 0.1 * contrast
+
+    unknown = ~a.known[:, None] | ~b.known[None, :]
+    return np.where(unknown, 0.6, harmony).astype(np.float32)
+
+
+def pair_scores(a: SlotArrays, b: SlotArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise compatibility and a mask of pairs where both items are real"""
+    scores = COLOR_WEIGHT * color_harmony(a, b) - FORMALITY_MATCH_WEIGHT * np.abs(
+        a.formality[:, None] - b.formality[None, :]
+    )
+    real = a.real[:, None] & b.real[None, :]
+    return np.where(real, scores, 0.0).astype(np.float32), real
+
+
+def unary_scores(slot: SlotArrays, season: Optional[str], occasion: Optional[str]) -> np.ndarray:
+    """How well each candidate fits the requested season and occasion (0 for none rows)"""
+    scores = np.zeros(len(slot), dtype=np.float32)
+    if season:
+        scores -= SEASON_WEIGHT * np.abs(slot.warmth - SEASON_WARMTH[season])
+    if occasion:
+        scores -= OCCASION_WEIGHT * np.abs(slot.formality - OCCASION_FORMALITY[occasion])
+    return np.where(slot.real, scores, 0.0).astype(np.float32)
+
+
+def _top_indices(scores: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the `count` best finite scores, best first"""
+    flat = scores.ravel()
+    count = min(count, int(np.isfinite(flat).sum()))
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-flat, count - 1)[:count] if count < len(flat) else np.arange(len(flat))
+    best = best[np.isfinite(flat[best])]
+    return best[np.argsort(-flat[best], kind="stable")]
+
+
+def score_outfits(slots: Dict[str, SlotArrays], k: int = 10, season: Optional[str] = None,
+                  occasion: Optional[str] = None, beam_width: int = BEAM_WIDTH) -> List[Tuple[float, Dict[str, int]]]:
+    """
+    Best outfits as (score, {slot: candidate index or -1 for none}), best first.
+
+    Each step broadcasts the kept partial outfits against every candidate
+    for the next slot, adding the new item's pair scores with each item
+    already chosen, then keeps the best `beam_width`.
+    """
+    pairs = {}
+    for i, first in enumerate(SLOTS):
+        for second in SLOTS[i + 1:]:
+            pairs[first, second] = pair_scores(slots[first], slots[second])
+    unary = {slot: unary_scores(slots[slot], season, occasion) for slot in SLOTS}
+
+    top = slots["top"]
+    chosen = {"top": np.arange(len(top))}
+    pair_sum = np.zeros(len(top), dtype=np.float32)
+    pair_count = np.zeros(len(top), dtype=np.float32)
+    unary_sum = unary["top"].copy()
+    unary_count = top.real.astype(np.float32)
+    score = np.where(top.real, unary_sum, -np.inf)
+
+    for slot in SLOTS[1:]:
+        candidates = slots[slot]
+
+        new_pair_sum = pair_sum[:, None].copy()
+        new_pair_count = pair_count[:, None].copy()
+        for previous, indices in chosen.items():
+            scores, real = pairs[previous, slot]
+            new_pair_sum = new_pair_sum + scores[indices]
+            new_pair_count = new_pair_count + real[indices]
+
+        new_unary_sum = unary_sum[:, None] + unary[slot][None, :]
+        new_unary_count = unary_count[:, None] + candidates.real[None, :]
+
+        step_score = (
+            new_pair_sum / np.maximum(new_pair_count, 1)
+            + new_unary_sum / np.maximum(new_unary_count, 1)
+        )
+        if slot == "bottom":
+            # Dresses go without a bottom; everything else needs one
+            valid = top.onepiece[chosen["top"]][:, None] == ~candidates.real[None, :]
+            step_score = np.where(valid, step_score, -np.inf)
+        if slot == "outerwear" and season and SEASON_WARMTH[season] >= NO_LAYER_MIN_WARMTH:
+            step_score = step_score - NO_LAYER_PENALTY * ~candidates.real[None, :]
+        step_score = np.where(np.isfinite(score)[:, None], step_score, -np.inf)
+
+        width = k if slot == SLOTS[-1] else beam_width
+        best = _top_indices(step_score, width)
+        rows, columns = np.unravel_index(best, step_score.shape)
+
+        chosen = {previous: indices[rows] for previous, indices in chosen.items()}
+        chosen[slot] = columns
+        pair_sum = new_pair_sum[rows, columns]
+        pair_count = new_pair_count[rows, columns]
+        unary_sum = new_unary_sum[rows, columns]
+        unary_count = new_unary_count[rows, columns]
+        score = step_score[rows, columns]
+
+    outfits = []
+    for i in range(len(score)):
+        picks = {}
+        for slot in SLOTS:
+            index = int(chosen[slot][i])
+            picks[slot] = index if slots[slot].real[index] else -1
+        outfits.append((float(score[i]), picks))
+    return outfits
+
+
+def best_accessories(slots: Dict[str, SlotArrays], accessories: SlotArrays,
+                     outfits: List[Tuple[float, Dict[str, int]]]) -> List[int]:
+    """Index of the accessory that goes best with each outfit (-1 if there are none)"""
+    if not accessories.real.any() or not outfits:
+        return [-1] * len(outfits)
+
+    total = np.zeros((len(outfits), len(accessories)), dtype=np.float32)
+    count = np.zeros((len(outfits), len(accessories)), dtype=np.float32)
+    for slot in SLOTS:
+        scores, real = pair_scores(slots[slot], accessories)
+        indices = np.array([picks[slot] for _, picks in outfits])
+        indices = np.where(indices < 0, len(slots[slot]) - 1, indices)
+        total += scores[indices]
+        count += real[indices]
+
+    mean = np.where(accessories.real[None, :], total / np.maximum(count, 1), -np.inf)
+    return [int(index) for index in mean.argmax(axis=1)]
+
+
+def build_slots(clothes: List[Dict[str, Any]]) -> Dict[str, SlotArrays]:
+    """Group clothing rows into per-slot candidate arrays"""
+    by_slot: Dict[str, List[Dict[str, Any]]] = {slot: [] for slot in SLOTS}
+    for item in clothes:
+        display_category = item.get("display_category") or resolve_display_category(item.get("category"))
+        slot = SLOT_BY_DISPLAY_CATEGORY.get(display_category)
+        if slot:
+            by_slot[slot].append({**item, "_display_category": display_category})
+
+    return {
+        "top": SlotArrays(by_slot["top"], allow_none=False),
+        "bottom": SlotArrays(by_slot["bottom"], allow_none=True),
+        # Footwear is only left out when the wardrobe has none
+        "footwear": SlotArrays(by_slot["footwear"], allow_none=not by_slot["footwear"]),
+        "outerwear": SlotArrays(by_slot["outerwear"], allow_none=True)
+    }
+
+
+def _suggestion_item(item: Dict[str, Any], slot: str, item_type: str) -> Dict[str, Any]:
+    item = {key: value for key, value in item.items() if key != "_display_category"}
+    item["item_type"] = item_type
+    item["slot"] = slot
+    return item
+
+
+async def suggest_outfits(user_id: str, k: int = 10, season: Optional[str] = None,
+                          occasion: Optional[str] = None, include_wishlist: bool = False) -> List[Dict[str, Any]]:
+    """
+    Suggest the top-k outfits from a user's wardrobe.
+
+    Args:
+        user_id: Wardrobe owner
+        k: Number of outfits to return (capped at MAX_SUGGESTIONS)
+        season: One of SEASON_WARMTH to prefer season-appropriate items
+        occasion: One of OCCASION_FORMALITY to prefer items of that formality
+        include_wishlist: Also use items the user doesn't own yet
+
+    Returns:
+        [{"score", "items": [item rows with "slot" and "item_type"]}], best first
+    """
+    if season is not None and season not in SEASON_WARMTH:
+        raise ValueError(f"Invalid season: {season}. Must be one of {list(SEASON_WARMTH)}")
+    if occasion is not None and occasion not in OCCASION_FORMALITY:
+        raise ValueError(f"Invalid occasion: {occasion}. Must be one of {list(OCCASION_FORMALITY)}")
+    k = max(1, min(k, MAX_SUGGESTIONS))
+
+    owned_only = None if include_wishlist else True
+    clothes, accessory_rows = await asyncio.gather(
+        get_user_clothes(user_id, owned_only=owned_only),
+        get_user_accessories(user_id, owned_only=owned_only)
+    )
+
+    slots = build_slots(clothes)
+    if not slots["top"].real.any():
+        return []
+
+    accessories = SlotArrays(accessory_rows, allow_none=False)
+    outfits = score_outfits(slots, k, season, occasion)
+    accessory_picks = best_accessories(slots, accessories, outfits)
+
+    suggestions = []
+    for (score, picks), accessory in zip(outfits, accessory_picks):
+        items = [
+            _suggestion_item(slots[slot].items[index], slot, "clothing")
+            for slot, index in picks.items() if index >= 0
+        ]
+        if accessory >= 0:
+            items.append(_suggestion_item(accessories.items[accessory], "accessory", "accessory"))
+        suggestions.append({"score": round(score, 4), "items": items})
+
+    return suggestions
@@ -0,0 +1,138 @@
+"""
+Gemini context caching for large static prompts.
+
+A static prompt (such as the clothing identification instructions, which
+list every clothing type and allowed attribute value) is registered once
+as Gemini cached content; calls then reference it by name and only send
+their image plus a short instruction. The cache's TTL is extended shortly
+before it expires. Cached content that is replaced is deleted rather than
+left to run out its TTL.
+
+When caching is unavailable (disabled, model not supported, prompt under
+the model's minimum cacheable size, API errors) get() returns None and
+callers send the full prompt; creation is retried after
+PROMPT_CACHE_RETRY_SECONDS.
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Optional
+
+from .gemini_client import get_gemini_client
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_RETRY_SECONDS = int(os.getenv("PROMPT_CACHE_RETRY_SECONDS", "600"))
+# Extend the TTL once less than this much of it is left
+REFRESH_MARGIN_SECONDS = 300
+
+
+class PromptCache:
+    """
+    A static prompt registered as Gemini cached content for one model.
+
+    Example:
+        >>> cache = PromptCache(analysis_model, "identify", build_prompt)
+        >>> name = cache.get()  # None -> send build_prompt() inline
+        >>> config = types.GenerateContentConfig(cached_content=name)
+    """
+
+    def __init__(self, model: str, display_name: str, build_prompt: Callable[[], str],
+                 ttl_seconds: int = PROMPT_CACHE_TTL_SECONDS):
+        self.model = model
+        self.display_name = display_name
+        self.build_prompt = build_prompt
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.name: Optional[str] = None
+        self.expires_at = 0.0
+        self.retry_at = 0.0
+
+    def get(self) -> Optional[str]:
+        """Name of the cached content, creating or refreshing it as needed (None to fall back)"""
+        if not PROMPT_CACHE_ENABLED:
+            return None
+
+        with self.lock:
+            now = time.time()
+            if self.name and now < self.expires_at - REFRESH_MARGIN_SECONDS:
+                return self.name
+            if now < self.retry_at:
+                return None
+
+            if self.name and now < self.expires_at:
+                try:
+                    self._extend(now)
+                    return self.name
+                except Exception as e:
+                    logger.warning("Could not extend Gemini cached content %s, recreating it: %s", self.name, e)
+
+            try:
+                self._create(now)
+                return self.name
+            except Exception as e:
+                logger.warning("Gemini context cache unavailable for %s, sending the full prompt: %s", self.display_name, e)
+                self.name = None
+                self.retry_at = now + PROMPT_CACHE_RETRY_SECONDS
+                return None
+
+    def invalidate(self) -> None:
+        """Replace the cached content on the next get() (e.g. after a call couldn't find it)"""
+        with self.lock:
+            self.expires_at = 0.0
+
+    def _create(self, now: float) -> None:
+        from google.genai import types
+
+        if self.name:
+            self._delete(self.name)
+            self.name = None
+
+        with metrics.gemini_call(self.model, "cache_create"):
+            cached = get_gemini_client().caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    display_name=self.display_name,
+                    contents=[types.Content(role="user", parts=[types.Part(text=self.build_prompt())])],
+                    ttl=f"{self.ttl_seconds}s"
+                )
+            )
+        self.name = cached.name
+        self.expires_at = now + self.ttl_seconds
+        logger.info("Created Gemini cached content %s for %s", self.name, self.display_name)
+
+    def _extend(self, now: float) -> None:
+        from google.genai import types
+
+        with metrics.gemini_call(self.model, "cache_refresh"):
+            get_gemini_client().caches.update(
+                name=self.name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s")
+            )
+        self.expires_at = now + self.ttl_seconds
+
+    def _delete(self, name: str) -> None:
+        try:
+            with metrics.gemini_call(self.model, "cache_delete"):
+                get_gemini_client().caches.delete(name=name)
+            logger.info("Deleted Gemini cached content %s", name)
+        except Exception as e:
+            # Usually it has already expired or been deleted
+            logger.info("Could not delete Gemini cached content %s: %s", name, e)
+
+
+def is_missing_cache_error(error: Exception) -> bool:
+    """Whether a Gemini call failed because the cached content it referenced has expired or no longer exists"""
+    from google.genai import errors
+
+    if not isinstance(error, errors.APIError):
+        return False
+    if error.code == 404 or error.status == "NOT_FOUND":
+        return True
+    message = (error.message or "").lower()
+    return "cache" in message and ("expired" in message or "not found" in message)
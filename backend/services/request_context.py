@@ -0,0 +1,18 @@
+"""
+Per-request context shared by instrumentation.
+
+Values are stored in context variables so they follow a request through
+awaits and into tasks spawned from it (e.g. asyncio.gather fan-outs).
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+# Route template of the request being served (e.g. "/api/v1/clothing/{clothing_id}")
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="background")
+
+# Correlation ID for the request (taken from X-Request-ID or generated)
+current_request_id: ContextVar[str] = ContextVar("current_request_id", default="-")
+
+# Authenticated user ID, set by routers.auth.verify_token (None for anonymous requests)
+current_user_id: ContextVar[Optional[str]] = ContextVar("current_user_id", default=None)
@@ -0,0 +1,67 @@
+from typing import List, Dict, Any, Optional
+from .authService import get_supabase_client
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_KINDS = ['outfit', 'clothing', 'accessory']
+MAX_PAGE_SIZE = 100
+
+async def search_wardrobe(user_id: str, query: str, kinds: Optional[List[str]] = None,
+                          limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """
+    Ranked search over a user's outfits, clothes and accessories.
+
+    Runs the search_wardrobe SQL function, which combines full-text and
+    trigram matching on indexed name/category/color/feature/description documents.
+
+    Args:
+        user_id: Profile to search within
+        query: Free-text search terms (supports websearch syntax like "red -shirt")
+        kinds: Subset of SEARCH_KINDS to search (default all)
+        limit: Page size (capped at MAX_PAGE_SIZE)
+        offset: Number of results to skip
+
+    Returns:
+        {"results": [{"kind", "id", "name", "rank", "item"}], "total", "limit", "offset"}
+    """
+    try:
+        kinds = kinds or SEARCH_KINDS
+        invalid = [kind for kind in kinds if kind not in SEARCH_KINDS]
+        if invalid:
+            raise ValueError(f"Invalid search types: {invalid}. Must be any of {SEARCH_KINDS}")
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+
+        supabase = get_supabase_client()
+        with metrics.supabase_call("search.rpc"):
+            result = supabase.rpc('search_wardrobe', {
+                'p_profile_id': user_id,
+                'p_query': query,
+                'p_kinds': kinds,
+                'p_limit': limit,
+                'p_offset': offset
+            }).execute()
+
+        rows = result.data or []
+        return {
+            "results": [
+                {
+                    "kind": row["kind"],
+                    "id": row["id"],
+                    "name": row["name"],
+                    "rank": row["rank"],
+                    "item": row["item"]
+                }
+                for row in rows
+            ],
+            "total": rows[0]["total_count"] if rows else 0,
+            "limit": limit,
+            "offset": offset
+        }
+
+    except Exception as e:
+        logger.error("Error searching wardrobe: %s", e)
+        raise e
@@ -0,0 +1,469 @@
+"""
+Visual similarity search over wardrobe item images.
+
+Each item image gets a compact CPU-only descriptor when it is saved: a
+hue/saturation/value histogram of the garment pixels plus a histogram of
+oriented gradients (HOG) over the garment's bounding box, L2-normalized so
+a dot product is the cosine similarity. Descriptors are stored as float16
+rows in a memory-mapped file per user (SIMILARITY_INDEX_DIR/<user>.vectors,
+with item keys in <user>.json) and searched with batched dot products.
+
+Saving an item that is nearly identical to one already indexed reports it
+as a possible duplicate. The database is the source of truth: a similarity
+query first indexes the stored images of items the index hasn't seen (items
+that predate it, or were saved by another instance with its own index
+directory) and drops items deleted elsewhere, at most once every
+SIMILARITY_SYNC_SECONDS per user. Workers sharing an index directory
+coordinate through a lock file per user; index reads and writes run in
+worker threads so a held lock doesn't stall the event loop.
+"""
+
+import io
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .authService import get_supabase_client
+from .clients import get_http_client
+from .color_service import foreground_mask
+from . import metrics
+from .logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock shared between processes, so run a single worker
+    fcntl = None
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = get_logger(__name__)
+
+SIMILARITY_INDEX_DIR = os.getenv("SIMILARITY_INDEX_DIR", "similarity_index")
+# Cosine similarity at or above which a new item is reported as a possible duplicate
+DUPLICATE_THRESHOLD = float(os.getenv("SIMILARITY_DUPLICATE_THRESHOLD", "0.97"))
+# How long a user's index is trusted before the next query re-checks it against the database
+SIMILARITY_SYNC_SECONDS = float(os.getenv("SIMILARITY_SYNC_SECONDS", "60"))
+# Open per-user indexes kept in memory, least recently used dropped first
+SIMILARITY_OPEN_INDEXES = int(os.getenv("SIMILARITY_OPEN_INDEXES", "256"))
+MAX_SIMILAR_RESULTS = 50
+
+DESCRIPTOR_SIZE = 64  # Side of the square the garment is resized to
+HUE_BINS, SATURATION_BINS, VALUE_BINS = 8, 3, 3
+HOG_CELLS, HOG_ORIENTATIONS = 4, 9
+COLOR_WEIGHT = 0.6  # Share of the descriptor's norm given to color vs. shape
+DESCRIPTOR_DIM = HUE_BINS * SATURATION_BINS * VALUE_BINS + HOG_CELLS * HOG_CELLS * HOG_ORIENTATIONS
+
+SEARCH_BATCH_ROWS = 4096
+INITIAL_CAPACITY = 256
+REINDEX_CONCURRENCY = 8
+
+ITEM_TABLES = {"clothing": "clothes", "accessory": "accessories"}
+
+_indexes: "OrderedDict[str, DescriptorIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _color_histogram(rgb: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    hsv = np.asarray(Image.fromarray(rgb).convert("HSV"), dtype=np.int64)[mask]
+    hue = hsv[:, 0] * HUE_BINS // 256
+    saturation = hsv[:, 1] * SATURATION_BINS // 256
+    value = hsv[:, 2] * VALUE_BINS // 256
+    bins = (hue * SATURATION_BINS + saturation) * VALUE_BINS + value
+    histogram = np.bincount(bins, minlength=HUE_BINS * SATURATION_BINS * VALUE_BINS).astype(np.float32)
+    # Square root so a few large color areas don't drown out accents
+    return np.sqrt(histogram / max(len(bins), 1))
+
+
+def _hog(gray: np.ndarray) -> np.ndarray:
+    gy, gx = np.gradient(gray)
+    magnitude = np.hypot(gx, gy)
+    orientation = np.rad2deg(np.arctan2(gy, gx)) % 180
+    bins = np.minimum((orientation / (180 / HOG_ORIENTATIONS)).astype(np.int64), HOG_ORIENTATIONS - 1)
+
+    cell = gray.shape[0] // HOG_CELLS
+    cell_index = (np.arange(gray.shape[0]) // cell).clip(max=HOG_CELLS - 1)
+    flat_index = (cell_index[:, None] * HOG_CELLS + cell_index[None, :]) * HOG_ORIENTATIONS + bins
+    histogram = np.bincount(flat_index.ravel(), weights=magnitude.ravel(),
+                            minlength=HOG_CELLS * HOG_CELLS * HOG_ORIENTATIONS)
+    return histogram.astype(np.float32)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+@metrics.stage("image_descriptor")
+def compute_descriptor(image: Image.Image) -> np.ndarray:
+    """Unit-length float32 descriptor (color histogram + HOG) of a garment image"""
+    thumbnail = image.copy()
+    thumbnail.thumbnail((DESCRIPTOR_SIZE * 2, DESCRIPTOR_SIZE * 2))
+    rgba = np.asarray(thumbnail.convert("RGBA"))
+    mask = foreground_mask(rgba)
+
+    # Crop to the garment so position and padding don't matter
+    rows, columns = np.nonzero(mask)
+    if len(rows):
+        rgba = rgba[rows.min():rows.max() + 1, columns.min():columns.max() + 1]
+        mask = mask[rows.min():rows.max() + 1, columns.min():columns.max() + 1]
+
+    rgb = np.ascontiguousarray(rgba[..., :3])
+    color = _unit(_color_histogram(rgb, mask))
+
+    garment = Image.fromarray(rgb).convert("L").resize((DESCRIPTOR_SIZE, DESCRIPTOR_SIZE))
+    shape = _unit(_hog(np.asarray(garment, dtype=np.float32) / 255.0))
+
+    return _unit(np.concatenate([np.sqrt(COLOR_WEIGHT) * color, np.sqrt(1 - COLOR_WEIGHT) * shape]))
+
+
+def _safe_name(user_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", user_id)
+
+
+class DescriptorIndex:
+    """
+    Per-user float16 descriptor rows in a memory-mapped file.
+
+    Rows are appended (the file doubles in size when full); removed items
+    leave a tombstone that is reused by compaction once they outnumber the
+    live rows. Keys are (item_type, item_id). Every read or write holds a
+    lock file shared with other processes using the same directory and
+    picks up their changes first.
+    """
+
+    def __init__(self, directory: str, user_id: str, dim: int = DESCRIPTOR_DIM):
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, f"{_safe_name(user_id)}.vectors")
+        self.meta_path = os.path.join(directory, f"{_safe_name(user_id)}.json")
+        self.lock_path = os.path.join(directory, f"{_safe_name(user_id)}.lock")
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.keys: List[Optional[Tuple[str, str]]] = []
+        self.rows: Dict[Tuple[str, str], int] = {}
+        # Items whose image couldn't be indexed, with that image URL, so syncs don't retry them
+        self.unindexable: Dict[Tuple[str, str], str] = {}
+        self.vectors: Optional[np.memmap] = None
+        self._meta_stamp: Optional[Tuple[int, int, int]] = None
+        # time.monotonic() of the last sync_user_index, None if never synced in this process
+        self.synced_at: Optional[float] = None
+        with self._locked(exclusive=False):  # Loads what is already on disk
+            pass
+
+    def __len__(self):
+        return len(self.rows)
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the index against other threads and processes, reloading it if another process changed it"""
+        with self.lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # Writers always reload; the stat stamp can miss a same-size rewrite within the mtime granularity
+            self._reload(force=exclusive)
+            yield
+
+    def _reload(self, force: bool) -> None:
+        try:
+            stat = os.stat(self.meta_path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if not force and stamp == self._meta_stamp and self.vectors is not None:
+            return
+
+        self.keys, self.unindexable = [], {}
+        if stamp is not None:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.keys = [tuple(key) if key else None for key in meta["keys"]]
+            self.unindexable = {(item_type, item_id): url for item_type, item_id, url in meta.get("unindexable", [])}
+        self.rows = {key: row for row, key in enumerate(self.keys) if key is not None}
+        self._meta_stamp = stamp
+        # Another process may have grown the file
+        self._open(max(len(self.keys), INITIAL_CAPACITY))
+
+    def _open(self, capacity: int) -> None:
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        size = capacity * self.dim * 2
+        mode = "r+b" if os.path.exists(self.vectors_path) else "w+b"
+        with open(self.vectors_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+            capacity = max(capacity, f.tell() // (self.dim * 2))
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+
+    def _save_meta(self) -> None:
+        self.vectors.flush()
+        temp_path = self.meta_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "keys": [list(key) if key else None for key in self.keys],
+                "unindexable": [[*key, url] for key, url in self.unindexable.items()]
+            }, f)
+        os.replace(temp_path, self.meta_path)
+        stat = os.stat(self.meta_path)
+        self._meta_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def contents(self) -> Tuple[Set[Tuple[str, str]], Dict[Tuple[str, str], str]]:
+        """The indexed keys and the unindexable keys (with their image URL)"""
+        with self._locked(exclusive=False):
+            return set(self.rows), dict(self.unindexable)
+
+    def get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._locked(exclusive=False):
+            row = self.rows.get(key)
+            return np.asarray(self.vectors[row], dtype=np.float32) if row is not None else None
+
+    def add(self, entries: List[Tuple[Tuple[str, str], np.ndarray]],
+            unindexable: Optional[Dict[Tuple[str, str], str]] = None) -> None:
+        """Insert or replace descriptors, optionally recording items whose image couldn't be indexed"""
+        with self._locked(exclusive=True):
+            self.unindexable.update(unindexable or {})
+            for key, vector in entries:
+                self.unindexable.pop(key, None)
+                row = self.rows.get(key)
+                if row is None:
+                    row = len(self.keys)
+                    if row >= len(self.vectors):
+                        self._open(row * 2)
+                    self.keys.append(key)
+                    self.rows[key] = row
+                self.vectors[row] = vector.astype(np.float16)
+            self._save_meta()
+
+    def remove(self, *keys: Tuple[str, str]) -> None:
+        with self._locked(exclusive=True):
+            for key in keys:
+                self.unindexable.pop(key, None)
+                row = self.rows.pop(key, None)
+                if row is None:
+                    continue
+                self.keys[row] = None
+                self.vectors[row] = 0
+            if len(self.keys) - len(self.rows) > len(self.rows):
+                self._compact()
+            self._save_meta()
+
+    def _compact(self) -> None:
+        live = [row for row, key in enumerate(self.keys) if key is not None]
+        self.vectors[:len(live)] = self.vectors[live]
+        self.vectors[len(live):len(self.keys)] = 0
+        self.keys = [self.keys[row] for row in live]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+
+    def search(self, query: np.ndarray, k: int = 10,
+               exclude: Optional[Tuple[str, str]] = None) -> List[Tuple[Tuple[str, str], float]]:
+        """Top-k (key, cosine similarity), most similar first, scanning rows in batches"""
+        with self._locked(exclusive=False):
+            return self._search(query.astype(np.float32), k, exclude)
+
+    def _search(self, query: np.ndarray, k: int,
+                exclude: Optional[Tuple[str, str]]) -> List[Tuple[Tuple[str, str], float]]:
+        count = len(self.keys)
+        # Tombstones are zero vectors (score 0), so they're dropped explicitly
+        dead = np.array([row for row, key in enumerate(self.keys) if key is None], dtype=np.int64)
+        if exclude in self.rows:
+            dead = np.append(dead, self.rows[exclude])
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, count, SEARCH_BATCH_ROWS):
+            block = np.asarray(self.vectors[start:min(start + SEARCH_BATCH_ROWS, count)], dtype=np.float32)
+            scores = block @ query
+            in_block = dead[(dead >= start) & (dead < start + len(block))]
+            scores[in_block - start] = -np.inf
+
+            candidates = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+            best_rows = np.concatenate([best_rows, candidates + start])
+            best_scores = np.concatenate([best_scores, scores[candidates]])
+            keep = np.argsort(-best_scores, kind="stable")[:k]
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        return [
+            (self.keys[row], float(score))
+            for row, score in zip(best_rows, best_scores) if np.isfinite(score)
+        ]
+
+
+def get_index(user_id: str) -> DescriptorIndex:
+    """A user's descriptor index, kept open for the SIMILARITY_OPEN_INDEXES most recent users"""
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+        if index is None:
+            index = _indexes[user_id] = DescriptorIndex(SIMILARITY_INDEX_DIR, user_id)
+        _indexes.move_to_end(user_id)
+        # Evicted indexes close their memmap once the last caller using them is done
+        while len(_indexes) > max(SIMILARITY_OPEN_INDEXES, 1):
+            _indexes.popitem(last=False)
+        return index
+
+
+async def index_saved_items(user_id: str, item_type: str, results: List[Dict[str, Any]],
+                            images: List[Optional[Image.Image]]) -> None:
+    """
+    Index the images of newly saved items.
+
+    results are insert results ({"success", "data"}) aligned with images.
+    Items that look like one already in the wardrobe get a
+    "possible_duplicate" entry ({"item_type", "id", "similarity"}) in their data.
+    """
+    try:
+        index = await asyncio.to_thread(get_index, user_id)
+        entries = []
+        for result, image in zip(results, images):
+            if image is None or not result.get("success"):
+                continue
+            descriptor = await asyncio.to_thread(compute_descriptor, image)
+            matches = await asyncio.to_thread(index.search, descriptor, 1)
+            if matches and matches[0][1] >= DUPLICATE_THRESHOLD:
+                (match_type, match_id), similarity = matches[0]
+                result["data"]["possible_duplicate"] = {
+                    "item_type": match_type, "id": match_id, "similarity": round(similarity, 4)
+                }
+            entries.append(((item_type, result["data"]["id"]), descriptor))
+        if entries:
+            await asyncio.to_thread(index.add, entries)
+    except Exception as e:
+        logger.warning("Error indexing item images for similarity search: %s", e)
+
+
+async def remove_item(user_id: str, item_type: str, item_id: str) -> None:
+    """Drop a deleted item from the user's index"""
+    try:
+        index = await asyncio.to_thread(get_index, user_id)
+        await asyncio.to_thread(index.remove, (item_type, item_id))
+    except Exception as e:
+        logger.warning("Error removing item from similarity index: %s", e)
+
+
+async def _download_descriptor(client: "httpx.AsyncClient", semaphore: asyncio.Semaphore,
+                               image_url: str) -> Optional[np.ndarray]:
+    async with semaphore:
+        try:
+            response = await client.get(image_url)
+            response.raise_for_status()
+            return await asyncio.to_thread(compute_descriptor, Image.open(io.BytesIO(response.content)))
+        except Exception as e:
+            logger.warning("Could not index image %s: %s", image_url, e)
+            return None
+
+
+def _load_item_rows(user_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+    supabase = get_supabase_client()
+    rows = []
+    for item_type, table in ITEM_TABLES.items():
+        with metrics.supabase_call(f"{table}.select"):
+            result = supabase.table(table).select("id,image_url").eq("profile_id", user_id).execute()
+        rows.extend((item_type, row) for row in result.data or [])
+    return rows
+
+
+async def sync_user_index(user_id: str, max_age: float = SIMILARITY_SYNC_SECONDS) -> DescriptorIndex:
+    """
+    Bring a user's index in line with their stored items.
+
+    Indexes the images of stored items the index hasn't seen and drops
+    indexed items that no longer exist, so items saved or deleted through
+    another instance are picked up. Does nothing if this process synced the
+    index less than max_age seconds ago.
+    """
+    index = await asyncio.to_thread(get_index, user_id)
+    if index.synced_at is not None and time.monotonic() - index.synced_at < max_age:
+        return index
+    synced_at = time.monotonic()
+
+    # Read the index before the items, so an item saved in between isn't taken for a deleted one
+    indexed, unindexable = await asyncio.to_thread(index.contents)
+    stored = await asyncio.to_thread(_load_item_rows, user_id)
+    stored_keys = {(item_type, row["id"]) for item_type, row in stored}
+
+    missing = [
+        (item_type, row) for item_type, row in stored
+        if (item_type, row["id"]) not in indexed
+        and (row.get("image_url") or "").startswith("http")
+        and unindexable.get((item_type, row["id"])) != row["image_url"]
+    ]
+    if missing:
+        semaphore = asyncio.Semaphore(REINDEX_CONCURRENCY)
+        client = get_http_client()
+        descriptors = await asyncio.gather(*(
+            _download_descriptor(client, semaphore, row["image_url"]) for _, row in missing
+        ))
+        await asyncio.to_thread(
+            index.add,
+            [((item_type, row["id"]), descriptor)
+             for (item_type, row), descriptor in zip(missing, descriptors) if descriptor is not None],
+            unindexable={(item_type, row["id"]): row["image_url"]
+                         for (item_type, row), descriptor in zip(missing, descriptors) if descriptor is None}
+        )
+        logger.info("Indexed %s item images for user %s", len(missing), user_id)
+
+    deleted = [key for key in indexed | set(unindexable) if key not in stored_keys]
+    if deleted:
+        await asyncio.to_thread(index.remove, *deleted)
+    index.synced_at = synced_at
+    return index
+
+
+async def find_similar_items(user_id: str, item_type: str, item_id: str, k: int = 10,
+                             item_types: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Items that look most like the given item, most similar first.
+
+    Returns None when the item has no indexed image. Each result is the
+    item row with its item_type and similarity (cosine, -1 to 1).
+    """
+    index = await asyncio.to_thread(get_index, user_id)
+    last_synced_at = index.synced_at
+    index = await sync_user_index(user_id)
+
+    descriptor = await asyncio.to_thread(index.get, (item_type, item_id))
+    if descriptor is None and index.synced_at == last_synced_at:
+        # The item may have been saved through another instance since the last sync
+        index = await sync_user_index(user_id, max_age=0)
+        descriptor = await asyncio.to_thread(index.get, (item_type, item_id))
+    if descriptor is None:
+        return None
+
+    k = max(1, min(k, MAX_SIMILAR_RESULTS))
+    # Over-fetch when filtering by type so filtered results still fill k
+    matches = await asyncio.to_thread(index.search, descriptor, k if not item_types else k * 4,
+                                      (item_type, item_id))
+    matches = [(key, score) for key, score in matches if not item_types or key[0] in item_types][:k]
+    if not matches:
+        return []
+
+    try:
+        supabase = get_supabase_client()
+        details = {}
+        for match_type, table in ITEM_TABLES.items():
+            ids = [match_id for (key_type, match_id), _ in matches if key_type == match_type]
+            if ids:
+                with metrics.supabase_call(f"{table}.select"):
+                    result = supabase.table(table).select("*").in_("id", ids).eq("profile_id", user_id).execute()
+                for row in result.data or []:
+                    details[match_type, row["id"]] = row
+
+        return [
+            {**details[key], "item_type": key[0], "similarity": round(score, 4)}
+            for key, score in matches if key in details
+        ]
+
+    except Exception as e:
+        logger.error("Error getting similar items: %s", e)
+        raise e
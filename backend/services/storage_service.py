@@ -0,0 +1,56 @@
+"""
+Supabase storage uploads for item images.
+"""
+
+import time
+import base64
+
+from .authService import get_supabase_client
+from . import metrics
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+STORAGE_BUCKET = "clothing-items"
+
+@metrics.stage("upload")
+async def upload_image_bytes_to_supabase(image_bytes: bytes, filename: str, unique: bool = True) -> str:
+    """
+    Upload PNG bytes to Supabase storage and return public URL.
+
+    With unique=False the file is stored under filename as is, replacing
+    any earlier upload with that name.
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        # Create unique filename
+        unique_filename = f'{int(time.time())}-{filename}' if unique else filename
+        logger.info("Uploading image: %s, size: %s bytes", unique_filename, len(image_bytes))
+        metrics.observe_payload("storage_upload", len(image_bytes))
+        
+        # Upload to Supabase storage
+        with metrics.supabase_call("storage.upload"):
+            result = supabase.storage.from_(STORAGE_BUCKET).upload(
+                unique_filename,
+                image_bytes,
+                file_options={'content-type': 'image/png', 'upsert': 'false' if unique else 'true'}
+            )
+        
+        logger.debug("Upload result: %s", result)
+        
+        if result and hasattr(result, 'path'):
+            # Get public URL using the path from the upload response
+            public_url = supabase.storage.from_(STORAGE_BUCKET).get_public_url(result.path)
+            logger.debug("Generated public URL: %s", public_url)
+            return public_url
+        else:
+            raise Exception(f"Upload failed: {result}")
+            
+    except Exception as e:
+        logger.exception("Error uploading image to Supabase: %s", e)
+        raise e
+
+async def upload_image_to_supabase(image_base64: str, filename: str) -> str:
+    """Upload base64 image to Supabase storage and return public URL"""
+    return await upload_image_bytes_to_supabase(base64.b64decode(image_base64), filename)
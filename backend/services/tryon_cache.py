@@ -0,0 +1,196 @@
+"""
+Disk-backed LRU cache of intermediate virtual try-on results.
+
+Iterative try-on applies garments to the person image a batch at a time, so
+the result after each batch depends only on the person image and the
+ordered garments applied so far. Each intermediate image is stored under a
+key built from the person image hash plus that ordered prefix of garment
+hashes, and a new request resumes from the longest prefix already cached
+(adding a jacket to a look that was tried before costs one edit, not N).
+
+Entries are a PNG plus a small JSON sidecar (garment descriptions) in
+TRYON_CACHE_DIR. Least recently used entries are evicted once the cache
+exceeds TRYON_CACHE_MAX_BYTES. The same store keeps wardrobe item images
+(ITEM_IMAGE_CACHE_DIR) for try-on from stored items.
+
+The cache does blocking disk I/O and PNG encoding, so async callers run its
+methods in a worker thread (asyncio.to_thread).
+"""
+
+import os
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+TRYON_CACHE_DIR = os.getenv("TRYON_CACHE_DIR", "tryon_cache")
+TRYON_CACHE_MAX_BYTES = int(os.getenv("TRYON_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Wardrobe item images for try-on, downloaded from their image_url once
+ITEM_IMAGE_CACHE_DIR = os.getenv("ITEM_IMAGE_CACHE_DIR", "item_image_cache")
+ITEM_IMAGE_CACHE_MAX_BYTES = int(os.getenv("ITEM_IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Bump when the try-on prompt changes so old results aren't reused
+PROMPT_VERSION = "1"
+
+
+def image_hash(image: Image.Image) -> str:
+    """Content hash of a decoded image (pixels, mode and size)"""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def prefix_key(model: str, person_hash: str, garment_hashes: List[str]) -> str:
+    """Cache key for the person wearing the given garments, applied in order"""
+    material = "|".join([PROMPT_VERSION, model, person_hash, *garment_hashes])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class TryOnCache:
+    """
+    LRU store of try-on images on disk.
+
+    Recency is tracked in memory (seeded from file modification times on
+    start-up) and refreshed on the files themselves on every hit, so the
+    order survives restarts.
+    """
+
+    def __init__(self, directory: str = TRYON_CACHE_DIR, max_bytes: int = TRYON_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # key -> total bytes on disk, least recently used first
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith(".png"):
+                key = name[:-4]
+                try:
+                    found.append((os.path.getmtime(self._image_path(key)), key, self._entry_size(key)))
+                except OSError:
+                    continue
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _image_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entry_size(self, key: str) -> int:
+        size = os.path.getsize(self._image_path(key))
+        if os.path.exists(self._meta_path(key)):
+            size += os.path.getsize(self._meta_path(key))
+        return size
+
+    def get(self, key: str) -> Optional[Tuple[Image.Image, Dict[str, Any]]]:
+        """The cached image and metadata for a key, marking it recently used"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            try:
+                with open(self._image_path(key), "rb") as f:
+                    data = f.read()
+                meta = {}
+                if os.path.exists(self._meta_path(key)):
+                    with open(self._meta_path(key)) as f:
+                        meta = json.load(f)
+                os.utime(self._image_path(key))
+            except (OSError, ValueError) as e:
+                logger.warning("Dropping unreadable try-on cache entry %s: %s", key, e)
+                self._delete(key)
+                return None
+            self.entries.move_to_end(key)
+
+        # Decode outside the lock so other readers aren't held up
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except (OSError, ValueError) as e:
+            logger.warning("Dropping unreadable try-on cache entry %s: %s", key, e)
+            with self.lock:
+                self._delete(key)
+            return None
+        return image, meta
+
+    def put(self, key: str, image: Image.Image, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Store an image (and JSON-serializable metadata), evicting old entries if over budget"""
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        with self.lock:
+            if key in self.entries:
+                self._delete(key)
+            # Write to temp files and rename so readers never see a partial entry
+            for path, data in ((self._meta_path(key), json.dumps(meta or {}).encode()),
+                               (self._image_path(key), buffer.getvalue())):
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            size = self._entry_size(key)
+            self.entries[key] = size
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                oldest = next(iter(self.entries))
+                self._delete(oldest)
+
+    def _delete(self, key: str) -> None:
+        self.total_bytes -= self.entries.pop(key, 0)
+        for path in (self._image_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def longest_prefix(self, model: str, person_hash: str,
+                       garment_hashes: List[str]) -> Tuple[int, Optional[Image.Image], Dict[str, Any]]:
+        """
+        The longest cached prefix of garment_hashes for this person.
+
+        Returns (number of garments already applied, image, metadata), or
+        (0, None, {}) when nothing is cached.
+        """
+        for length in range(len(garment_hashes), 0, -1):
+            cached = self.get(prefix_key(model, person_hash, garment_hashes[:length]))
+            if cached is not None:
+                return length, cached[0], cached[1]
+        return 0, None, {}
+
+
+_cache: Optional[TryOnCache] = None
+_item_image_cache: Optional[TryOnCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tryon_cache() -> TryOnCache:
+    """The process-wide try-on cache, opened on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TryOnCache()
+        return _cache
+
+
+def get_item_image_cache() -> TryOnCache:
+    """The process-wide wardrobe item image cache, opened on first use"""
+    global _item_image_cache
+    with _cache_lock:
+        if _item_image_cache is None:
+            _item_image_cache = TryOnCache(ITEM_IMAGE_CACHE_DIR, ITEM_IMAGE_CACHE_MAX_BYTES)
+        return _item_image_cache
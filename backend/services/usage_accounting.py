@@ -0,0 +1,345 @@
+"""
+Gemini token and cost accounting.
+
+Every Gemini call made through gemini_client is recorded here with its
+input/output/image token counts (from response.usage_metadata), model,
+latency and context-cache hit status, attributed to the calling user and
+endpoint. Usage is aggregated in memory and a background thread flushes
+the deltas every USAGE_FLUSH_INTERVAL seconds to the `gemini_usage`
+Supabase table (USAGE_STORE=supabase, default) or to a local JSONL file
+(USAGE_STORE=local, path from USAGE_LOG_PATH). Reports add up everything
+in the store plus this process's unflushed deltas.
+
+Batch job results are recorded from the usage metadata in each response
+line, at the Batch API's discounted rate.
+"""
+
+import os
+import json
+import atexit
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+from .logger import get_logger
+from .request_context import current_endpoint, current_user_id
+
+logger = get_logger(__name__)
+
+FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL", "60"))
+USAGE_STORE = os.getenv("USAGE_STORE", "supabase")
+USAGE_LOG_PATH = os.getenv("USAGE_LOG_PATH", "gemini_usage.jsonl")
+
+# USD per 1M tokens. Cached input is billed at a fraction of the input rate.
+MODEL_PRICING = {
+    "gemini-1.5-flash": {"input": 0.075, "output": 0.30, "image_output": 0.30, "cached_input": 0.01875},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50, "image_output": 2.50, "cached_input": 0.075},
+    "gemini-2.5-flash-image-preview": {"input": 0.30, "output": 2.50, "image_output": 30.0, "cached_input": 0.075},
+}
+DEFAULT_PRICING = {"input": 0.30, "output": 2.50, "image_output": 30.0, "cached_input": 0.075}
+# Batch API requests are billed at this fraction of the interactive rate
+BATCH_PRICE_FACTOR = 0.5
+# Rows per page when reading aggregated usage from Supabase
+REPORT_PAGE_ROWS = 1000
+
+_COUNTER_FIELDS = (
+    "calls", "input_tokens", "output_tokens", "image_input_tokens", "image_output_tokens",
+    "cached_tokens", "cache_hits", "latency_ms_total", "cost_usd", "items_ingested"
+)
+
+# (user_id, endpoint, model, operation) -> counters
+UsageKey = Tuple[Optional[str], str, Optional[str], Optional[str]]
+
+_lock = threading.Lock()
+# Held while a flush writes to the store, so reports never see its deltas twice or not at all
+_flush_lock = threading.Lock()
+_pending: Dict[UsageKey, Dict[str, float]] = {}
+_window_start = datetime.now(timezone.utc)
+_flusher: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+
+def _modality_tokens(details, modality: str) -> int:
+    if not details:
+        return 0
+    total = 0
+    for detail in details:
+        detail_modality = getattr(detail, "modality", None)
+        name = getattr(detail_modality, "value", detail_modality)
+        if name == modality:
+            total += getattr(detail, "token_count", 0) or 0
+    return total
+
+
+def _modality_tokens_json(details: Optional[List[Dict[str, Any]]], modality: str) -> int:
+    return sum(detail.get("tokenCount", 0) or 0 for detail in details or [] if detail.get("modality") == modality)
+
+
+def extract_usage(response: Any) -> Dict[str, int]:
+    """Read token counts from a Gemini response's usage_metadata (or a batch result line's usageMetadata)"""
+    if isinstance(response, dict):
+        usage = response.get("usageMetadata") or {}
+        return {
+            "input_tokens": usage.get("promptTokenCount", 0) or 0,
+            "output_tokens": (usage.get("candidatesTokenCount", 0) or 0) + (usage.get("thoughtsTokenCount", 0) or 0),
+            "image_input_tokens": _modality_tokens_json(usage.get("promptTokensDetails"), "IMAGE"),
+            "image_output_tokens": _modality_tokens_json(usage.get("candidatesTokensDetails"), "IMAGE"),
+            "cached_tokens": usage.get("cachedContentTokenCount", 0) or 0,
+        }
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {
+            "input_tokens": 0, "output_tokens": 0, "image_input_tokens": 0,
+            "image_output_tokens": 0, "cached_tokens": 0
+        }
+
+    return {
+        "input_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "output_tokens": (getattr(usage, "candidates_token_count", 0) or 0) + (getattr(usage, "thoughts_token_count", 0) or 0),
+        "image_input_tokens": _modality_tokens(getattr(usage, "prompt_tokens_details", None), "IMAGE"),
+        "image_output_tokens": _modality_tokens(getattr(usage, "candidates_tokens_details", None), "IMAGE"),
+        "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+    }
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> float:
+    """Estimate the USD cost of a call from its token counts"""
+    pricing = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    uncached_input = max(usage["input_tokens"] - usage["cached_tokens"], 0)
+    text_output = max(usage["output_tokens"] - usage["image_output_tokens"], 0)
+    cost = (
+        uncached_input * pricing["input"]
+        + usage["cached_tokens"] * pricing["cached_input"]
+        + text_output * pricing["output"]
+        + usage["image_output_tokens"] * pricing["image_output"]
+    )
+    return cost / 1_000_000
+
+
+def _add(key: UsageKey, deltas: Dict[str, float]) -> None:
+    with _lock:
+        counters = _pending.get(key)
+        if counters is None:
+            counters = _pending[key] = dict.fromkeys(_COUNTER_FIELDS, 0)
+        for field, value in deltas.items():
+            counters[field] += value
+    _ensure_flusher()
+
+
+def record_call(model: str, operation: str, response: Any, latency_seconds: float,
+                batch: bool = False) -> Dict[str, Any]:
+    """
+    Record one Gemini call against the current user and endpoint.
+
+    For batch job results (batch=True) response may be a result line's JSON
+    response, and latency_seconds is how long the job ran.
+    """
+    usage = extract_usage(response)
+    cost = estimate_cost(model, usage) * (BATCH_PRICE_FACTOR if batch else 1)
+    key = (current_user_id.get(), current_endpoint.get(), model, operation)
+
+    _add(key, {
+        "calls": 1,
+        "latency_ms_total": latency_seconds * 1000,
+        "cost_usd": cost,
+        "cache_hits": 1 if usage["cached_tokens"] > 0 else 0,
+        **usage
+    })
+    return {**usage, "cost_usd": cost}
+
+
+def record_items_ingested(count: int) -> None:
+    """Record wardrobe items saved by the current request (for cost per item)"""
+    if count <= 0:
+        return
+    _add((current_user_id.get(), current_endpoint.get(), None, None), {"items_ingested": count})
+
+
+def _rows(snapshot: Dict[UsageKey, Dict[str, float]], window_start: datetime, window_end: datetime) -> List[Dict[str, Any]]:
+    rows = []
+    for (user_id, endpoint, model, operation), counters in snapshot.items():
+        rows.append({
+            "profile_id": user_id,
+            "endpoint": endpoint,
+            "model": model,
+            "operation": operation,
+            **{field: (round(value, 6) if isinstance(value, float) else value) for field, value in counters.items()},
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+        })
+    return rows
+
+
+def flush() -> int:
+    """Write usage accumulated since the last flush to the configured store"""
+    with _flush_lock:
+        return _flush()
+
+
+def _flush() -> int:
+    global _window_start
+
+    with _lock:
+        if not _pending:
+            return 0
+        snapshot = {key: dict(counters) for key, counters in _pending.items()}
+        _pending.clear()
+        window_start, window_end = _window_start, datetime.now(timezone.utc)
+        _window_start = window_end
+
+    rows = _rows(snapshot, window_start, window_end)
+    try:
+        if USAGE_STORE == "local":
+            with open(USAGE_LOG_PATH, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+        else:
+            from .authService import get_supabase_client
+            get_supabase_client().table("gemini_usage").insert(rows).execute()
+        return len(rows)
+    except Exception as e:
+        logger.error("Error flushing Gemini usage: %s", e)
+        # Keep the deltas so the next flush retries them
+        with _lock:
+            for key, counters in snapshot.items():
+                pending = _pending.setdefault(key, dict.fromkeys(_COUNTER_FIELDS, 0))
+                for field, value in counters.items():
+                    pending[field] += value
+        return 0
+
+
+def _flush_loop() -> None:
+    while not _stop_event.wait(FLUSH_INTERVAL_SECONDS):
+        flush()
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="gemini-usage-flusher", daemon=True)
+        _flusher.start()
+    atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Stop the flush thread and write any remaining usage"""
+    _stop_event.set()
+    flush()
+
+
+def _summarize(counters: Dict[str, float]) -> Dict[str, Any]:
+    calls = counters["calls"]
+    return {
+        "calls": int(calls),
+        "input_tokens": int(counters["input_tokens"]),
+        "output_tokens": int(counters["output_tokens"]),
+        "image_input_tokens": int(counters["image_input_tokens"]),
+        "image_output_tokens": int(counters["image_output_tokens"]),
+        "cached_tokens": int(counters["cached_tokens"]),
+        "cache_hit_rate": round(counters["cache_hits"] / calls, 3) if calls else 0,
+        "avg_latency_ms": round(counters["latency_ms_total"] / calls, 1) if calls else 0,
+        "cost_usd": round(counters["cost_usd"], 6),
+        "items_ingested": int(counters["items_ingested"]),
+    }
+
+
+def _stored_totals(user_id: Optional[str]) -> Dict[UsageKey, Dict[str, float]]:
+    """Flushed usage summed per (user, endpoint, model, operation)"""
+    if USAGE_STORE == "local":
+        rows = []
+        if os.path.exists(USAGE_LOG_PATH):
+            with open(USAGE_LOG_PATH) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        from .authService import get_supabase_client
+        supabase = get_supabase_client()
+        rows = []
+        while True:
+            with metrics.supabase_call("gemini_usage.totals"):
+                page = supabase.rpc("gemini_usage_totals", {"p_profile_id": user_id}).range(
+                    len(rows), len(rows) + REPORT_PAGE_ROWS - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < REPORT_PAGE_ROWS:
+                break
+
+    totals: Dict[UsageKey, Dict[str, float]] = {}
+    for row in rows:
+        if user_id is not None and row.get("profile_id") != user_id:
+            continue
+        key = (row.get("profile_id"), row.get("endpoint"), row.get("model"), row.get("operation"))
+        counters = totals.setdefault(key, dict.fromkeys(_COUNTER_FIELDS, 0))
+        for field in _COUNTER_FIELDS:
+            counters[field] += float(row.get(field) or 0)
+    return totals
+
+
+def get_usage_report(limit: int = 10, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Summarize all recorded usage: top users, endpoints and models by cost,
+    and the Gemini cost per wardrobe item ingested.
+
+    Reads the usage store, so call it from a worker thread in async code.
+
+    Args:
+        limit: Number of entries in each top-N list
+        user_id: Restrict the report to one user
+    """
+    with _flush_lock:
+        snapshot = _stored_totals(user_id)
+        with _lock:
+            for key, counters in _pending.items():
+                if user_id is not None and key[0] != user_id:
+                    continue
+                target = snapshot.setdefault(key, dict.fromkeys(_COUNTER_FIELDS, 0))
+                for field, value in counters.items():
+                    target[field] += value
+
+    def group(index: int) -> Dict[Any, Dict[str, float]]:
+        grouped: Dict[Any, Dict[str, float]] = {}
+        for key, counters in snapshot.items():
+            target = grouped.setdefault(key[index], dict.fromkeys(_COUNTER_FIELDS, 0))
+            for field, value in counters.items():
+                target[field] += value
+        return grouped
+
+    def top(grouped: Dict[Any, Dict[str, float]], label: str) -> List[Dict[str, Any]]:
+        ranked = sorted(grouped.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True)
+        return [{label: name, **_summarize(counters)} for name, counters in ranked[:limit]]
+
+    by_endpoint = group(1)
+    by_model = {name: counters for name, counters in group(2).items() if name is not None}
+
+    # Cost per item only counts endpoints that actually ingest wardrobe items
+    ingest_cost = sum(c["cost_usd"] for c in by_endpoint.values() if c["items_ingested"])
+    items_ingested = sum(c["items_ingested"] for c in by_endpoint.values())
+
+    totals = dict.fromkeys(_COUNTER_FIELDS, 0)
+    for counters in snapshot.values():
+        for field, value in counters.items():
+            totals[field] += value
+
+    return {
+        "totals": _summarize(totals),
+        "top_users": top(group(0), "user_id"),
+        "top_endpoints": top(by_endpoint, "endpoint"),
+        "by_model": top(by_model, "model"),
+        "ingestion": {
+            "items_ingested": int(items_ingested),
+            "cost_usd": round(ingest_cost, 6),
+            "cost_per_item_usd": round(ingest_cost / items_ingested, 6) if items_ingested else None,
+            "by_endpoint": [
+                {
+                    "endpoint": endpoint,
+                    "items_ingested": int(counters["items_ingested"]),
+                    "cost_per_item_usd": round(counters["cost_usd"] / counters["items_ingested"], 6)
+                }
+                for endpoint, counters in by_endpoint.items() if counters["items_ingested"]
+            ]
+        }
+    }
@@ -1,22 +1,58 @@
 import io
-from typing import List
+import asyncio
+import hashlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
 from fastapi import UploadFile
 from PIL import Image
 
-from .gemini_client import get_gemini_client, editing_model
+from .gemini_client import editing_model, analysis_model, generate_content, generate_content_async
 from .image_processing import process_uploaded_image, image_to_base64
-from .clothing_service import itemize_photo
+from .tryon_cache import get_tryon_cache, get_item_image_cache, image_hash, prefix_key
+from .authService import get_supabase_client
+from .clients import get_http_client
+from .outfit_service import get_outfit_by_id
+from .similarity_service import ITEM_TABLES
+from . import metrics
+from .logger import get_logger
 import processing.utility.image_utils as image_utils
 
+if TYPE_CHECKING:
+    import httpx
+
+logger = get_logger(__name__)
+
+# Order outfit items are applied in when trying on a whole outfit
+LAYER_ORDER = {"dresses": 0, "tops": 0, "bottoms": 1, "footwear": 2, "outerwear": 3}
+ACCESSORY_LAYER = 5
+
+GARMENT_DESCRIPTION_PROMPT = "Describe the main clothing item in this image in a few words, including its color and type (e.g. \"navy slim-fit jeans\"). Reply with the description only."
+
+async def describe_garment(clothing_image: Image.Image, index: int) -> str:
+    """Short description of a garment image for the try-on prompt (generic fallback if analysis fails)"""
+    try:
+        response = await generate_content_async(
+            analysis_model,
+            [GARMENT_DESCRIPTION_PROMPT, clothing_image],
+            operation="describe_garment"
+        )
+        description = (response.text or "").strip().strip('".').splitlines()
+        if description and description[0]:
+            return description[0]
+    except Exception as e:
+        logger.warning("Could not describe clothing item %s: %s", index + 1, e)
+    return f"clothing item {index + 1}"
+
 async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
     """
     Virtual try-on using Gemini AI - make the person wear the provided clothes iteratively
     
+    Resumes from the longest ordered prefix of the garments already tried on
+    this person (see tryon_cache), so only the remaining garments are edited in.
+    
     Args:
         images: List of images containing person and clothing items
     """
-    client = get_gemini_client()
-    
     # Process uploaded images
     processed_images = []
     for i in range(len(images)):
@@ -31,35 +67,57 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
         raise ValueError("At least 2 images required (person + clothing)")
     
     # Assume first image is the person, rest are clothing items
-    person_image = processed_images[0]
-    clothing_images = processed_images[1:]
+    return await run_tryon_chain(processed_images[0], processed_images[1:])
+
+async def run_tryon_chain(person_image: Image.Image, clothing_images: List[Image.Image],
+                          descriptions: Optional[List[str]] = None) -> dict:
+    """
+    Apply clothing images to the person image in batches of 1-2 Gemini edits
     
-    # Analyze each clothing item to identify what it is
-    clothing_descriptions = []
-    for i, clothing_image in enumerate(clothing_images):
-        try:
-            items = itemize_photo(clothing_image)
-            if items:
-                # Join multiple items with "and" if found
-                description = " and ".join(items)
-            else:
-                description = f"clothing item {i+1}"
-            clothing_descriptions.append(description)
-        except Exception:
-            # Fallback if analysis fails
-            clothing_descriptions.append(f"clothing item {i+1}")
-    
-    # Start with the person image as the base
-    current_result_image = person_image
+    Args:
+        person_image: Processed person image
+        clothing_images: Clothing images, padded to the person image's size, in the order to apply them
+        descriptions: Known description of each clothing item; described with Gemini when omitted
+    """
+    # Find the longest prefix of these garments already applied to this person
+    # (hashing, disk reads and PNG decoding run in a worker thread)
+    cache = await asyncio.to_thread(get_tryon_cache)
+    person_hash, garment_hashes = await asyncio.to_thread(
+        lambda: (image_hash(person_image), [image_hash(clothing_image) for clothing_image in clothing_images])
+    )
+    cached_items, cached_image, cached_meta = await asyncio.to_thread(
+        cache.longest_prefix, editing_model, person_hash, garment_hashes
+    )
+    
+    # Describe every clothing item not covered by the cache concurrently. Each batch
+    # only waits for its own descriptions, so later ones overlap the edit chain
+    if descriptions is not None:
+        clothing_descriptions = list(descriptions)
+        description_tasks = []
+    else:
+        clothing_descriptions = list(cached_meta.get("clothing_descriptions", []))[:cached_items]
+        description_tasks = [
+            asyncio.create_task(describe_garment(clothing_image, i))
+            for i, clothing_image in enumerate(clothing_images[cached_items:], start=cached_items)
+        ]
+    
+    # Start with the cached result (or the person image) as the base
+    current_result_image = cached_image if cached_image is not None else person_image
     iteration_results = []
+    # Results are only cached while every garment so far has actually been applied
+    cacheable = True
     
-    # Process clothing items in batches of 1-2 items
+    # Process remaining clothing items in batches of 1-2 items
     batch_size = 2
-    for i in range(0, len(clothing_images), batch_size):
+    for i in range(cached_items, len(clothing_images), batch_size):
         # Get current batch of clothing items (1-2 items)
         current_batch = clothing_images[i:i + batch_size]
-        current_descriptions = clothing_descriptions[i:i + batch_size]
         batch_items = len(current_batch)
+        if description_tasks:
+            clothing_descriptions.extend(await asyncio.gather(
+                *description_tasks[i - cached_items:i - cached_items + batch_items]
+            ))
+        current_descriptions = clothing_descriptions[i:i + batch_size]
         
         try:
             # Create the try-on prompt for current batch with specific item descriptions
@@ -75,10 +133,7 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
             contents.extend(current_batch)
             
             # Generate the try-on visualization for this batch
-            response = client.models.generate_content(
-                model=editing_model,
-                contents=contents
-            )
+            response = await generate_content_async(editing_model, contents, operation="tryon_edit")
             
             # Process response
             generated_image_base64 = None
@@ -93,9 +148,23 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
                     # Update current result image for next iteration
                     current_result_image = image_data
             
+            if generated_image_base64 is None:
+                cacheable = False
+            elif cacheable:
+                applied = i + batch_items
+                try:
+                    await asyncio.to_thread(
+                        cache.put,
+                        prefix_key(editing_model, person_hash, garment_hashes[:applied]),
+                        current_result_image,
+                        {"clothing_descriptions": clothing_descriptions[:applied]}
+                    )
+                except Exception as cache_error:
+                    logger.warning("Could not cache try-on result: %s", cache_error)
+            
             # Store iteration result with clothing descriptions
             iteration_results.append({
-                "iteration": (i // batch_size) + 1,
+                "iteration": len(iteration_results) + 1,
                 "items_added": batch_items,
                 "clothing_descriptions": current_descriptions,
                 "success": True,
@@ -105,8 +174,9 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
             
         except Exception as batch_error:
             # If this batch fails, record error but continue with next batch
+            cacheable = False
             iteration_results.append({
-                "iteration": (i // batch_size) + 1,
+                "iteration": len(iteration_results) + 1,
                 "items_added": batch_items,
                 "clothing_descriptions": current_descriptions,
                 "success": False,
@@ -125,6 +195,10 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
             final_result = result["generated_image_base64"]
             break
     
+    # Every garment was already cached (or no new edit succeeded): use the cached result
+    if final_result is None and cached_image is not None:
+        final_result = image_to_base64(cached_image)
+    
     successful_iterations = sum(1 for result in iteration_results if result["success"])
     
     return {
@@ -134,11 +208,114 @@ async def perform_iterative_tryon(images: List[UploadFile]) -> dict:
         "total_iterations": len(iteration_results),
         "successful_iterations": successful_iterations,
         "total_clothing_items": len(clothing_images),
+        "cached_items": cached_items,
         "clothing_descriptions": clothing_descriptions,
-        "images_processed": len(processed_images),
+        "images_processed": len(clothing_images) + 1,
         "description": "Iterative try-on visualization completed with item analysis"
     }
 
+def describe_wardrobe_item(item: Dict[str, Any]) -> str:
+    """Try-on prompt description of a stored item from its name and color"""
+    name = (item.get("name") or item.get("category") or "clothing item").strip()
+    color = (item.get("primary_color") or "").strip()
+    if color and color.lower() not in name.lower():
+        name = f"{color} {name}"
+    return name.lower()
+
+def _layer(item: Dict[str, Any]) -> int:
+    if item.get("item_type") == "accessory":
+        return ACCESSORY_LAYER
+    return LAYER_ORDER.get(item.get("display_category"), ACCESSORY_LAYER - 1)
+
+def _load_items(user_id: str, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """The user's rows for {"item_id", "item_type"} refs, in the given order (missing ones dropped)"""
+    supabase = get_supabase_client()
+    rows = {}
+    for item_type, table in ITEM_TABLES.items():
+        ids = [item["item_id"] for item in items if item["item_type"] == item_type]
+        if ids:
+            with metrics.supabase_call(f"{table}.select"):
+                result = supabase.table(table).select("*").in_("id", ids).eq("profile_id", user_id).execute()
+            for row in result.data or []:
+                rows[item_type, row["id"]] = {**row, "item_type": item_type}
+    return [rows[key] for key in dict.fromkeys((item["item_type"], item["item_id"]) for item in items) if key in rows]
+
+async def resolve_tryon_items(user_id: str, items: Optional[List[Dict[str, str]]] = None,
+                              outfit_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Wardrobe rows to try on, from item refs or an outfit
+    
+    Item refs keep their given order; outfit items are ordered by layer
+    (tops and bottoms, then footwear, outerwear and accessories). Returns
+    None when the outfit doesn't exist or isn't the user's.
+    """
+    if outfit_id:
+        outfit = await get_outfit_by_id(outfit_id, user_id)
+        if outfit is None:
+            return None
+        return sorted(outfit.get("items", []), key=_layer)
+    return _load_items(user_id, items or [])
+
+async def _load_item_image(client: "httpx.AsyncClient", image_url: str) -> Optional[Image.Image]:
+    cache = await asyncio.to_thread(get_item_image_cache)
+    key = hashlib.sha256(image_url.encode()).hexdigest()
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached[0]
+    try:
+        response = await client.get(image_url)
+        response.raise_for_status()
+        image = Image.open(io.BytesIO(response.content)).convert("RGB")
+    except Exception as e:
+        logger.warning("Could not load item image %s: %s", image_url, e)
+        return None
+    try:
+        await asyncio.to_thread(cache.put, key, image, {"image_url": image_url})
+    except Exception as e:
+        logger.warning("Could not cache item image: %s", e)
+    return image
+
+async def perform_wardrobe_tryon(person_image: UploadFile, items: List[Dict[str, Any]]) -> dict:
+    """
+    Virtual try-on of items already in the user's wardrobe
+    
+    Item images come from the local item image cache (downloaded from their
+    stored image_url on a miss) and prompts use the stored name and color,
+    so no garment upload or Gemini analysis is needed.
+    
+    Args:
+        person_image: Image of the person
+        items: Wardrobe rows (see resolve_tryon_items), in the order to apply them
+    """
+    processed_person_image = process_uploaded_image(person_image)
+    
+    with_images = [item for item in items if (item.get("image_url") or "").startswith("http")]
+    client = get_http_client()
+    item_images = await asyncio.gather(*(_load_item_image(client, item["image_url"]) for item in with_images))
+    
+    tried = [(item, image) for item, image in zip(with_images, item_images) if image is not None]
+    if not tried:
+        raise ValueError("None of the selected items has a usable image")
+    
+    clothing_images = [
+        image_utils.pad_image_to_aspect_ratio(image, target_width=processed_person_image.width, target_height=processed_person_image.height)
+        for _, image in tried
+    ]
+    result = await run_tryon_chain(
+        processed_person_image,
+        clothing_images,
+        descriptions=[describe_wardrobe_item(item) for item, _ in tried]
+    )
+    
+    tried_ids = {(item["item_type"], item["id"]) for item, _ in tried}
+    result["items"] = [{"id": item["id"], "item_type": item["item_type"], "name": item.get("name")} for item, _ in tried]
+    result["skipped_items"] = [
+        {"id": item["id"], "item_type": item["item_type"], "name": item.get("name")}
+        for item in items if (item["item_type"], item["id"]) not in tried_ids
+    ]
+    result["description"] = "Iterative try-on visualization completed from wardrobe items"
+    return result
+
 async def perform_fit_transfer(clothing_image: UploadFile, person_image: UploadFile) -> dict:
     """
     Perform virtual try-on by transferring clothing onto a model image
@@ -147,8 +324,6 @@ async def perform_fit_transfer(clothing_image: UploadFile, person_image: UploadF
         clothing_image: Image of the clothing item
         model_image: Image of the model/person
     """
-    client = get_gemini_client()
-    
     # Process uploaded images
     processed_clothing_image = process_uploaded_image(clothing_image)
     processed_person_image = process_uploaded_image(person_image)
@@ -156,9 +331,10 @@ async def perform_fit_transfer(clothing_image: UploadFile, person_image: UploadF
     prompt = "Make the person in the first image wear the outfit shown in the second image. Create a realistic visualization of how the outfit would look when worn by the person, maintaining proper fit, proportions, and styling. Do not change the color of the outfit. Maintain the pose of the person."
 
     try:
-        response = client.models.generate_content(
-            model=editing_model,
-            contents=[prompt, processed_person_image, processed_clothing_image]
+        response = generate_content(
+            editing_model,
+            [prompt, processed_person_image, processed_clothing_image],
+            operation="fit_transfer"
         )
         
         generated_image_base64 = None
@@ -0,0 +1,55 @@
+"""
+Optional warm-up of deferred dependencies after start-up.
+
+The Gemini SDK, Supabase client, HTTP pool and clothing model registry are
+imported or built on first use so the server can answer /health quickly
+after a cold start. With STARTUP_WARMUP=true the lifespan runs warm_up() in
+a background thread once the app is serving, so the first real request
+doesn't pay for them either.
+"""
+
+import os
+import time
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+from . import clients
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+
+
+def _load_model_registry() -> None:
+    from .clothing_identifier import CONFIG_MODULES, generate_clothing_identification_prompt
+    from .category_resolver import resolve_display_category
+
+    importlib.import_module("models")
+    list(CONFIG_MODULES.values())
+    generate_clothing_identification_prompt()
+    resolve_display_category("shirt")
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], object]]] = [
+    ("gemini_sdk", lambda: importlib.import_module("google.genai.types")),
+    ("gemini_client", lambda: clients.get(clients.GEMINI)),
+    ("supabase_client", lambda: clients.get(clients.SUPABASE)),
+    ("http_client", lambda: clients.get(clients.HTTP)),
+    ("model_registry", _load_model_registry),
+]
+
+
+def warm_up() -> Dict[str, float]:
+    """Run every warm-up step, returning milliseconds per step (failed steps are logged and skipped)"""
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("Warm-up finished: %s", timings)
+    return timings